@@ -0,0 +1,227 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+
+import numpy as np
+
+from aifield.classifier_general import ClassifierGeneral
+from aifield.data_reader import DataReader
+from aifield.dataset_registry import DEFAULT_DATA_PATH, DataRegistry
+from aifield.simulation import Simulation
+
+RESULT_FIELDS = (
+    "seed",
+    "survivors",
+    "disarmed_mines",
+    "disarmed_bombs",
+    "amount_of_mines",
+    "amount_of_bombs",
+    "found_kits",
+    "special_soldiers",
+    "accuracy",
+)
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """
+    The parameters shared by every replica of a batch.
+
+    Attributes:
+        size_of_board (int): The size of the board.
+        mine_probability (float): The probability of a cell containing a mine or bomb.
+        classifier_name (str): The name of the classifier to use.
+        type_of_path (str): The type of path soldiers take ('Horizontal' or 'Diagonal').
+        amount_of_soldiers (int): The initial number of soldiers.
+        data_path (str): The path to the CSV file with the augmented Iris dataset.
+    """
+
+    size_of_board: int
+    mine_probability: float
+    classifier_name: str
+    type_of_path: str = "Horizontal"
+    amount_of_soldiers: int = 100
+    data_path: str = DEFAULT_DATA_PATH
+
+
+class BatchResult:
+    """
+    The per-replica outcomes of a batch together with their aggregated distributions.
+
+    Attributes:
+        scenario (Scenario): The scenario that was simulated.
+        replicas (dict): One array per field of ``RESULT_FIELDS``, one entry per replica, ordered by replica.
+    """
+
+    def __init__(self, scenario, rows):
+        """
+        Initializes the result from per-replica rows.
+
+        Args:
+            scenario (Scenario): The scenario that was simulated.
+            rows (list): One tuple of ``RESULT_FIELDS`` values per replica.
+        """
+        self.scenario = scenario
+        columns = list(zip(*rows)) if rows else [() for _ in RESULT_FIELDS]
+        self.replicas = {
+            name: np.asarray(column, dtype=np.float64 if name == "accuracy" else np.int64)
+            for name, column in zip(RESULT_FIELDS, columns)
+        }
+
+    def __len__(self):
+        return len(self.replicas["seed"])
+
+    def distributions(self):
+        """
+        Returns the per-replica arrays of the aggregated metrics.
+
+        Returns:
+            dict: Arrays of survivors, survival rate, disarmed mines and bombs, disarm rate and accuracy.
+        """
+        replicas = self.replicas
+        disarmed = replicas["disarmed_mines"] + replicas["disarmed_bombs"]
+        hazards = replicas["amount_of_mines"] + replicas["amount_of_bombs"]
+        return {
+            "survivors": replicas["survivors"],
+            "survival_rate": replicas["survivors"] / self.scenario.amount_of_soldiers,
+            "disarmed_mines": replicas["disarmed_mines"],
+            "disarmed_bombs": replicas["disarmed_bombs"],
+            "disarm_rate": np.divide(disarmed, hazards, out=np.zeros(len(self)), where=hazards > 0),
+            "accuracy": replicas["accuracy"],
+        }
+
+    def summary(self):
+        """
+        Summarizes every distribution with its mean, standard deviation and percentiles.
+
+        Returns:
+            dict: Scenario parameters, number of replicas and, per metric, mean, std, min, p5, p50, p95 and max.
+        """
+        summary = {"scenario": asdict(self.scenario), "replicas": len(self)}
+        for name, values in self.distributions().items():
+            if values.size == 0:
+                summary[name] = None
+                continue
+            p5, p50, p95 = np.percentile(values, [5, 50, 95])
+            summary[name] = {
+                "mean": float(values.mean()),
+                "std": float(values.std(ddof=1)) if values.size > 1 else 0.0,
+                "min": float(values.min()),
+                "p5": float(p5),
+                "p50": float(p50),
+                "p95": float(p95),
+                "max": float(values.max()),
+            }
+        return summary
+
+
+# Stan procesu roboczego - dane i wytrenowany klasyfikator przygotowane raz na proces
+_worker_state = {}
+
+
+def _init_worker(scenario):
+    """
+    Prepares the warm state of a worker: loads the split and fits the classifier once.
+
+    Args:
+        scenario (Scenario): The scenario the worker will simulate.
+    """
+    split = DataRegistry.get_split(scenario.data_path)
+    classifier = ClassifierGeneral(scenario.classifier_name, random_state=42)
+    classifier.train(split)
+    _worker_state.update(scenario=scenario, split=split, classifier=classifier)
+
+
+def _run_replicas(seeds):
+    """
+    Runs replicas of the worker's scenario, one per seed, with the vectorised path kernel.
+
+    Args:
+        seeds (list): The seeds of the replicas.
+
+    Returns:
+        list: One tuple of ``RESULT_FIELDS`` values per replica.
+    """
+    scenario = _worker_state["scenario"]
+    rows = []
+    for seed in seeds:
+        simulation = Simulation(
+            scenario.size_of_board,
+            scenario.mine_probability,
+            scenario.classifier_name,
+            scenario.type_of_path,
+            scenario.amount_of_soldiers,
+            split=_worker_state["split"],
+            classifier=_worker_state["classifier"],
+            verbose=False,
+            log_retention="counters",
+            seed=seed,
+        )
+        results = simulation.run(fast=True)
+        rows.append((seed,) + tuple(results[name] for name in RESULT_FIELDS[1:]))
+    return rows
+
+
+class BatchRunner:
+    """
+    A headless Monte Carlo engine running independent replicas of a scenario across a process pool.
+
+    Every worker loads the data and fits the classifier once in its initializer, then runs chunks of replicas.
+    Replica seeds are derived from one root seed, so a batch is reproducible regardless of the number of workers.
+
+    Attributes:
+        scenario (Scenario): The scenario to simulate.
+        workers (int): The number of worker processes; 0 runs the replicas in the calling process.
+        chunk_size (int or None): The number of replicas sent to a worker at once; None picks it automatically.
+    """
+
+    def __init__(self, scenario, workers=None, chunk_size=None):
+        """
+        Initializes the runner.
+
+        Args:
+            scenario (Scenario): The scenario to simulate.
+            workers (int, optional): The number of worker processes. Default is the number of CPUs.
+            chunk_size (int, optional): The number of replicas sent to a worker at once.
+        """
+        self.scenario = scenario
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.chunk_size = chunk_size
+
+    @staticmethod
+    def replica_seeds(replicas, seed=None):
+        """
+        Derives independent replica seeds from a root seed.
+
+        Args:
+            replicas (int): The number of replicas.
+            seed (int, optional): The root seed. Default draws fresh entropy.
+
+        Returns:
+            list: One 32-bit seed per replica.
+        """
+        return [int(child.generate_state(1)[0]) for child in np.random.SeedSequence(seed).spawn(replicas)]
+
+    def run(self, replicas, seed=None):
+        """
+        Runs the replicas and aggregates their outcomes.
+
+        Args:
+            replicas (int): The number of replicas to run.
+            seed (int, optional): The root seed of the batch. Default draws fresh entropy.
+
+        Returns:
+            BatchResult: The per-replica outcomes and their distributions.
+        """
+        seeds = self.replica_seeds(replicas, seed)
+        if self.workers <= 0:
+            _init_worker(self.scenario)
+            return BatchResult(self.scenario, _run_replicas(seeds))
+
+        chunk_size = self.chunk_size or max(1, min(64, replicas // (self.workers * 4)))
+        chunks = [seeds[start : start + chunk_size] for start in range(0, replicas, chunk_size)]
+        # Pamięć podręczną CSV budujemy w procesie głównym, zanim procesy robocze zaczną ją czytać
+        DataReader.open_cache(self.scenario.data_path)
+        with ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.scenario,)) as executor:
+            rows = [row for chunk in executor.map(_run_replicas, chunks) for row in chunk]
+        return BatchResult(self.scenario, rows)
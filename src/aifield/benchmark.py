@@ -0,0 +1,527 @@
+import json
+import os
+import platform
+import statistics
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, fields
+
+import numpy as np
+
+from aifield.board import Board
+from aifield.classifier_general import ClassifierGeneral
+from aifield.data_reader import DataReader
+from aifield.dataset_registry import DEFAULT_DATA_PATH, DataRegistry
+from aifield.metrics import peak_rss, reset_peak_rss
+from aifield.simulation import Simulation
+from aifield.tournament import CLASSIFIERS
+
+STAGES = (
+    "load",
+    "board",
+    "board_generate",
+    "board_count",
+    "board_assign",
+    "train",
+    "predict_cell",
+    "predict_batch",
+    "simulate",
+    "simulate_fast",
+)
+
+BOARD_SIZES = (10, 100, 1000, 5000)
+
+# Krokowa symulacja idzie w Pythonie komórka po komórce - na większych planszach trwałaby godzinami
+SIMULATE_MAX_SIZE = 1000
+
+# Wymiary, które zależą od rozmiaru planszy / od klasyfikatora
+SIZED_STAGES = {
+    "board",
+    "board_generate",
+    "board_count",
+    "board_assign",
+    "predict_cell",
+    "predict_batch",
+    "simulate",
+    "simulate_fast",
+}
+CLASSIFIED_STAGES = {"train", "predict_cell", "predict_batch", "simulate", "simulate_fast"}
+
+
+@dataclass(frozen=True)
+class Measurement:
+    """
+    The cost of one stage of the pipeline for a classifier and a board size.
+
+    Attributes:
+        stage (str): The stage, one of ``STAGES``.
+        classifier (str or None): The name of the classifier, or None for stages that use none.
+        size_of_board (int or None): The size of the board, or None for stages that use none.
+        items (int): The number of items processed by a run: cells of the board, or samples of the dataset.
+        runs (int): The number of timed runs.
+        seconds (float): The wall time of the fastest run.
+        median_seconds (float): The median wall time of the runs.
+        peak_rss (int or None): The peak resident set size during the timed runs, in bytes.
+        allocated_bytes (int or None): The peak of memory allocated by a run, traced by ``tracemalloc``.
+    """
+
+    stage: str
+    classifier: str
+    size_of_board: int
+    items: int
+    runs: int
+    seconds: float
+    median_seconds: float
+    peak_rss: int = None
+    allocated_bytes: int = None
+
+    @property
+    def key(self):
+        """
+        tuple: The stage, classifier and board size identifying the measurement across runs.
+        """
+        return self.stage, self.classifier, self.size_of_board
+
+    @property
+    def seconds_per_item(self):
+        """
+        float: The wall time of the fastest run divided by the items it processed.
+        """
+        return self.seconds / self.items if self.items else float("nan")
+
+
+def measure(action, setup=None, repeat=5, budget=2.0, trace_allocations=True):
+    """
+    Measures an action: its wall time over repeated runs, the peak RSS and the memory it allocates.
+
+    Timed runs stop after ``repeat`` runs or once ``budget`` seconds are spent, whichever comes first; at least one
+    run is always timed. Allocations are traced in one extra run, since ``tracemalloc`` slows the action down.
+
+    Args:
+        action (callable): The action, called with the value returned by ``setup``, or without arguments.
+        setup (callable, optional): Prepares the argument of every run; its time is not measured.
+        repeat (int, optional): The maximum number of timed runs. Default is 5.
+        budget (float, optional): The time budget of the timed runs, in seconds. Default is 2.
+        trace_allocations (bool, optional): Whether to trace the allocations. Default is True.
+
+    Returns:
+        tuple: The wall times of the runs, the peak RSS in bytes (or None) and the peak of traced allocations in
+        bytes (or None).
+    """
+
+    def call():
+        if setup is None:
+            return action
+        argument = setup()
+        return lambda: action(argument)
+
+    seconds = []
+    reset_peak_rss()
+    spent = 0.0
+    while len(seconds) < max(1, repeat) and (not seconds or spent < budget):
+        run = call()
+        started = time.perf_counter()
+        run()
+        seconds.append(time.perf_counter() - started)
+        spent += seconds[-1]
+    peak = peak_rss()
+
+    allocated = None
+    if trace_allocations:
+        run = call()
+        tracemalloc.start()
+        try:
+            run()
+            allocated = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return seconds, peak, allocated
+
+
+class BenchmarkResult:
+    """
+    The measurements of a benchmark run and the environment they were taken in.
+
+    Attributes:
+        measurements (list): The :class:`Measurement` of every stage, classifier and board size.
+        environment (dict): The versions of Python and the libraries, the platform and the number of CPUs.
+    """
+
+    def __init__(self, measurements, environment=None):
+        """
+        Initializes the result.
+
+        Args:
+            measurements (list): The measurements.
+            environment (dict, optional): The environment. Default describes the running process.
+        """
+        self.measurements = list(measurements)
+        self.environment = environment if environment is not None else self.describe_environment()
+
+    @staticmethod
+    def describe_environment():
+        """
+        Describes the environment of the running process.
+
+        Returns:
+            dict: The versions of Python, numpy and scikit-learn, the platform, the number of CPUs and the time.
+        """
+        import sklearn
+
+        return {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "sklearn": sklearn.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        }
+
+    def rows(self):
+        """
+        Returns the measurements as flat rows.
+
+        Returns:
+            list: One dict per measurement, with the fields of :class:`Measurement` and ``seconds_per_item``.
+        """
+        return [
+            {**asdict(measurement), "seconds_per_item": measurement.seconds_per_item}
+            for measurement in self.measurements
+        ]
+
+    def to_dict(self):
+        """
+        Returns the result in a JSON-serializable form.
+
+        Returns:
+            dict: The environment and the measurements.
+        """
+        return {"environment": self.environment, "measurements": [asdict(m) for m in self.measurements]}
+
+    def save(self, path):
+        """
+        Writes the result as JSON.
+
+        Args:
+            path (str): The path of the file.
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads a result written by :meth:`save`.
+
+        Args:
+            path (str): The path of the file.
+
+        Returns:
+            BenchmarkResult: The result.
+        """
+        with open(path, encoding="utf-8") as file:
+            content = json.load(file)
+        names = {field.name for field in fields(Measurement)}
+        measurements = [
+            Measurement(**{name: value for name, value in row.items() if name in names})
+            for row in content["measurements"]
+        ]
+        return cls(measurements, content.get("environment", {}))
+
+    def compare(self, baseline, tolerance=0.2, min_seconds=1e-3, min_bytes=1 << 20):
+        """
+        Compares the measurements with the ones of a baseline run.
+
+        A measurement regresses when its fastest run is slower, or its peak of traced allocations is larger, than the
+        baseline by more than ``tolerance``. Runs faster than ``min_seconds`` in both results are too noisy for their
+        time to be judged, and allocations growing by less than ``min_bytes`` are ignored. Peak RSS is reported but
+        not judged, as it depends on what ran before.
+
+        Args:
+            baseline (BenchmarkResult): The baseline run.
+            tolerance (float, optional): The allowed relative increase. Default is 0.2 (20%).
+            min_seconds (float, optional): The shortest run whose time is judged. Default is 1 ms.
+            min_bytes (int, optional): The smallest growth of allocations that is judged. Default is 1 MiB.
+
+        Returns:
+            list: One dict per measurement present in both runs, with the stage, classifier, board size, the
+            baseline and current values, their ratios and whether the measurement regressed.
+        """
+        previous = {measurement.key: measurement for measurement in baseline.measurements}
+        comparisons = []
+        for measurement in self.measurements:
+            reference = previous.get(measurement.key)
+            if reference is None:
+                continue
+            time_ratio = measurement.seconds / reference.seconds if reference.seconds else float("inf")
+            memory_ratio = None
+            if measurement.allocated_bytes is not None and reference.allocated_bytes:
+                memory_ratio = measurement.allocated_bytes / reference.allocated_bytes
+            slower = time_ratio > 1 + tolerance and max(measurement.seconds, reference.seconds) >= min_seconds
+            larger = (
+                memory_ratio is not None
+                and memory_ratio > 1 + tolerance
+                and measurement.allocated_bytes - reference.allocated_bytes >= min_bytes
+            )
+            comparisons.append(
+                {
+                    "stage": measurement.stage,
+                    "classifier": measurement.classifier,
+                    "size_of_board": measurement.size_of_board,
+                    "baseline_seconds": reference.seconds,
+                    "seconds": measurement.seconds,
+                    "time_ratio": time_ratio,
+                    "baseline_allocated_bytes": reference.allocated_bytes,
+                    "allocated_bytes": measurement.allocated_bytes,
+                    "memory_ratio": memory_ratio,
+                    "regressed": slower or larger,
+                }
+            )
+        return comparisons
+
+
+class BenchmarkSuite:
+    """
+    Measures every stage of the pipeline separately: loading the data, building the board, training, per-cell and
+    batched prediction and the walk, for a grid of board sizes and classifiers.
+
+    Stages:
+        load: ``DataReader.load_augmented_data`` through the warm binary cache of the CSV file.
+        board: ``Board.__init__``; ``board_generate``, ``board_count`` and ``board_assign`` time its phases.
+        train: ``ClassifierGeneral.train`` without the model cache.
+        predict_cell: ``ClassifierGeneral.predict`` called cell by cell, on up to ``PER_CELL_SAMPLE`` cells.
+        predict_batch: ``ClassifierGeneral.predict_batch`` on the features gathered for every cell of the board, in
+            blocks of rows of about ``PREDICT_BLOCK_CELLS`` cells.
+        simulate: ``Simulation.simulate`` consumed end to end, step by step, on boards up to ``simulate_max_size``.
+        simulate_fast: ``Simulation.run(fast=True)``, the array kernel.
+
+    Attributes:
+        board_sizes (tuple): The sizes of the boards.
+        classifiers (tuple): The names of the classifiers.
+        stages (tuple): The stages to measure.
+        data_path (str): The path to the CSV file with the augmented Iris dataset.
+        mine_probability (float): The probability of a mine or bomb on the boards.
+        type_of_path (str): The type of path of the simulations.
+        repeat (int): The maximum number of timed runs of a measurement.
+        budget (float): The time budget of the timed runs of a measurement, in seconds.
+        trace_allocations (bool): Whether to trace the allocations.
+        seed (int): The seed of the boards and simulations.
+        simulate_max_size (int or None): The largest board of the ``simulate`` stage; None measures every size.
+    """
+
+    PER_CELL_SAMPLE = 1000
+    PREDICT_BLOCK_CELLS = 1 << 20
+
+    def __init__(
+        self,
+        board_sizes=BOARD_SIZES,
+        classifiers=CLASSIFIERS,
+        stages=STAGES,
+        data_path=DEFAULT_DATA_PATH,
+        mine_probability=0.2,
+        type_of_path="Horizontal",
+        repeat=5,
+        budget=2.0,
+        trace_allocations=True,
+        seed=0,
+        simulate_max_size=SIMULATE_MAX_SIZE,
+    ):
+        """
+        Initializes the suite.
+
+        Args:
+            board_sizes (iterable, optional): The sizes of the boards. Default is ``BOARD_SIZES``.
+            classifiers (iterable, optional): The names of the classifiers. Default is all nine.
+            stages (iterable, optional): The stages to measure. Default is every stage.
+            data_path (str, optional): The path to the CSV file with the augmented Iris dataset.
+            mine_probability (float, optional): The probability of a mine or bomb. Default is 0.2.
+            type_of_path (str, optional): The type of path of the simulations. Default is 'Horizontal'.
+            repeat (int, optional): The maximum number of timed runs of a measurement. Default is 5.
+            budget (float, optional): The time budget of a measurement, in seconds. Default is 2.
+            trace_allocations (bool, optional): Whether to trace the allocations. Default is True.
+            seed (int, optional): The seed of the boards and simulations. Default is 0.
+            simulate_max_size (int, optional): The largest board of the ``simulate`` stage. Default is
+                ``SIMULATE_MAX_SIZE``; None measures every size.
+        """
+        unknown = set(stages) - set(STAGES)
+        if unknown:
+            raise ValueError(f"Unsupported stages: {', '.join(sorted(unknown))}")
+        self.board_sizes = tuple(board_sizes)
+        self.classifiers = tuple(classifiers)
+        self.stages = tuple(stage for stage in STAGES if stage in stages)
+        self.data_path = data_path
+        self.mine_probability = mine_probability
+        self.type_of_path = type_of_path
+        self.repeat = repeat
+        self.budget = budget
+        self.trace_allocations = trace_allocations
+        self.seed = seed
+        self.simulate_max_size = simulate_max_size
+
+    def run(self, progress=None):
+        """
+        Runs the suite.
+
+        Args:
+            progress (callable, optional): Called with every measurement as soon as it is taken.
+
+        Returns:
+            BenchmarkResult: The measurements.
+        """
+        split = DataRegistry.get_split(self.data_path)
+        trained = {}
+        measurements = []
+        for stage in self.stages:
+            sizes = self.board_sizes if stage in SIZED_STAGES else (None,)
+            if stage == "simulate" and self.simulate_max_size is not None:
+                sizes = tuple(size for size in sizes if size <= self.simulate_max_size)
+            names = self.classifiers if stage in CLASSIFIED_STAGES else (None,)
+            for name in names:
+                if name is not None and name not in trained and stage != "train":
+                    trained[name] = ClassifierGeneral(name, random_state=42)
+                    trained[name].train(split)
+                for size in sizes:
+                    measurement = getattr(self, f"_measure_{stage}")(split, trained.get(name, name), size)
+                    measurements.append(measurement)
+                    if progress is not None:
+                        progress(measurement)
+        return BenchmarkResult(measurements)
+
+    def _measure(self, stage, classifier, size, items, action, setup=None):
+        """
+        Measures an action and wraps the outcome in a :class:`Measurement`.
+
+        Args:
+            stage (str): The stage.
+            classifier (ClassifierGeneral or str or None): The classifier, or its name.
+            size (int or None): The size of the board.
+            items (int): The number of items processed by a run.
+            action (callable): The action.
+            setup (callable, optional): Prepares the argument of every run.
+
+        Returns:
+            Measurement: The measurement.
+        """
+        seconds, peak, allocated = measure(action, setup, self.repeat, self.budget, self.trace_allocations)
+        name = getattr(classifier, "classifier_name", classifier)
+        return Measurement(
+            stage, name, size, items, len(seconds), min(seconds), statistics.median(seconds), peak, allocated
+        )
+
+    def _new_board(self, split, size):
+        """
+        Builds the board of a size used by the stages.
+
+        Args:
+            split (DataSplit): The split of the dataset.
+            size (int): The size of the board.
+
+        Returns:
+            Board: The board.
+        """
+        return Board(size, self.mine_probability, split, rng=self.seed)
+
+    def _new_simulation(self, split, classifier, size, log_retention="all"):
+        """
+        Creates a quiet simulation used by the stages.
+
+        Args:
+            split (DataSplit): The split of the dataset.
+            classifier (ClassifierGeneral): The trained classifier.
+            size (int): The size of the board.
+            log_retention (str, optional): The retention policy of the event log. Default is "all".
+
+        Returns:
+            Simulation: The simulation.
+        """
+        return Simulation(
+            size,
+            self.mine_probability,
+            classifier.classifier_name,
+            self.type_of_path,
+            split=split,
+            classifier=classifier,
+            verbose=False,
+            log_retention=log_retention,
+            seed=self.seed,
+        )
+
+    def _measure_load(self, split, classifier, size):
+        key = split.key
+        DataReader.open_cache(key.file_path)
+        return self._measure(
+            "load",
+            None,
+            None,
+            len(split.y_train) + len(split.y_test),
+            lambda: DataReader.load_augmented_data(key.file_path, key.sample_fraction, key.random_state),
+        )
+
+    def _measure_board(self, split, classifier, size):
+        return self._measure("board", None, size, size * size, lambda: self._new_board(split, size))
+
+    def _measure_board_generate(self, split, classifier, size):
+        board = self._new_board(split, size)
+        return self._measure("board_generate", None, size, size * size, board._generate_board)
+
+    def _measure_board_count(self, split, classifier, size):
+        board = self._new_board(split, size)
+        return self._measure(
+            "board_count", None, size, size * size, lambda: (board._count_mines(), board._count_bombs())
+        )
+
+    def _measure_board_assign(self, split, classifier, size):
+        board = self._new_board(split, size)
+        return self._measure("board_assign", None, size, size * size, board._assign_iris_features)
+
+    def _measure_train(self, split, classifier, size):
+        return self._measure(
+            "train",
+            classifier,
+            None,
+            len(split.y_train),
+            lambda candidate: candidate.train(split, use_cache=False),
+            setup=lambda: ClassifierGeneral(classifier, random_state=42),
+        )
+
+    def _measure_predict_cell(self, split, classifier, size):
+        board = self._new_board(split, size)
+        cells = np.arange(min(size * size, self.PER_CELL_SAMPLE))
+        rows, cols = np.divmod(cells, size)
+        features = board.features_at(rows, cols)
+
+        def predict_cells():
+            for feature in features:
+                classifier.predict(feature)
+
+        return self._measure("predict_cell", classifier, size, cells.size, predict_cells)
+
+    def _measure_predict_batch(self, split, classifier, size):
+        board = self._new_board(split, size)
+        # Bloki wierszy ograniczają pamięć zebranych cech na dużych planszach
+        step = max(1, self.PREDICT_BLOCK_CELLS // size)
+
+        def predict_board():
+            for start in range(0, size, step):
+                classifier.predict_batch(board.features_at(slice(start, start + step), slice(None)))
+
+        return self._measure("predict_batch", classifier, size, size * size, predict_board)
+
+    def _measure_simulate(self, split, classifier, size):
+        def walk(simulation):
+            for _ in simulation.simulate():
+                pass
+
+        return self._measure(
+            "simulate", classifier, size, size * size, walk, setup=lambda: self._new_simulation(split, classifier, size)
+        )
+
+    def _measure_simulate_fast(self, split, classifier, size):
+        return self._measure(
+            "simulate_fast",
+            classifier,
+            size,
+            size * size,
+            lambda simulation: simulation.run(fast=True),
+            setup=lambda: self._new_simulation(split, classifier, size, log_retention="counters"),
+        )
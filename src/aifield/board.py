@@ -1,5 +1,5 @@
 import numpy as np
-from aifield.data_reader import DataReader
+from aifield.dataset_registry import DataRegistry
 
 
 class Board:
@@ -9,10 +9,17 @@ class Board:
     Attributes:
         size_of_board (int): The size of the board (size x size).
         mine_probability (float): The probability of a cell containing a mine or bomb.
-        array (np.ndarray): The generated board array with mines and bombs.
+        feature_dtype (np.dtype): The dtype of the assigned feature vectors.
+        rng (np.random.Generator): The random generator of the board.
+        array (np.ndarray): The generated board array (int8) with mines and bombs.
         amount_of_mines (int): The total number of mines on the board.
         amount_of_bombs (int): The total number of bombs on the board.
-        assigned_test_features (np.ndarray): The features from the Iris dataset assigned to the board cells.
+        split (DataSplit): The train/test split whose test set provides the features of the cells.
+        test_features (np.ndarray): The shared pool of test feature vectors, cast to ``feature_dtype``.
+        feature_indices (np.ndarray): The int32 index into ``test_features`` of the feature vector of every cell.
+
+    Classifier outputs are computed once per vector of the test pool and gathered for the cells, and they are cached
+    per fitted classifier (see :meth:`inference`).
 
     Note:
         The Iris dataset from scikit-learn is used to assign features to the board cells. More information about the
@@ -20,20 +27,149 @@ class Board:
         https://scikit-learn.org/stable/auto_examples/datasets/plot_iris_dataset.html
     """
 
-    def __init__(self, size_of_board, mine_probability):
+    def __init__(self, size_of_board, mine_probability, split=None, feature_dtype=np.float32, rng=None):
         """
         Initializes the Board with the specified size and mine probability.
 
         Args:
             size_of_board (int): The size of the board (size x size).
             mine_probability (float): The probability of a cell containing a mine or bomb.
+            split (DataSplit, optional): The split providing the test features. Default is the registry's default split.
+            feature_dtype (np.dtype, optional): The dtype of the assigned feature vectors. Default is float32.
+            rng (np.random.Generator or SeedSequence or int, optional): The source of randomness of the board.
+                Default is a generator seeded from fresh entropy.
         """
         self.size_of_board = size_of_board
         self.mine_probability = mine_probability
+        self.split = split if split is not None else DataRegistry.get_split()
+        self.feature_dtype = np.dtype(feature_dtype)
+        self.rng = np.random.default_rng(rng)
         self.array = self._generate_board()
         self.amount_of_mines = self._count_mines()
         self.amount_of_bombs = self._count_bombs()
-        self.assigned_test_features = self._assign_iris_features()
+        self.test_features = self.split.X_test.astype(self.feature_dtype, copy=False)
+        self.feature_indices = self._assign_iris_features()
+        self._inference = {}
+
+    @classmethod
+    def from_arrays(cls, array, feature_indices, mine_probability, split=None, feature_dtype=np.float32, rng=None):
+        """
+        Creates a board from its arrays, e.g. restored from a checkpoint, without generating it.
+
+        Args:
+            array (np.ndarray): The board array (int8) with mines and bombs.
+            feature_indices (np.ndarray): The int32 index into the test features of every cell.
+            mine_probability (float): The probability of a cell containing a mine or bomb.
+            split (DataSplit, optional): The split providing the test features. Default is the registry's default split.
+            feature_dtype (np.dtype, optional): The dtype of the assigned feature vectors. Default is float32.
+            rng (np.random.Generator or SeedSequence or int, optional): The random generator of the board.
+
+        Returns:
+            Board: The board.
+        """
+        board = cls.__new__(cls)
+        board.size_of_board = array.shape[0]
+        board.mine_probability = mine_probability
+        board.split = split if split is not None else DataRegistry.get_split()
+        board.feature_dtype = np.dtype(feature_dtype)
+        board.rng = np.random.default_rng(rng)
+        board.array = np.asarray(array, dtype=np.int8)
+        board.amount_of_mines = board._count_mines()
+        board.amount_of_bombs = board._count_bombs()
+        board.test_features = board.split.X_test.astype(board.feature_dtype, copy=False)
+        board.feature_indices = np.asarray(feature_indices, dtype=np.int32)
+        board._inference = {}
+        return board
+
+    def new_grid(self, name, dtype, fill=0):
+        """
+        Creates an array with a value for every cell of the board, e.g. the predictions of a simulation.
+
+        Args:
+            name (str): The name of the grid; boards kept in files store it under that name.
+            dtype (np.dtype): The dtype of the grid.
+            fill (scalar, optional): The initial value of every cell. Default is 0.
+
+        Returns:
+            np.ndarray: The grid, shape (size, size).
+        """
+        return np.full((self.size_of_board, self.size_of_board), fill, dtype=dtype)
+
+    @property
+    def assigned_test_features(self):
+        """
+        np.ndarray: The dense (size, size, n_features) tensor of the features assigned to the board cells.
+
+        The tensor is materialized on every access; prefer :meth:`features_at` for the cells actually needed.
+        """
+        return self.test_features[self.feature_indices]
+
+    def features_at(self, rows, cols):
+        """
+        Gathers the feature vectors of the given cells from the shared test pool.
+
+        Args:
+            rows (array-like): The x-coordinates of the cells.
+            cols (array-like): The y-coordinates of the cells.
+
+        Returns:
+            np.ndarray: The feature vectors, shape (..., n_features) matching the shape of the coordinates.
+        """
+        return self.test_features[self.feature_indices[rows, cols]]
+
+    def inference(self, classifier):
+        """
+        Returns the labels and calibrated probabilities predicted by a classifier for every vector of the test pool.
+
+        Every cell holds a vector of the pool, so one batched pass over the pool covers the whole board. The outputs
+        are cached per fitted classifier (:attr:`ClassifierGeneral.fitted_key`).
+
+        Args:
+            classifier (ClassifierGeneral): A trained classifier.
+
+        Returns:
+            tuple: The predicted labels (int8) and the probabilities of the labels 0-2 (float32, shape (pool, 3)).
+        """
+        key = classifier.fitted_key
+        outputs = self._inference.get(key) if key is not None else None
+        if outputs is None:
+            labels = classifier.predict_batch(self.test_features)
+            probabilities = classifier.predict_proba_batch(self.test_features).astype(np.float32)
+            labels.setflags(write=False)
+            probabilities.setflags(write=False)
+            outputs = labels, probabilities
+            if key is not None:
+                self._inference[key] = outputs
+        return outputs
+
+    def labels_at(self, classifier, rows, cols):
+        """
+        Returns the labels predicted by a classifier for the given cells.
+
+        Args:
+            classifier (ClassifierGeneral): A trained classifier.
+            rows (array-like): The x-coordinates of the cells.
+            cols (array-like): The y-coordinates of the cells.
+
+        Returns:
+            np.ndarray: The predicted labels (int8), shaped like the coordinates.
+        """
+        return self.inference(classifier)[0][self.feature_indices[rows, cols]]
+
+    def probabilities_at(self, classifier, rows=None, cols=None):
+        """
+        Returns the probabilities of the labels predicted by a classifier for the given cells.
+
+        Args:
+            classifier (ClassifierGeneral): A trained classifier.
+            rows (array-like, optional): The x-coordinates of the cells. Default is every cell.
+            cols (array-like, optional): The y-coordinates of the cells. Default is every cell.
+
+        Returns:
+            np.ndarray: The probabilities of the labels 0-2 (float32), shape (..., 3) matching the coordinates.
+        """
+        indices = self.feature_indices if rows is None else self.feature_indices[rows, cols]
+        return self.inference(classifier)[1][indices]
 
     def _generate_board(self):
         """
@@ -43,7 +179,26 @@ class Board:
             np.ndarray: A 2D array representing the board, where 0 indicates an empty cell,
                         1 indicates a mine, and 2 indicates a bomb.
         """
-        return np.random.binomial(2, self.mine_probability, (self.size_of_board, self.size_of_board))
+        return self.draw_labels(self.rng, (self.size_of_board, self.size_of_board), self.mine_probability)
+
+    @staticmethod
+    def draw_labels(rng, shape, mine_probability):
+        """
+        Draws the labels of cells: 0 for empty, 1 for a mine and 2 for a bomb.
+
+        Args:
+            rng (np.random.Generator): The source of randomness.
+            shape (tuple): The shape of the cells.
+            mine_probability (float): The probability of a cell containing a mine or bomb.
+
+        Returns:
+            np.ndarray: The labels (int8).
+        """
+        # Rozkład dwumianowy B(2, p) z jednego losowania jednostajnego: P(0) = (1-p)^2, P(2) = p^2
+        uniform = rng.random(shape, dtype=np.float32)
+        board = (uniform >= (1 - mine_probability) ** 2).view(np.int8)
+        board += uniform >= 1 - mine_probability**2
+        return board
 
     def _count_mines(self):
         """
@@ -52,12 +207,7 @@ class Board:
         Returns:
             int: The total number of mines on the board.
         """
-        count = 0
-        for i in range(self.size_of_board):
-            for j in range(self.size_of_board):
-                if self.array[i][j] == 1:
-                    count += 1
-        return count
+        return int(np.count_nonzero(self.array == 1))
 
     def _count_bombs(self):
         """
@@ -66,55 +216,67 @@ class Board:
         Returns:
             int: The total number of bombs on the board.
         """
-        count = 0
-        for i in range(self.size_of_board):
-            for j in range(self.size_of_board):
-                if self.array[i][j] == 2:
-                    count += 1
-        return count
+        return int(np.count_nonzero(self.array == 2))
 
     def _assign_iris_features(self):
         """
         Assigns features from the Iris dataset to the cells on the board based on the cell type.
 
-        This method initializes the DataReader to load and split the augmented Iris dataset. It assigns
-        features from the test set to the board cells based on the cell type. Each cell on the board
-        is assigned a feature vector from the Iris dataset, ensuring that the features correspond
-        to the cell's type (0 for empty, 1 for mine, 2 for bomb).
+        Cells store only an index into the test set, so the board costs 4 bytes per cell instead of a full feature
+        vector; features are gathered on demand.
+
+        This method assigns features from the test set of the board's split to the board cells based on the cell
+        type. Each cell on the board is assigned a feature vector from the Iris dataset, ensuring that the features
+        correspond to the cell's type (0 for empty, 1 for mine, 2 for bomb). Samples of a class are used without
+        replacement while unique ones remain; larger boards draw the rest with replacement.
 
         Returns:
-            np.ndarray: A 3D array where each cell contains a feature vector from the Iris dataset.
+            np.ndarray: A 2D int32 array where each cell contains the index of its feature vector in the test set.
+
+        Raises:
+            ValueError: If the board contains a cell type that has no samples in the test set.
+        """
+        return self.draw_feature_indices(self.array, self.split.y_test, self.rng)
+
+    @staticmethod
+    def draw_feature_indices(labels, y_test, rng):
         """
+        Draws the index of a test feature vector of the matching class for every cell.
 
-        DataReader.initialize()
+        Samples of a class are used without replacement while unique ones remain; the rest are drawn with
+        replacement.
 
-        X_test, y_test = DataReader.get_test_data()
+        Args:
+            labels (np.ndarray): The labels of the cells.
+            y_test (np.ndarray): The labels of the test set.
+            rng (np.random.Generator): The source of randomness.
+
+        Returns:
+            np.ndarray: The int32 index of the feature vector of every cell, shaped like the labels.
 
-        features = np.zeros((self.size_of_board, self.size_of_board, X_test.shape[1]))
+        Raises:
+            ValueError: If a cell has a label that has no samples in the test set.
+        """
+        cells = labels.ravel()
+        sample_indices = np.empty(cells.size, dtype=np.int32)
 
-        # Indeksy cech dla każdej klasy
-        indices_0 = np.where(y_test == 0)[0]  # indeks całej próbki, zwraca krotkę
-        indices_1 = np.where(y_test == 1)[0]
-        indices_2 = np.where(y_test == 2)[0]
+        for label in (0, 1, 2):
+            positions = np.flatnonzero(cells == label)
+            if positions.size == 0:
+                continue
 
-        np.random.shuffle(indices_0)
-        np.random.shuffle(indices_1)
-        np.random.shuffle(indices_2)
+            # Indeksy cech danej klasy w losowej kolejności
+            indices = np.flatnonzero(y_test == label)
+            if indices.size == 0:
+                raise ValueError(f"The test set has no samples of class {label}")
+            rng.shuffle(indices)
 
-        feature_index_0 = 0
-        feature_index_1 = 0
-        feature_index_2 = 0
+            if positions.size > indices.size:
+                # Zabrakło unikalnych próbek - resztę losujemy ze zwracaniem
+                extra = rng.choice(indices, positions.size - indices.size)
+                indices = np.concatenate((indices, extra))
 
-        for i in range(self.size_of_board):
-            for j in range(self.size_of_board):
-                if self.array[i][j] == 0:
-                    features[i, j, :] = X_test[indices_0[feature_index_0]]
-                    feature_index_0 += 1
-                elif self.array[i][j] == 1:
-                    features[i, j, :] = X_test[indices_1[feature_index_1]]
-                    feature_index_1 += 1
-                elif self.array[i][j] == 2:
-                    features[i, j, :] = X_test[indices_2[feature_index_2]]
-                    feature_index_2 += 1
+            # Komórki są wypełniane wierszami, tak jak przy przechodzeniu planszy pętlą
+            sample_indices[positions] = indices[: positions.size]
 
-        return features
\ No newline at end of file
+        return sample_indices.reshape(labels.shape)
@@ -0,0 +1,135 @@
+import numpy as np
+from PyQt5.QtCore import QRect, QRectF, Qt
+from PyQt5.QtGui import QImage, QPainter
+from PyQt5.QtWidgets import QGraphicsItem, QGraphicsView
+
+# Kolory RGBA komórek: nieodwiedzona, rozbrojona oraz odwiedzona według etykiety (pusta, mina, bomba)
+UNVISITED_COLOR = (255, 255, 255, 255)
+DISARMED_COLOR = (0, 128, 0, 255)
+LABEL_COLORS = np.array([(0, 255, 0, 255), (255, 255, 0, 255), (255, 0, 0, 255)], dtype=np.uint8)
+
+
+class BoardImageItem(QGraphicsItem):
+    """
+    A graphics item drawing the whole board from one RGBA buffer, one pixel per cell.
+
+    The buffer is a numpy array wrapped without copying by a ``QImage``, so painting cells is a numpy assignment.
+    Painted cells mark the tiles of ``TILE_SIZE`` x ``TILE_SIZE`` cells they fall into as dirty, and only those
+    tiles are repainted; a repaint draws only the part of the image exposed in the view.
+
+    Attributes:
+        size_of_board (int): The size of the board.
+        buffer (np.ndarray): The RGBA color of every cell, shape (size, size, 4), uint8.
+        image (QImage): The image sharing the memory of ``buffer``.
+    """
+
+    TILE_SIZE = 256
+
+    def __init__(self, size_of_board, parent=None):
+        """
+        Initializes the item with every cell unvisited.
+
+        Args:
+            size_of_board (int): The size of the board.
+            parent (QGraphicsItem, optional): The parent item.
+        """
+        super().__init__(parent)
+        self.size_of_board = size_of_board
+        self.buffer = np.empty((size_of_board, size_of_board, 4), dtype=np.uint8)
+        self.buffer[:] = UNVISITED_COLOR
+        # QImage nie kopiuje danych - bufor musi żyć tak długo jak obraz
+        self.image = QImage(self.buffer.data, size_of_board, size_of_board, 4 * size_of_board, QImage.Format_RGBA8888)
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+
+    def boundingRect(self):
+        return QRectF(0, 0, self.size_of_board, self.size_of_board)
+
+    def paint(self, painter, option, widget=None):
+        """
+        Draws the part of the board exposed in the view, cell by pixel, without smoothing.
+        """
+        exposed = option.exposedRect.toAlignedRect().intersected(QRect(0, 0, self.size_of_board, self.size_of_board))
+        if exposed.isEmpty():
+            return
+        painter.setRenderHint(QPainter.SmoothPixmapTransform, False)
+        painter.drawImage(exposed, self.image, exposed)
+
+    def paint_cells(self, rows, cols, colors):
+        """
+        Colors cells of the board and schedules the repaint of their tiles.
+
+        Args:
+            rows (np.ndarray): The x-coordinates of the cells.
+            cols (np.ndarray): The y-coordinates of the cells.
+            colors (np.ndarray or tuple): The RGBA color of every cell, shape (n, 4), or one color for all.
+        """
+        if len(rows) == 0:
+            return
+        self.buffer[rows, cols] = colors
+        self.mark_dirty(rows, cols)
+
+    def mark_dirty(self, rows, cols):
+        """
+        Schedules the repaint of the tiles holding the given cells.
+
+        Args:
+            rows (np.ndarray): The x-coordinates of the cells.
+            cols (np.ndarray): The y-coordinates of the cells.
+        """
+        tile = self.TILE_SIZE
+        tiles_per_row = -(-self.size_of_board // tile)
+        tiles = np.unique(np.asarray(rows) // tile * tiles_per_row + np.asarray(cols) // tile)
+        for tile_row, tile_col in zip(*np.divmod(tiles, tiles_per_row)):
+            self.update(QRectF(int(tile_col) * tile, int(tile_row) * tile, tile, tile))
+
+
+class BoardView(QGraphicsView):
+    """
+    A graphics view of the board with zoom on the mouse wheel (or the + and - keys) and pan by dragging.
+
+    The 0 key fits the whole board in the view.
+    """
+
+    ZOOM_STEP = 1.25
+
+    def __init__(self, parent=None):
+        """
+        Initializes the view.
+
+        Args:
+            parent (QWidget, optional): The parent widget.
+        """
+        super().__init__(parent)
+        self.setDragMode(QGraphicsView.ScrollHandDrag)
+        self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
+        self.setViewportUpdateMode(QGraphicsView.SmartViewportUpdate)
+
+    def zoom(self, factor):
+        """
+        Scales the view.
+
+        Args:
+            factor (float): The scale factor; above 1 zooms in.
+        """
+        self.scale(factor, factor)
+
+    def fit(self):
+        """
+        Fits the whole scene in the view.
+        """
+        self.fitInView(self.sceneRect(), Qt.KeepAspectRatio)
+
+    def wheelEvent(self, event):
+        delta = event.angleDelta().y()
+        if delta:
+            self.zoom(self.ZOOM_STEP if delta > 0 else 1 / self.ZOOM_STEP)
+
+    def keyPressEvent(self, event):
+        if event.key() in (Qt.Key_Plus, Qt.Key_Equal):
+            self.zoom(self.ZOOM_STEP)
+        elif event.key() == Qt.Key_Minus:
+            self.zoom(1 / self.ZOOM_STEP)
+        elif event.key() == Qt.Key_0:
+            self.fit()
+        else:
+            super().keyPressEvent(event)
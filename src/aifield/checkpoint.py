@@ -0,0 +1,51 @@
+import json
+import os
+
+import numpy as np
+
+CHECKPOINT_VERSION = 1
+
+
+def write_checkpoint(path, meta, arrays, compress=True):
+    """
+    Writes a checkpoint: the arrays of a state and its JSON metadata in one ``.npz`` file.
+
+    The file is written next to its destination and renamed over it once complete, so a process stopped while
+    writing leaves the previous checkpoint intact.
+
+    Args:
+        path (str): The path of the checkpoint file.
+        meta (dict): The JSON-serializable metadata of the state.
+        arrays (dict): The arrays of the state, by name.
+        compress (bool, optional): Whether to compress the arrays. Default is True.
+    """
+    meta = {"version": CHECKPOINT_VERSION, **meta}
+    save = np.savez_compressed if compress else np.savez
+    temporary = f"{path}.tmp"
+    # Uchwyt pliku zamiast ścieżki - np.savez nie dopisuje wtedy rozszerzenia .npz
+    with open(temporary, "wb") as file:
+        save(file, meta=np.array(json.dumps(meta)), **arrays)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+
+
+def read_checkpoint(path):
+    """
+    Reads a checkpoint written by :func:`write_checkpoint`.
+
+    Args:
+        path (str): The path of the checkpoint file.
+
+    Returns:
+        tuple: The metadata (dict) and the arrays (dict of np.ndarray) of the state.
+
+    Raises:
+        ValueError: If the checkpoint was written by an unsupported version.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data["meta"]))
+        if meta.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version: {meta.get('version')}")
+        arrays = {name: data[name] for name in data.files if name != "meta"}
+    return meta, arrays
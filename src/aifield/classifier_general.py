@@ -1,12 +1,6 @@
-from aifield.data_reader import DataReader
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-from sklearn.linear_model import LogisticRegression
-from sklearn.neighbors import KNeighborsClassifier
-from sklearn.svm import SVC
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.dummy import DummyClassifier
-from sklearn.naive_bayes import GaussianNB
-from sklearn.svm import LinearSVC
+import numpy as np
+
+from aifield.model_cache import ModelCache
 
 
 class ClassifierGeneral:
@@ -18,12 +12,17 @@ class ClassifierGeneral:
         classifier_name (str): The name of the classifier to use.
         random_state (int): The random state for reproducibility.
         classifier (object): The selected classifier instance.
+        trained_on (SplitKey): The key of the split the classifier was last trained on, or None.
+        temperature (float or None): The temperature turning decision scores into probabilities, fitted during
+            training for estimators without ``predict_proba``.
 
     Note:
         For more information about the classifiers, refer to the scikit-learn documentation:
         https://scikit-learn.org/stable/supervised_learning.html
     """
 
+    TEMPERATURE_ATTRIBUTE = "aifield_temperature_"
+
     def __init__(self, classifier_name, random_state):
         """
         Initializes the ClassifierGeneral with the specified classifier name and random state.
@@ -35,11 +34,15 @@ class ClassifierGeneral:
         self.classifier_name = classifier_name
         self.random_state = random_state
         self.classifier = self._select_classifier()
+        self.trained_on = None
+        self.temperature = None
 
     def _select_classifier(self):
         """
         Selects and initializes the classifier based on the classifier_name attribute.
 
+        Only the scikit-learn module of the selected estimator is imported.
+
         Returns:
             object: An instance of the selected classifier.
 
@@ -48,32 +51,129 @@ class ClassifierGeneral:
         """
         match self.classifier_name:
             case "RandomForest":
+                from sklearn.ensemble import RandomForestClassifier
+
                 return RandomForestClassifier(self.random_state)
             case "GradientBoosting":
+                from sklearn.ensemble import GradientBoostingClassifier
+
                 return GradientBoostingClassifier(random_state=self.random_state)
             case "LogisticRegression":
+                from sklearn.linear_model import LogisticRegression
+
                 return LogisticRegression(max_iter=1000, random_state=self.random_state)
             case "KNN":
+                from sklearn.neighbors import KNeighborsClassifier
+
                 return KNeighborsClassifier()
             case "SVM":
+                from sklearn.svm import SVC
+
                 return SVC(random_state=self.random_state)
             case "DecisionTree":
+                from sklearn.tree import DecisionTreeClassifier
+
                 return DecisionTreeClassifier(random_state=self.random_state)
             case "DummyClassifier":
+                from sklearn.dummy import DummyClassifier
+
                 return DummyClassifier(random_state=self.random_state)
             case "GaussianNB":
+                from sklearn.naive_bayes import GaussianNB
+
                 return GaussianNB()
             case "LinearSVC":
+                from sklearn.svm import LinearSVC
+
                 return LinearSVC(max_iter=10000, random_state=self.random_state)
             case _:
                 raise ValueError(f"Unsupported classifier: {self.classifier_name}")
 
-    def train(self):
+    def train(self, split, use_cache=True):
+        """
+        Trains the classifier using the training set of the given split.
+
+        A fitted estimator with the same name, hyperparameters, random state and training data is taken from
+        :class:`aifield.model_cache.ModelCache` instead of being fitted again. The temperature is stored on the
+        cached estimator, so it is only fitted together with the estimator.
+
+        Args:
+            split (DataSplit): The train/test split to train on.
+            use_cache (bool, optional): Whether to reuse and store fitted estimators. Default is True.
+        """
+        X_train, y_train = split.train_data
+        if not use_cache:
+            # Obecny estymator może pochodzić z ModelCache i być współdzielony - trenujemy nową instancję
+            estimator = self._select_classifier()
+            estimator.fit(X_train, y_train)
+            self.classifier = estimator
+            self.trained_on = split.key
+            self.temperature = self._fit_temperature(X_train, y_train)
+            return
+
+        key = ModelCache.key(self.classifier_name, self.classifier.get_params(), self.random_state, split.fingerprint)
+        estimator = ModelCache.get(key)
+        missed = estimator is None
+        if missed:
+            # Cache'owane estymatory są współdzielone, więc trenujemy zawsze świeżą instancję
+            estimator = self._select_classifier()
+            estimator.fit(X_train, y_train)
+        self.classifier = estimator
+        if not hasattr(estimator, self.TEMPERATURE_ATTRIBUTE):
+            # Temperatura jest zapisywana razem z estymatorem, więc trafienie w cache jej nie dopasowuje ponownie
+            setattr(estimator, self.TEMPERATURE_ATTRIBUTE, self._fit_temperature(X_train, y_train))
+        if missed:
+            self.classifier = ModelCache.put(key, estimator)
+        self.trained_on = split.key
+        self.temperature = getattr(self.classifier, self.TEMPERATURE_ATTRIBUTE)
+
+    def _fit_temperature(self, X_train, y_train):
         """
-        Trains the classifier using the augmented Iris dataset loaded from CSV.
+        Fits the temperature of the softmax over decision scores by minimizing the log loss on the training set.
+
+        Args:
+            X_train (np.ndarray): The training features.
+            y_train (np.ndarray): The training labels.
+
+        Returns:
+            float or None: The temperature, or None if the estimator has ``predict_proba`` or no decision scores.
         """
-        X_train, y_train = DataReader.get_train_data()
-        self.classifier.fit(X_train, y_train)
+        if hasattr(self.classifier, "predict_proba") or not hasattr(self.classifier, "decision_function"):
+            return None
+        from scipy.optimize import minimize_scalar
+        from scipy.special import logsumexp
+
+        scores = self.decision_scores_batch(X_train)
+        true_scores = scores[np.arange(len(y_train)), np.asarray(y_train, dtype=np.intp)]
+
+        def log_loss(log_temperature):
+            temperature = np.exp(log_temperature)
+            return np.mean(logsumexp(scores / temperature, axis=1) - true_scores / temperature)
+
+        # Szukamy log(T), żeby temperatura pozostała dodatnia
+        return float(np.exp(minimize_scalar(log_loss, bounds=(-5.0, 5.0), method="bounded").x))
+
+    @property
+    def fitted_key(self):
+        """
+        tuple or None: Identifies the fitted model (name, random state and training split), or None if it is not
+        trained on a reproducible split. Outputs computed with the same key can be reused.
+        """
+        if self.trained_on is None or self.trained_on.random_state is None:
+            return None
+        return self.classifier_name, self.random_state, self.trained_on
+
+    def is_trained_on(self, split):
+        """
+        Checks whether the classifier is already fitted on the given split.
+
+        Args:
+            split (DataSplit): The train/test split to check.
+
+        Returns:
+            bool: True if the last training used a split with the same key.
+        """
+        return split.key.random_state is not None and self.trained_on == split.key
 
     def predict(self, features):
         """
@@ -87,6 +187,81 @@ class ClassifierGeneral:
         """
         return self.classifier.predict([features])[0]
 
+    def predict_batch(self, features):
+        """
+        Predicts the class labels for many feature vectors in a single call.
+
+        Args:
+            features (np.ndarray): The input features, shape (..., n_features); leading dimensions are kept.
+
+        Returns:
+            np.ndarray: The predicted class labels, shape (...).
+        """
+        features = np.asarray(features)
+        if features.shape[:-1] == (0,):
+            return np.empty(0, dtype=np.int8)
+        labels = self.classifier.predict(features.reshape(-1, features.shape[-1]))
+        return labels.astype(np.int8).reshape(features.shape[:-1])
+
+    def decision_scores_batch(self, features):
+        """
+        Computes a decision score for the labels 0 (empty), 1 (mine) and 2 (bomb) for many feature vectors.
+
+        Scores come from ``decision_function`` when the estimator has one and are log-probabilities otherwise.
+        Labels not seen in training get a score of minus infinity.
+
+        Args:
+            features (np.ndarray): The input features, shape (..., n_features); leading dimensions are kept.
+
+        Returns:
+            np.ndarray: The scores, shape (..., 3). A higher score means a more likely label.
+        """
+        features = np.asarray(features)
+        flat = features.reshape(-1, features.shape[-1])
+        scores = np.full((flat.shape[0], 3), -np.inf)
+        if flat.shape[0] == 0:
+            return scores.reshape(features.shape[:-1] + (3,))
+        if hasattr(self.classifier, "decision_function"):
+            known = self.classifier.decision_function(flat)
+            if known.ndim == 1:
+                # Dwie klasy: jeden wynik dla klasy pozytywnej
+                known = np.column_stack((-known, known)) / 2
+        else:
+            with np.errstate(divide="ignore"):
+                known = np.log(self.classifier.predict_proba(flat))
+        scores[:, self.classifier.classes_.astype(np.intp)] = known
+        return scores.reshape(features.shape[:-1] + (3,))
+
+    def predict_proba_batch(self, features):
+        """
+        Predicts the probabilities of the labels 0 (empty), 1 (mine) and 2 (bomb) for many feature vectors.
+
+        Estimators with ``predict_proba`` are used as they are. The decision scores of the others (SVM, LinearSVC)
+        are calibrated with a softmax at the temperature fitted during training. An estimator with neither gives a
+        probability of 1 to the predicted label.
+
+        Args:
+            features (np.ndarray): The input features, shape (..., n_features); leading dimensions are kept.
+
+        Returns:
+            np.ndarray: The probabilities, shape (..., 3), summing to 1 over the last axis.
+        """
+        features = np.asarray(features)
+        flat = features.reshape(-1, features.shape[-1])
+        probabilities = np.zeros((flat.shape[0], 3))
+        if flat.shape[0] == 0:
+            return probabilities.reshape(features.shape[:-1] + (3,))
+        if hasattr(self.classifier, "predict_proba"):
+            # Kolumny estymatora odpowiadają klasom widzianym w treningu
+            probabilities[:, self.classifier.classes_.astype(np.intp)] = self.classifier.predict_proba(flat)
+        elif self.temperature is not None:
+            scores = self.decision_scores_batch(flat) / self.temperature
+            probabilities = np.exp(scores - scores.max(axis=1, keepdims=True))
+            probabilities /= probabilities.sum(axis=1, keepdims=True)
+        else:
+            probabilities[np.arange(flat.shape[0]), self.classifier.predict(flat).astype(np.intp)] = 1.0
+        return probabilities.reshape(features.shape[:-1] + (3,))
+
     def __str__(self):
         """
         Returns the string representation of the classifier.
@@ -0,0 +1,281 @@
+"""
+Headless command-line interface of the project: ``python -m aifield``.
+
+Runs single simulations, sweeps over scenarios, benchmarks and tournaments without the GUI. Qt is never imported,
+and only the scikit-learn module of the requested classifier is loaded.
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import sys
+import time
+import tracemalloc
+
+from aifield import benchmark, tournament
+from aifield.batch import RESULT_FIELDS, BatchRunner, Scenario
+from aifield.dataset_registry import DEFAULT_DATA_PATH, DataRegistry
+from aifield.metrics import Metrics
+from aifield.planner import PLANNERS
+from aifield.simulation import Simulation
+
+FORMATS = ("json", "csv")
+
+
+def _flatten(row, prefix=""):
+    """
+    Flattens nested dicts into one level, joining the keys with underscores.
+
+    Args:
+        row (dict): The possibly nested row.
+        prefix (str, optional): The prefix of the keys. Default is none.
+
+    Returns:
+        dict: The flat row.
+    """
+    flat = {}
+    for key, value in row.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}_"))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def emit(rows, output_format, stream=None):
+    """
+    Writes rows as JSON or CSV.
+
+    Args:
+        rows (list or dict): The rows to write; a single dict is written as one row.
+        output_format (str): "json" or "csv".
+        stream (file, optional): The stream to write to. Default is ``sys.stdout``.
+    """
+    stream = stream if stream is not None else sys.stdout
+    if output_format == "json":
+        json.dump(rows, stream, indent=2)
+        stream.write("\n")
+        return
+
+    rows = [_flatten(row) for row in ([rows] if isinstance(rows, dict) else rows)]
+    fields = list(dict.fromkeys(key for row in rows for key in row))
+    writer = csv.DictWriter(stream, fields, lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def _add_scenario_arguments(parser, many=False):
+    """
+    Adds the arguments describing a scenario to a parser.
+
+    Args:
+        parser (argparse.ArgumentParser): The parser.
+        many (bool, optional): Whether board sizes, probabilities and paths take several values. Default is False.
+    """
+    if many:
+        parser.add_argument("--sizes", nargs="+", type=int, default=[10])
+        parser.add_argument("--probabilities", nargs="+", type=float, default=[0.2])
+        parser.add_argument("--paths", nargs="+", choices=list(PLANNERS), default=["Horizontal"])
+    else:
+        parser.add_argument("--size", type=int, default=10)
+        parser.add_argument("--probability", type=float, default=0.2)
+        parser.add_argument("--path", choices=list(PLANNERS), default="Horizontal")
+    parser.add_argument("--classifier", choices=tournament.CLASSIFIERS, default="RandomForest")
+    parser.add_argument("--soldiers", type=int, default=100)
+    parser.add_argument("--data", default=DEFAULT_DATA_PATH, help="the CSV file with the augmented Iris dataset")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--format", choices=FORMATS, default="json")
+
+
+def run_command(args):
+    """
+    Runs one simulation, or the rest of one resumed from a checkpoint, and writes its scenario, results and wall
+    time, and optionally its metrics.
+
+    Args:
+        args (argparse.Namespace): The arguments of the ``run`` command.
+    """
+    metrics = Metrics() if args.metrics else None
+    if args.trace_allocations:
+        tracemalloc.start()
+    started = time.perf_counter()
+    if args.resume:
+        # Scenariusz pochodzi z punktu kontrolnego, argumenty scenariusza są pomijane
+        simulation = Simulation.from_checkpoint(args.resume, verbose=False, metrics=metrics)
+    else:
+        simulation = Simulation(
+            args.size,
+            args.probability,
+            args.classifier,
+            args.path,
+            args.soldiers,
+            split=DataRegistry.get_split(args.data),
+            verbose=False,
+            log_retention="counters",
+            seed=args.seed,
+            metrics=metrics,
+            board_storage=args.board_storage,
+            tile_workers=args.tile_workers,
+        )
+    results = simulation.run(args.fast, args.checkpoint, args.checkpoint_every)
+    row = {
+        "size_of_board": simulation.board.size_of_board,
+        "mine_probability": simulation.board.mine_probability,
+        "classifier": simulation._classifier.classifier_name,
+        "type_of_path": simulation.type_of_path,
+        "seed": simulation.seed_sequence.entropy,
+        **results,
+        "seconds": time.perf_counter() - started,
+    }
+    emit(row, args.format)
+
+    if metrics is not None:
+        text = metrics.to_prometheus() if args.metrics_format == "prometheus" else metrics.to_json() + "\n"
+        with open(args.metrics, "w", encoding="utf-8") as file:
+            file.write(text)
+
+
+def sweep_command(args):
+    """
+    Runs a batch of replicas of every scenario of the grid and writes their summaries or per-replica outcomes.
+
+    Args:
+        args (argparse.Namespace): The arguments of the ``sweep`` command.
+    """
+    rows = []
+    for size, probability, path in itertools.product(args.sizes, args.probabilities, args.paths):
+        scenario = Scenario(size, probability, args.classifier, path, args.soldiers, args.data)
+        result = BatchRunner(scenario, args.workers).run(args.replicas, args.seed)
+        if not args.per_replica:
+            rows.append(result.summary())
+            continue
+        for replica in range(len(result)):
+            row = {"size_of_board": size, "mine_probability": probability, "type_of_path": path}
+            row.update({name: result.replicas[name][replica].item() for name in RESULT_FIELDS})
+            rows.append(row)
+    emit(rows, args.format)
+
+
+def bench_command(args):
+    """
+    Runs the benchmark suite, writes its measurements and compares them with a baseline.
+
+    The process exits with status 1 when a measurement regressed against the baseline.
+
+    Args:
+        args (argparse.Namespace): The arguments of the ``bench`` command.
+    """
+    suite = benchmark.BenchmarkSuite(
+        args.sizes,
+        args.classifiers,
+        args.stages,
+        args.data,
+        args.probability,
+        args.path,
+        args.repeat,
+        args.budget,
+        not args.no_allocations,
+        args.seed,
+        args.simulate_max_size or None,
+    )
+    result = suite.run()
+    if args.output:
+        result.save(args.output)
+    if not args.baseline:
+        emit(result.rows(), args.format)
+        return
+
+    comparisons = result.compare(benchmark.BenchmarkResult.load(args.baseline), args.tolerance)
+    emit(comparisons, args.format)
+    if any(comparison["regressed"] for comparison in comparisons):
+        sys.exit(1)
+
+
+def tournament_command(args):
+    """
+    Runs a tournament and writes its ranking.
+
+    Args:
+        args (argparse.Namespace): The arguments of the ``tournament`` command.
+    """
+    result = tournament.from_args(args).run(args.seed)
+    if args.format is None:
+        print(result.table())
+        return
+    emit(result.to_dict() if args.format == "json" else result.ranking(), args.format)
+
+
+def build_parser():
+    """
+    Builds the parser of the command-line interface.
+
+    Returns:
+        argparse.ArgumentParser: The parser with the ``run``, ``sweep``, ``bench`` and ``tournament`` commands.
+    """
+    parser = argparse.ArgumentParser(prog="python -m aifield", description="Run AI Field Commander headlessly.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run a single simulation")
+    _add_scenario_arguments(run)
+    run.add_argument("--fast", action="store_true", help="walk the path with the array kernel")
+    run.add_argument("--metrics", help="write the time spent in every phase and the counters to a file")
+    run.add_argument("--metrics-format", choices=("json", "prometheus"), default="json")
+    run.add_argument("--trace-allocations", action="store_true", help="trace memory with tracemalloc for the metrics")
+    run.add_argument("--board-storage", help="generate the board into memory-mapped files in a directory")
+    run.add_argument(
+        "--tile-workers", type=int, default=None, help="threads processing the tiles of --board-storage (default: CPUs)"
+    )
+    run.add_argument("--checkpoint", help="write the state of the simulation to a file periodically during the walk")
+    run.add_argument("--checkpoint-every", type=int, default=None, help="the steps between two checkpoints")
+    run.add_argument("--resume", help="resume the simulation of a checkpoint file instead of starting one")
+    run.set_defaults(handler=run_command)
+
+    sweep = commands.add_parser("sweep", help="run batches of replicas over a grid of scenarios")
+    _add_scenario_arguments(sweep, many=True)
+    sweep.add_argument("--replicas", type=int, default=30)
+    sweep.add_argument("--workers", type=int, default=None)
+    sweep.add_argument("--per-replica", action="store_true", help="write every replica instead of the summaries")
+    sweep.set_defaults(handler=sweep_command)
+
+    bench = commands.add_parser("bench", help="measure every stage of the pipeline and compare with a baseline")
+    bench.add_argument("--stages", nargs="+", choices=benchmark.STAGES, default=list(benchmark.STAGES))
+    bench.add_argument("--sizes", nargs="+", type=int, default=list(benchmark.BOARD_SIZES))
+    bench.add_argument("--classifiers", nargs="+", choices=tournament.CLASSIFIERS, default=list(tournament.CLASSIFIERS))
+    bench.add_argument("--probability", type=float, default=0.2)
+    bench.add_argument("--path", choices=list(PLANNERS), default="Horizontal")
+    bench.add_argument("--repeat", type=int, default=5, help="the maximum number of timed runs of a measurement")
+    bench.add_argument("--budget", type=float, default=2.0, help="the seconds of timed runs of a measurement")
+    bench.add_argument("--no-allocations", action="store_true", help="skip tracing the allocations")
+    bench.add_argument("--data", default=DEFAULT_DATA_PATH, help="the CSV file with the augmented Iris dataset")
+    bench.add_argument("--seed", type=int, default=0)
+    bench.add_argument(
+        "--simulate-max-size",
+        type=int,
+        default=benchmark.SIMULATE_MAX_SIZE,
+        help=f"the largest board of the step-by-step simulate stage (default {benchmark.SIMULATE_MAX_SIZE}, 0 for all)",
+    )
+    bench.add_argument("--output", help="write the measurements to a JSON file, e.g. to serve as a baseline")
+    bench.add_argument("--baseline", help="compare with the measurements of a JSON file written by --output")
+    bench.add_argument("--tolerance", type=float, default=0.2, help="the allowed relative slowdown (default 0.2)")
+    bench.add_argument("--format", choices=FORMATS, default="json")
+    bench.set_defaults(handler=bench_command)
+
+    matches = commands.add_parser("tournament", help="rank classifiers over a grid of scenarios")
+    tournament.build_parser(matches)
+    matches.add_argument(
+        "--format", choices=FORMATS, default=None, help="write the outcome as JSON or CSV instead of a table"
+    )
+    matches.set_defaults(handler=tournament_command)
+    return parser
+
+
+def main(argv=None):
+    """
+    The entry point of ``python -m aifield``.
+
+    Args:
+        argv (list, optional): The command-line arguments. Default is ``sys.argv[1:]``.
+    """
+    args = build_parser().parse_args(argv)
+    args.handler(args)
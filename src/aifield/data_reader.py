@@ -1,105 +1,377 @@
-import pandas as pd
-from sklearn.model_selection import train_test_split
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from aifield.sampling import StratifiedReservoirSampler
+
+FEATURE_COLUMNS = ["SepalLengthCm", "SepalWidthCm", "PetalLengthCm", "PetalWidthCm"]
+LABEL_COLUMN = "Species"
+LABEL_MAPPING = {"Iris-setosa": 0, "Iris-versicolor": 1, "Iris-virginica": 2}
 
 
 class DataReader:
     """
     A class to handle loading, reducing, and splitting the Iris dataset.
 
-    Attributes:
-        X_train (np.ndarray): Training features.
-        X_test (np.ndarray): Testing features.
-        y_train (np.ndarray): Training labels.
-        y_test (np.ndarray): Testing labels.
-        X (np.ndarray): All features.
-        y (np.ndarray): All labels.
+    The CSV file is converted once into a binary cache (a float32 feature matrix and a uint8 label vector) stored
+    next to it in a ``.cache`` directory. Later loads open the cache with ``np.memmap``, so only the sampled rows
+    are ever read from disk. Samples are drawn by a streaming stratified reservoir sampler, so peak memory is
+    bounded by the sample and one chunk of rows, not by the file.
+
+    DataReader keeps no state of its own; loaded datasets and splits are shared through
+    :class:`aifield.dataset_registry.DataRegistry`.
     """
 
-    X_train = None
-    X_test = None
-    y_train = None
-    y_test = None
-    X = None
-    y = None
+    CACHE_DIR_NAME = ".cache"
+    CACHE_VERSION = 1
+    CSV_CHUNK_SIZE = 200_000
+    LOCK_POLL_SECONDS = 0.05
+    LOCK_STALE_SECONDS = 600.0
 
     @classmethod
-    def initialize(cls, file_path="../data/Augmented_Iris.csv", test_size=0.33, random_state=42):
+    def load_augmented_data(cls, file_path, sample_fraction=0.015, random_state=None, use_cache=True):
         """
-        Initializes the DataReader by loading, reducing, and splitting the data.
+        Loads the augmented Iris dataset, reduce samples, and replacing categorical labels to numerical.
+
+        The data is streamed in chunks of ``CSV_CHUNK_SIZE`` rows, either from the binary cache or straight from the
+        CSV file, and every class keeps a reservoir of ``round(sample_fraction * class_count)`` rows.
 
         Args:
             file_path (str): The path to the CSV file.
-            test_size (float): The fraction of data to be used as the test set.
-            random_state (int): The random state for reproducibility.
+            sample_fraction (float): The fraction of samples kept from every class.
+            random_state (int, optional): The seed of the sampling, for reproducibility.
+            use_cache (bool): Whether to read through the binary cache (building it if needed) or the CSV file.
+
+        Returns:
+            tuple: A tuple containing the sampled features and labels (X, y).
         """
-        cls.load_augmented_data(file_path)
-        cls.split_data(test_size, random_state)
+        if not use_cache:
+            return cls._sample_csv(file_path, sample_fraction, random_state)
+
+        features, labels = cls.open_cache(file_path)
+        step = cls.CSV_CHUNK_SIZE
+        chunks = [(start, min(start + step, labels.size)) for start in range(0, labels.size, step)]
+
+        counts = sum(np.bincount(labels[start:stop], minlength=len(LABEL_MAPPING)) for start, stop in chunks)
+        sampler = StratifiedReservoirSampler(cls._sample_sizes(counts, sample_fraction), random_state)
+        for start, stop in chunks:
+            sampler.update(np.asarray(labels[start:stop]), np.arange(start, stop))
+
+        # Z pamięci mapowanej czytamy tylko wylosowane wiersze
+        indices, y = sampler.result()
+        return np.asarray(features[indices]), y
 
     @classmethod
-    def load_augmented_data(cls, file_path):
+    def _sample_csv(cls, file_path, sample_fraction, random_state):
         """
-        Loads the augmented Iris dataset from a CSV file, reduce samples, and replacing categorical labels to numerical.
+        Samples the dataset straight from the CSV file in two streaming passes: counting labels, then sampling rows.
 
         Args:
             file_path (str): The path to the CSV file.
+            sample_fraction (float): The fraction of samples kept from every class.
+            random_state (int, optional): The seed of the sampling, for reproducibility.
 
         Returns:
-            None
+            tuple: A tuple containing the sampled features and labels (X, y).
         """
-        df = pd.read_csv(
-            file_path, usecols=["SepalLengthCm", "SepalWidthCm", "PetalLengthCm", "PetalWidthCm", "Species"]
+        counts = sum(
+            np.bincount(labels, minlength=len(LABEL_MAPPING))
+            for _, labels in cls._read_csv_chunks(file_path, labels_only=True)
         )
+        sampler = StratifiedReservoirSampler(cls._sample_sizes(counts, sample_fraction), random_state)
+        for features, labels in cls._read_csv_chunks(file_path):
+            sampler.update(labels, features)
+        return sampler.result()
+
+    @staticmethod
+    def _sample_sizes(counts, sample_fraction):
+        """
+        Returns the number of samples kept from every class.
+
+        Args:
+            counts (np.ndarray): The number of rows of every class.
+            sample_fraction (float): The fraction of samples kept from every class.
+
+        Returns:
+            np.ndarray: The sample size of every class.
+        """
+        return np.round(sample_fraction * np.asarray(counts)).astype(np.int64)
+
+    @classmethod
+    def _read_csv_chunks(cls, file_path, labels_only=False):
+        """
+        Reads the CSV file in chunks of ``CSV_CHUNK_SIZE`` rows.
+
+        Args:
+            file_path (str): The path to the CSV file.
+            labels_only (bool): Whether to skip parsing the feature columns.
+
+        Yields:
+            tuple: The float32 features (None if labels_only) and uint8 labels of a chunk.
 
-        # Zamiana etykiety tekstowe na liczbowe
+        Raises:
+            ValueError: If the file contains an unknown species.
+        """
+        # pandas jest importowany dopiero przy czytaniu CSV - z pamięci podręcznej nie jest potrzebny
+        import pandas as pd
+
+        columns = [LABEL_COLUMN] if labels_only else FEATURE_COLUMNS + [LABEL_COLUMN]
+        chunks = pd.read_csv(
+            file_path,
+            usecols=columns,
+            dtype={column: np.float32 for column in FEATURE_COLUMNS if column in columns},
+            chunksize=cls.CSV_CHUNK_SIZE,
+        )
+        for chunk in chunks:
+            labels = chunk[LABEL_COLUMN].map(LABEL_MAPPING)
+            if labels.isna().any():
+                unknown = sorted(set(chunk.loc[labels.isna(), LABEL_COLUMN].astype(str)))
+                raise ValueError(f"Unknown species in {file_path}: {unknown}")
+            features = None if labels_only else np.ascontiguousarray(chunk[FEATURE_COLUMNS].to_numpy(np.float32))
+            yield features, labels.to_numpy(np.uint8)
 
-        label_mapping = {"Iris-setosa": 0, "Iris-versicolor": 1, "Iris-virginica": 2}
+    @classmethod
+    def open_cache(cls, file_path):
+        """
+        Opens the binary cache of a CSV file, building it first if it is missing or stale.
 
-        df["Species"] = df["Species"].map(label_mapping)
+        Builds are serialized through a lock file in the cache directory, so concurrent processes opening a cold
+        cache convert the CSV file once and the others wait for the result.
 
-        # Redukcja liczby próbek
+        Args:
+            file_path (str): The path to the CSV file.
 
-        reduced_df = df.groupby("Species").apply(lambda x: x.sample(frac=0.015))
+        Returns:
+            tuple: Read-only memory maps (features, labels) with shapes (rows, 4) and (rows,).
+        """
+        features_path, labels_path, meta_path = cls._cache_paths(file_path)
+        meta = cls._read_valid_meta(file_path, meta_path)
+        if meta is None or not (os.path.exists(features_path) and os.path.exists(labels_path)):
+            os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+            with cls._build_lock(f"{meta_path}.lock"):
+                # Inny proces mógł zbudować pamięć podręczną, gdy czekaliśmy na blokadę
+                meta = cls._read_valid_meta(file_path, meta_path)
+                if meta is None or not (os.path.exists(features_path) and os.path.exists(labels_path)):
+                    meta = cls._build_cache(file_path)
 
-        # Podział na dane i cechy
-        cls.X = reduced_df.drop("Species", axis=1).values
-        cls.y = reduced_df["Species"].values
+        rows = meta["rows"]
+        features = np.memmap(features_path, dtype=np.float32, mode="r", shape=(rows, len(FEATURE_COLUMNS)))
+        labels = np.memmap(labels_path, dtype=np.uint8, mode="r", shape=(rows,))
+        return features, labels
 
     @classmethod
-    def split_data(cls, test_size=0.33, random_state=42):
+    def _cache_paths(cls, file_path):
         """
-        Splits the dataset into training and testing sets.
+        Returns the paths of the cache files belonging to a CSV file.
 
         Args:
-            test_size (float): The fraction of data to be used as the test set.
-            random_state (int): The random state for reproducibility.
+            file_path (str): The path to the CSV file.
 
         Returns:
-            None
+            tuple: Paths of the feature matrix, the label vector and the metadata file.
         """
-        cls.X_train, cls.X_test, cls.y_train, cls.y_test = train_test_split(
-            cls.X, cls.y, test_size=test_size, random_state=random_state
+        directory, name = os.path.split(os.path.abspath(file_path))
+        stem = os.path.splitext(name)[0]
+        cache_dir = os.path.join(directory, cls.CACHE_DIR_NAME)
+        return (
+            os.path.join(cache_dir, f"{stem}.features.f32"),
+            os.path.join(cache_dir, f"{stem}.labels.u8"),
+            os.path.join(cache_dir, f"{stem}.meta.json"),
         )
 
     @classmethod
-    def get_train_data(cls):
+    @contextlib.contextmanager
+    def _build_lock(cls, lock_path):
+        """
+        Holds an exclusive lock file for the duration of a cache build.
+
+        A lock file older than ``LOCK_STALE_SECONDS`` is treated as left behind by a crashed process and removed.
+
+        Args:
+            lock_path (str): The path of the lock file.
+        """
+        while True:
+            try:
+                descriptor = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                try:
+                    age = time.time() - os.path.getmtime(lock_path)
+                except FileNotFoundError:
+                    continue
+                if age > cls.LOCK_STALE_SECONDS:
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(lock_path)
+                    continue
+                time.sleep(cls.LOCK_POLL_SECONDS)
+
+        try:
+            os.write(descriptor, str(os.getpid()).encode("ascii"))
+            os.close(descriptor)
+            yield
+        finally:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(lock_path)
+
+    @staticmethod
+    def _file_digest(file_path):
+        """
+        Computes the SHA-256 digest of a file's content.
+
+        Args:
+            file_path (str): The path to the file.
+
+        Returns:
+            str: The hexadecimal digest.
+        """
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @classmethod
+    def _read_valid_meta(cls, file_path, meta_path):
+        """
+        Reads the cache metadata and checks that it still describes the CSV file.
+
+        The content hash is only recomputed when the file size or modification time changed since the cache was
+        written, so an unchanged file costs a single ``stat`` call.
+
+        Args:
+            file_path (str): The path to the CSV file.
+            meta_path (str): The path to the metadata file.
+
+        Returns:
+            dict or None: The metadata, or None if the cache is missing or stale.
+        """
+        try:
+            with open(meta_path, encoding="utf-8") as file:
+                meta = json.load(file)
+        except (OSError, ValueError):
+            return None
+
+        if meta.get("version") != cls.CACHE_VERSION or meta.get("feature_columns") != FEATURE_COLUMNS:
+            return None
+
+        stat = os.stat(file_path)
+        if meta["source_size"] == stat.st_size and meta["source_mtime_ns"] == stat.st_mtime_ns:
+            return meta
+
+        if meta["source_sha256"] != cls._file_digest(file_path):
+            return None
+
+        # Treść się nie zmieniła (np. plik został skopiowany) - odświeżamy tylko znacznik czasu
+        meta["source_size"], meta["source_mtime_ns"] = stat.st_size, stat.st_mtime_ns
+        cls._write_atomic(meta_path, json.dumps(meta, indent=2).encode("utf-8"))
+        return meta
+
+    @classmethod
+    def _build_cache(cls, file_path):
+        """
+        Converts the CSV file into the binary cache, reading it in chunks.
+
+        Args:
+            file_path (str): The path to the CSV file.
+
+        Returns:
+            dict: The metadata of the written cache.
+
+        Raises:
+            ValueError: If the file contains an unknown species or no rows.
         """
-        Returns the training set.
+        features_path, labels_path, meta_path = cls._cache_paths(file_path)
+        os.makedirs(os.path.dirname(features_path), exist_ok=True)
+        stat = os.stat(file_path)
+
+        rows = 0
+        features_file, features_tmp = cls._open_temp(features_path)
+        labels_file, labels_tmp = cls._open_temp(labels_path)
+        try:
+            with features_file, labels_file:
+                for features, labels in cls._read_csv_chunks(file_path):
+                    features_file.write(features.tobytes())
+                    labels_file.write(labels.tobytes())
+                    rows += labels.size
+            if rows == 0:
+                raise ValueError(f"No samples found in {file_path}")
+            os.replace(features_tmp, features_path)
+            os.replace(labels_tmp, labels_path)
+        except OSError:
+            # Przegrany wyścig o zmianę nazwy nie jest błędem, jeśli inny proces zapisał już poprawną pamięć
+            meta = cls._read_valid_meta(file_path, meta_path)
+            if meta is None:
+                raise
+            return meta
+        finally:
+            for tmp_path in (features_tmp, labels_tmp):
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(tmp_path)
+
+        meta = {
+            "version": cls.CACHE_VERSION,
+            "source_sha256": cls._file_digest(file_path),
+            "source_size": stat.st_size,
+            "source_mtime_ns": stat.st_mtime_ns,
+            "rows": rows,
+            "feature_columns": FEATURE_COLUMNS,
+            "label_mapping": LABEL_MAPPING,
+        }
+        cls._write_atomic(meta_path, json.dumps(meta, indent=2).encode("utf-8"))
+        return meta
+
+    @staticmethod
+    def _open_temp(path):
+        """
+        Creates a uniquely named temporary file next to a destination path.
+
+        Args:
+            path (str): The destination path.
 
         Returns:
-            tuple: A tuple containing the training sets (X_train, y_train).
+            tuple: The temporary file opened for binary writing and its path.
         """
-        if cls.X_train is None or cls.y_train is None:
-            raise ValueError("Data has not been split. Call split_data() first.")
-        return cls.X_train, cls.y_train
+        directory, name = os.path.split(path)
+        descriptor, tmp_path = tempfile.mkstemp(dir=directory, prefix=f"{name}.", suffix=".tmp")
+        return os.fdopen(descriptor, "wb"), tmp_path
 
     @classmethod
-    def get_test_data(cls):
+    def _write_atomic(cls, path, content):
         """
-        Returns the testing set.
+        Writes a file through a uniquely named temporary file, so readers never see a partial write.
+
+        Args:
+            path (str): The destination path.
+            content (bytes): The content to write.
+        """
+        file, tmp_path = cls._open_temp(path)
+        try:
+            with file:
+                file.write(content)
+            os.replace(tmp_path, path)
+        finally:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmp_path)
+
+    @staticmethod
+    def split_data(X, y, test_size=0.33, random_state=42):
+        """
+        Splits the dataset into training and testing sets.
+
+        Args:
+            X (np.ndarray): All features.
+            y (np.ndarray): All labels.
+            test_size (float): The fraction of data to be used as the test set.
+            random_state (int): The random state for reproducibility.
 
         Returns:
-            tuple: A tuple containing the testing sets (X_test, y_test).
+            tuple: A tuple containing (X_train, X_test, y_train, y_test).
         """
-        if cls.X_test is None or cls.y_test is None:
-            raise ValueError("Data has not been split. Call split_data() first.")
-        return cls.X_test, cls.y_test
+        from sklearn.model_selection import train_test_split
+
+        return tuple(train_test_split(X, y, test_size=test_size, random_state=random_state))
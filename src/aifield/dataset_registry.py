@@ -0,0 +1,189 @@
+import hashlib
+import os
+from collections import namedtuple
+from dataclasses import dataclass
+from functools import cached_property
+
+import numpy as np
+
+from aifield.data_reader import DataReader
+from aifield.lru_cache import LRUCache
+
+DEFAULT_DATA_PATH = "../data/Augmented_Iris.csv"
+
+DatasetKey = namedtuple("DatasetKey", ["file_path", "sample_fraction", "random_state"])
+SplitKey = namedtuple("SplitKey", ["file_path", "sample_fraction", "test_size", "random_state"])
+
+
+def _read_only(array):
+    """
+    Returns an array whose buffer cannot be written to through it.
+
+    Args:
+        array (np.ndarray): The array to protect.
+
+    Returns:
+        np.ndarray: The same data, flagged as read-only.
+    """
+    array = np.asarray(array)
+    array.setflags(write=False)
+    return array
+
+
+@dataclass(frozen=True, eq=False)
+class Dataset:
+    """
+    An immutable, stratified sample of the augmented Iris dataset.
+
+    Attributes:
+        key (DatasetKey): The registry key the dataset was built for.
+        X (np.ndarray): All features (read-only).
+        y (np.ndarray): All labels (read-only).
+    """
+
+    key: DatasetKey
+    X: np.ndarray
+    y: np.ndarray
+
+    @property
+    def nbytes(self):
+        """
+        int: The memory used by the arrays of the dataset.
+        """
+        return self.X.nbytes + self.y.nbytes
+
+
+@dataclass(frozen=True, eq=False)
+class DataSplit:
+    """
+    An immutable train/test split of a :class:`Dataset`, shared by every board and classifier that requests it.
+
+    Attributes:
+        key (SplitKey): The registry key the split was built for.
+        X_train (np.ndarray): Training features (read-only).
+        X_test (np.ndarray): Testing features (read-only).
+        y_train (np.ndarray): Training labels (read-only).
+        y_test (np.ndarray): Testing labels (read-only).
+    """
+
+    key: SplitKey
+    X_train: np.ndarray
+    X_test: np.ndarray
+    y_train: np.ndarray
+    y_test: np.ndarray
+
+    @property
+    def train_data(self):
+        """
+        tuple: The training set (X_train, y_train).
+        """
+        return self.X_train, self.y_train
+
+    @property
+    def test_data(self):
+        """
+        tuple: The testing set (X_test, y_test).
+        """
+        return self.X_test, self.y_test
+
+    @property
+    def nbytes(self):
+        """
+        int: The memory used by the arrays of the split.
+        """
+        return self.X_train.nbytes + self.X_test.nbytes + self.y_train.nbytes + self.y_test.nbytes
+
+    @cached_property
+    def fingerprint(self):
+        """
+        str: A digest of the training data's content, shape and dtype, used to key fitted models.
+        """
+        digest = hashlib.sha256()
+        for array in (self.X_train, self.y_train):
+            digest.update(f"{array.dtype.str}{array.shape}".encode("ascii"))
+            digest.update(np.ascontiguousarray(array).data)
+        return digest.hexdigest()
+
+
+class DataRegistry:
+    """
+    A process-wide registry of datasets and splits, served from memory with LRU eviction under a byte budget.
+
+    Every entry is immutable, so the same object can be handed to any number of simulations, including ones
+    running concurrently in different threads.
+
+    Attributes:
+        DEFAULT_MAX_BYTES (int): The default byte budget of the registry.
+    """
+
+    DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+    _cache = LRUCache(max_bytes=DEFAULT_MAX_BYTES, size_of=lambda entry: entry.nbytes)
+
+    @classmethod
+    def get_dataset(cls, file_path=DEFAULT_DATA_PATH, sample_fraction=0.015, random_state=42):
+        """
+        Returns the sampled dataset for the given parameters, loading it on first use.
+
+        Args:
+            file_path (str): The path to the CSV file.
+            sample_fraction (float): The fraction of samples kept from every class.
+            random_state (int, optional): The seed of the sampling. None draws a fresh sample that is not cached.
+
+        Returns:
+            Dataset: The shared, read-only dataset.
+        """
+        key = DatasetKey(os.path.abspath(file_path), float(sample_fraction), random_state)
+        dataset = cls._cache.get(key)
+        if dataset is not None:
+            return dataset
+
+        X, y = DataReader.load_augmented_data(key.file_path, key.sample_fraction, key.random_state)
+        dataset = Dataset(key, _read_only(X), _read_only(y))
+        if random_state is None:
+            return dataset
+        return cls._cache.put(key, dataset)
+
+    @classmethod
+    def get_split(cls, file_path=DEFAULT_DATA_PATH, sample_fraction=0.015, test_size=0.33, random_state=42):
+        """
+        Returns the train/test split for the given parameters, loading and splitting the data on first use.
+
+        Args:
+            file_path (str): The path to the CSV file.
+            sample_fraction (float): The fraction of samples kept from every class.
+            test_size (float): The fraction of data to be used as the test set.
+            random_state (int, optional): The random state of sampling and splitting. None is never cached.
+
+        Returns:
+            DataSplit: The shared, read-only split.
+        """
+        key = SplitKey(os.path.abspath(file_path), float(sample_fraction), float(test_size), random_state)
+        split = cls._cache.get(key)
+        if split is not None:
+            return split
+
+        dataset = cls.get_dataset(file_path, sample_fraction, random_state)
+        X_train, X_test, y_train, y_test = DataReader.split_data(dataset.X, dataset.y, test_size, random_state)
+        split = DataSplit(key, _read_only(X_train), _read_only(X_test), _read_only(y_train), _read_only(y_test))
+        if random_state is None:
+            return split
+        return cls._cache.put(key, split)
+
+    @classmethod
+    def configure(cls, max_bytes=DEFAULT_MAX_BYTES, max_entries=None):
+        """
+        Changes the limits of the registry, evicting the least recently used entries that no longer fit.
+
+        Args:
+            max_bytes (int, optional): The byte budget. None removes the limit.
+            max_entries (int, optional): The maximum number of entries. None removes the limit.
+        """
+        cls._cache.configure(max_entries=max_entries, max_bytes=max_bytes)
+
+    @classmethod
+    def clear(cls):
+        """
+        Removes every dataset and split from the registry.
+        """
+        cls._cache.clear()
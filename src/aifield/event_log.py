@@ -0,0 +1,271 @@
+from enum import IntEnum
+
+import numpy as np
+
+EVENT_DTYPE = np.dtype(
+    [
+        ("step", np.int64),
+        ("x", np.int32),
+        ("y", np.int32),
+        ("code", np.uint8),
+        ("delta", np.int32),
+        ("value", np.int32),
+    ]
+)
+
+
+class EventCode(IntEnum):
+    """
+    The types of events recorded during a simulation.
+    """
+
+    GOOD_PREDICTION = 0
+    DISARMED_MINE = 1
+    DISARMED_BOMB = 2
+    SPECIAL_FORCES = 3
+    HEAVY_SAVES = 4
+    HEAVY_DIED = 5
+    SAPPER_DISARMED_MINE = 6
+    SAPPER_DISARMED_BOMB = 7
+    SAPPER_DIED = 8
+    MINE_CASUALTIES = 9
+    BOMB_CASUALTIES = 10
+    ALL_DEAD = 11
+    LUCKY_MISS = 12
+    MOVE = 13
+    KIT_FOUND = 14
+    KIT_NO_SAPPERS = 15
+    ENEMY_HEAVY_DIED = 16
+    ENEMY_CASUALTIES = 17
+    ENEMY_ALL_DEAD = 18
+    RECRUITED = 19
+    SURVIVORS = 20
+
+
+# Szablony tekstowe zdarzeń - formatowane dopiero przy wyświetlaniu lub eksporcie
+EVENT_TEMPLATES = {
+    EventCode.GOOD_PREDICTION: "Good prediction, there is no mine nor bomb.",
+    EventCode.DISARMED_MINE: "Disarmed mine, because of good prediction!",
+    EventCode.DISARMED_BOMB: "Disarmed bomb, because of good prediction. WE'RE LUCKY SIR!",
+    EventCode.SPECIAL_FORCES: "Bad prediction, but here are our SPECIAL FORCES SIR!",
+    EventCode.HEAVY_SAVES: "Heavy saves us, HeavyStats: Health: {delta}, Armor: {value}",
+    EventCode.HEAVY_DIED: "Heavy sacrificed himself and DIED.",
+    EventCode.SAPPER_DISARMED_MINE: "Sapper disarmed MINE!",
+    EventCode.SAPPER_DISARMED_BOMB: "Sapper disarmed BOMB!",
+    EventCode.SAPPER_DIED: "Sapper died during disarming...",
+    EventCode.MINE_CASUALTIES: (
+        "Bad prediction (MINE) and there are no special forces available. Lost casualties: {delta}"
+    ),
+    EventCode.BOMB_CASUALTIES: (
+        "Bad prediction (BOMB) and there are no special forces available. Lost casualties: {delta}"
+    ),
+    EventCode.ALL_DEAD: "Bad prediction and ALL SOLDIERS ARE DEAD",
+    EventCode.LUCKY_MISS: "BAD PREDICTION, but there is no mine nor bomb, WE ARE REALLY LUCKY!",
+    EventCode.MOVE: "Moving to [{x}][{y}]",
+    EventCode.KIT_FOUND: "RANDOM EVENT - Found disarming kit, adding it to SAPPER inventory.",
+    EventCode.KIT_NO_SAPPERS: "RANDOM EVENT - Found disarming kit, BUT THERE AREN'T ANY SAPPERS",
+    EventCode.ENEMY_HEAVY_DIED: "Enemy unit encountered, HEAVY DIED SAVING US!",
+    EventCode.ENEMY_CASUALTIES: "Enemy unit encountered -> Lost: {delta} casualties",
+    EventCode.ENEMY_ALL_DEAD: "Enemy unit encountered, but all soldiers are dead.",
+    EventCode.RECRUITED: "Recruited new soldiers: Gained: {delta} soldiers.",
+    EventCode.SURVIVORS: "Survivors: {value}/{total}",
+}
+
+
+class EventLog:
+    """
+    A compact log of simulation events stored as typed records in a numpy structured array.
+
+    Events are buffered as tuples and flushed into the array in blocks. Text is only produced when records are
+    formatted for display or export. Three retention policies are supported:
+
+    - ``"all"``: every record is kept in an array that grows by doubling.
+    - ``"last"``: only the last ``capacity`` records are kept in a ring buffer.
+    - ``"counters"``: no records are kept, only the number of events of every type.
+
+    Attributes:
+        total_soldiers (int): The initial number of soldiers, shown in survivor events.
+        retention (str): The retention policy.
+        capacity (int or None): The size of the ring buffer for the ``"last"`` policy.
+        counts (list): The number of events of every type, indexed by event code.
+    """
+
+    RETENTIONS = ("all", "last", "counters")
+    FLUSH_SIZE = 4096
+    INITIAL_CAPACITY = 1024
+
+    def __init__(self, total_soldiers, retention="all", capacity=None):
+        """
+        Initializes an empty log.
+
+        Args:
+            total_soldiers (int): The initial number of soldiers, shown in survivor events.
+            retention (str, optional): The retention policy: "all", "last" or "counters". Default is "all".
+            capacity (int, optional): The number of records kept by the "last" policy.
+
+        Raises:
+            ValueError: If the retention policy is unknown or "last" has no positive capacity.
+        """
+        if retention not in self.RETENTIONS:
+            raise ValueError(f"Unsupported retention: {retention}")
+        if retention == "last" and (capacity is None or capacity <= 0):
+            raise ValueError("The 'last' retention requires a positive capacity")
+
+        self.total_soldiers = total_soldiers
+        self.retention = retention
+        self.capacity = capacity
+        self.counts = [0] * len(EventCode)
+        self._pending = []
+        self._size = 0
+        self._written = 0
+        if retention == "all":
+            self._records = np.empty(self.INITIAL_CAPACITY, dtype=EVENT_DTYPE)
+        elif retention == "last":
+            self._records = np.empty(capacity, dtype=EVENT_DTYPE)
+        else:
+            self._records = np.empty(0, dtype=EVENT_DTYPE)
+
+    def append(self, step, x, y, code, delta=0, value=0):
+        """
+        Records an event.
+
+        Args:
+            step (int): The index of the simulation step.
+            x (int): The x-coordinate of the cell.
+            y (int): The y-coordinate of the cell.
+            code (EventCode): The type of the event.
+            delta (int, optional): The change carried by the event (casualties, recruits, health).
+            value (int, optional): The state after the event (survivors, armor).
+        """
+        self.counts[code] += 1
+        if self.retention == "counters":
+            return
+        self._pending.append((step, x, y, code, delta, value))
+        if len(self._pending) >= self.FLUSH_SIZE:
+            self._flush()
+
+    def _flush(self):
+        """
+        Moves the buffered events into the record array.
+        """
+        if not self._pending:
+            return
+        block = np.array(self._pending, dtype=EVENT_DTYPE)
+        self._pending.clear()
+
+        if self.retention == "all":
+            needed = self._size + block.size
+            if needed > self._records.size:
+                grown = np.empty(max(needed, 2 * self._records.size), dtype=EVENT_DTYPE)
+                grown[: self._size] = self._records[: self._size]
+                self._records = grown
+            self._records[self._size : needed] = block
+            self._size = needed
+            self._written += block.size
+            return
+
+        # Bufor cykliczny - starsze wpisy są nadpisywane
+        capacity, count = self._records.size, block.size
+        block = block[-capacity:]
+        start = (self._written + count - block.size) % capacity
+        first = min(block.size, capacity - start)
+        self._records[start : start + first] = block[:first]
+        self._records[: block.size - first] = block[first:]
+        self._size = min(capacity, self._size + count)
+        self._written += count
+
+    def records(self):
+        """
+        Returns the retained records in chronological order.
+
+        Returns:
+            np.ndarray: A structured array with the fields of ``EVENT_DTYPE``.
+        """
+        self._flush()
+        if self.retention == "last" and self._written > self._size:
+            start = self._written % self._size
+            return np.concatenate((self._records[start:], self._records[:start]))
+        return self._records[: self._size]
+
+    def state(self):
+        """
+        Returns the state of the log as arrays: the retained records, the counts and the number of records written.
+
+        Returns:
+            dict: The arrays, by name.
+        """
+        return {
+            "records": self.records(),
+            "counts": np.array(self.counts, dtype=np.int64),
+            "written": np.int64(self._written),
+        }
+
+    def load_state(self, state):
+        """
+        Replaces the events of the log with a state returned by :meth:`state` of a log with the same retention.
+
+        Args:
+            state (dict): The arrays of the state, by name.
+        """
+        records = state["records"]
+        self.counts = state["counts"].tolist()
+        self._pending.clear()
+        self._written = int(state["written"])
+        self._size = records.size
+        if self.retention == "all":
+            self._records = np.empty(max(records.size, self.INITIAL_CAPACITY), dtype=EVENT_DTYPE)
+            self._records[: records.size] = records
+        elif self.retention == "last":
+            # Wpisy wracają na swoje miejsca w buforze cyklicznym, licząc od liczby zapisanych
+            positions = (self._written - records.size + np.arange(records.size)) % self._records.size
+            self._records[positions] = records
+
+    def format(self, record):
+        """
+        Formats a single record as a line of text.
+
+        Args:
+            record (np.void): A record of the log.
+
+        Returns:
+            str: The text of the event.
+        """
+        return EVENT_TEMPLATES[EventCode(int(record["code"]))].format(
+            x=int(record["x"]),
+            y=int(record["y"]),
+            delta=int(record["delta"]),
+            value=int(record["value"]),
+            total=self.total_soldiers,
+        )
+
+    def lines(self, codes=None):
+        """
+        Formats the retained records lazily, one line per event.
+
+        Args:
+            codes (iterable, optional): The event codes to include. Default includes every event.
+
+        Yields:
+            str: The text of an event.
+        """
+        records = self.records()
+        if codes is not None:
+            records = records[np.isin(records["code"], [int(code) for code in codes])]
+        for record in records:
+            yield self.format(record)
+
+    def write_text(self, file, codes=None):
+        """
+        Exports the retained records as text, one event per line.
+
+        Args:
+            file (file-like): A text file open for writing.
+            codes (iterable, optional): The event codes to include. Default includes every event.
+        """
+        for line in self.lines(codes):
+            file.write(line)
+            file.write("\n")
+
+    def __len__(self):
+        self._flush()
+        return self._size
@@ -0,0 +1,135 @@
+import numpy as np
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, Qt
+
+from aifield.event_log import EVENT_DTYPE, EventCode
+
+
+class EventLogModel(QAbstractListModel):
+    """
+    A list model of the records of an :class:`EventLog`, one row per event.
+
+    The model keeps the record array of the log rather than text: a row is formatted only when a view asks for it, so
+    a view with uniform item sizes formats just the visible rows of any number of events. New records are appended as
+    inserted rows while the simulation runs. A filter by event codes keeps the indices of the matching records, and
+    the records themselves are never copied.
+
+    Attributes:
+        log (EventLog or None): The log whose records are shown.
+        codes (list or None): The event codes shown, None for every event.
+    """
+
+    def __init__(self, parent=None):
+        """
+        Initializes an empty model.
+
+        Args:
+            parent (QObject, optional): The parent object.
+        """
+        super().__init__(parent)
+        self.log = None
+        self.codes = None
+        self._records = np.empty(0, dtype=EVENT_DTYPE)
+        self._index = None
+
+    def set_log(self, log, records=None):
+        """
+        Shows the records of a log, replacing the current ones.
+
+        Args:
+            log (EventLog): The log.
+            records (np.ndarray, optional): The records of the log, as returned by ``EventLog.records``. Default shows
+                none until :meth:`update_records`, so a log still appended to in another thread is not read here.
+        """
+        self.beginResetModel()
+        self.log = log
+        self._records = np.empty(0, dtype=EVENT_DTYPE) if records is None else records
+        self._index = self._matching(0)
+        self.endResetModel()
+
+    def update_records(self, records):
+        """
+        Shows the current records of the log, appending the new ones as rows.
+
+        With the "all" retention policy the records flushed earlier never change, so the new ones are inserted after
+        the shown rows; with a ring buffer the rows shift and the model is reset.
+
+        Args:
+            records (np.ndarray): The records of the log, as returned by ``EventLog.records``.
+        """
+        if self.log is None:
+            return
+        if self.log.retention != "all" or len(records) < len(self._records):
+            self.set_log(self.log, records)
+            return
+
+        start = len(self._records)
+        if self._index is None:
+            first, count = start, len(records) - start
+            appended = None
+        else:
+            appended = self._matching(start, records)
+            first, count = len(self._index), len(appended)
+        if count == 0:
+            self._records = records
+            return
+        self.beginInsertRows(QModelIndex(), first, first + count - 1)
+        self._records = records
+        if appended is not None:
+            self._index = np.concatenate((self._index, appended))
+        self.endInsertRows()
+
+    def set_codes(self, codes):
+        """
+        Filters the rows by event type.
+
+        Args:
+            codes (iterable or None): The event codes to show. None shows every event.
+        """
+        self.beginResetModel()
+        self.codes = None if codes is None else [int(code) for code in codes]
+        self._index = self._matching(0)
+        self.endResetModel()
+
+    def _matching(self, start, records=None):
+        """
+        Returns the indices of the records from ``start`` on that pass the filter.
+
+        Args:
+            start (int): The index of the first record to check.
+            records (np.ndarray, optional): The records. Default is the shown records.
+
+        Returns:
+            np.ndarray or None: The indices, or None if there is no filter.
+        """
+        if self.codes is None:
+            return None
+        records = self._records if records is None else records
+        return np.flatnonzero(np.isin(records["code"][start:], self.codes)) + start
+
+    def record(self, row):
+        """
+        Returns the record shown in a row.
+
+        Args:
+            row (int): The row.
+
+        Returns:
+            np.void: The record.
+        """
+        return self._records[row if self._index is None else self._index[row]]
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._records) if self._index is None else len(self._index)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or self.log is None:
+            return None
+        if role == Qt.DisplayRole:
+            return self.log.format(self.record(index.row()))
+        if role == Qt.ToolTipRole:
+            record = self.record(index.row())
+            code = EventCode(int(record["code"]))
+            return f"Step {int(record['step'])}, cell [{int(record['x'])}][{int(record['y'])}], {code.name}"
+        return None
@@ -1,5 +1,5 @@
-import tracemalloc
-from PyQt5.QtGui import QBrush
+import numpy as np
+from PyQt5.QtGui import QBrush, QPen
 from PyQt5.QtWidgets import (
     QWidget,
     QVBoxLayout,
@@ -13,12 +13,17 @@ from PyQt5.QtWidgets import (
     QTextEdit,
     QGraphicsRectItem,
     QGraphicsScene,
-    QGraphicsView,
     QTabWidget,
+    QHBoxLayout,
+    QProgressBar,
+    QListView,
 )
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt, QThread, QTimer
 
-from aifield.simulation import Simulation
+from aifield.board_view import DISARMED_COLOR, LABEL_COLORS, BoardImageItem, BoardView
+from aifield.event_log import EventCode
+from aifield.event_log_model import EventLogModel
+from aifield.simulation_worker import SimulationWorker
 
 
 class MainWindow(QWidget):
@@ -35,31 +40,52 @@ class MainWindow(QWidget):
         size_of_board_input (QSpinBox): Input field for the size of the board.
         path_type_input (QComboBox): Dropdown menu for selecting the path type.
         tabs (QTabWidget): Tab widget containing the board visualization and log.
-        board_view (QGraphicsView): Graphics view for the board visualization.
+        board_view (BoardView): Graphics view for the board visualization, with zoom and pan.
         board_scene (QGraphicsScene): Graphics scene for the board visualization.
-        simulation_output (QTextEdit): Text area for displaying the simulation log.
-        simulation (Simulation): The simulation instance.
-        simulation_generator (generator): The generator for the simulation steps.
-        timer (QTimer): Timer for updating the simulation steps.
-        board_items (dict): Dictionary to store the graphical items representing the board cells.
+        simulation_output (QTextEdit): Text area for displaying the results of the simulation.
+        log_filter (QComboBox): Dropdown menu for selecting the type of events shown in the log.
+        log_model (EventLogModel): Model of the events of the simulation's log.
+        log_view (QListView): List view of the events, formatting only the visible rows.
+        run_button (QPushButton): Button starting a simulation.
+        pause_button (QPushButton): Button pausing and resuming the running simulation.
+        cancel_button (QPushButton): Button cancelling the running simulation.
+        progress_bar (QProgressBar): The steps of the path done by the running simulation.
+        progress_label (QLabel): The phase, throughput and estimated time left of the running simulation.
+        simulation (Simulation): The simulation instance, once the worker has built it.
+        worker (SimulationWorker): The worker running the simulation.
+        worker_thread (QThread): The thread of the worker.
+        board_image (BoardImageItem): Graphical item drawing every cell of the board from one RGBA buffer.
         soldier_item (QGraphicsRectItem): Graphical item representing the soldier's position.
         board_size (int): The size of the board.
-        cell_size (int): The size of each cell in the board visualization.
 
     Methods:
         initUI(): Initializes the user interface.
-        run_simulation(): Starts the simulation with the specified parameters.
+        run_simulation(): Starts the simulation with the specified parameters in a worker thread.
+        toggle_pause(): Pauses or resumes the running simulation.
+        cancel_simulation(): Cancels the running simulation.
         init_board_visualization(size_of_board): Initializes the board visualization.
-        update_simulation(): Updates the simulation and the board visualization.
+        update_simulation(batch): Updates the board visualization with a batch of steps.
+        update_progress(done, total, throughput, eta): Shows the progress of the running simulation.
+        simulation_finished(outcome): Restores the controls and shows the results of a completed simulation.
+        update_log(records): Appends the new events of the running simulation to the log.
+        filter_log(): Shows the events of the type selected in the log filter.
+        mark_disarmed(rows, cols): Colors the cells where a mine or bomb was disarmed.
         update_board_visualization(i, j): Updates the color of a cell in the board visualization.
         display_simulation_results(): Displays the results of the simulation in the log.
     """
 
+    ANIMATION_FRAMES = 200
+    MAX_BOARD_SIZE = 5000
+    LOG_LAYOUT_BATCH = 10000
+
     def __init__(self):
         """
         Initializes the main window.
         """
         super().__init__()
+        self.simulation = None
+        self.worker = None
+        self.worker_thread = None
         self.initUI()
 
     def initUI(self):
@@ -106,37 +132,75 @@ class MainWindow(QWidget):
 
         # Size of Board
         self.size_of_board_input = QSpinBox()
-        self.size_of_board_input.setRange(5, 20)
+        self.size_of_board_input.setRange(5, self.MAX_BOARD_SIZE)
         self.size_of_board_input.setValue(10)
         self.formLayout.addRow(QLabel("Size of Board"), self.size_of_board_input)
 
         # Path Type
         self.path_type_input = QComboBox()
-        path_types = ["Horizontal", "Diagonal"]
+        path_types = ["Horizontal", "Diagonal", "RiskAware"]
         self.path_type_input.addItems(path_types)
         self.formLayout.addRow(QLabel("Path Type"), self.path_type_input)
 
         self.layout.addLayout(self.formLayout)
 
         # Run Simulation Button
-        run_button = QPushButton("Run Simulation")
-        run_button.clicked.connect(self.run_simulation)
-        self.layout.addWidget(run_button)
+        self.run_button = QPushButton("Run Simulation")
+        self.run_button.clicked.connect(self.run_simulation)
+        self.layout.addWidget(self.run_button)
+
+        # Progress, pause and cancel of the running simulation
+        controls = QHBoxLayout()
+        self.progress_bar = QProgressBar()
+        controls.addWidget(self.progress_bar)
+        self.pause_button = QPushButton("Pause")
+        self.pause_button.setEnabled(False)
+        self.pause_button.clicked.connect(self.toggle_pause)
+        controls.addWidget(self.pause_button)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_simulation)
+        controls.addWidget(self.cancel_button)
+        self.layout.addLayout(controls)
+        self.progress_label = QLabel()
+        self.layout.addWidget(self.progress_label)
 
         # Tab Widget
         self.tabs = QTabWidget()
 
         # Board Visualization
-        self.board_view = QGraphicsView()
+        self.board_view = BoardView()
         self.board_scene = QGraphicsScene()
         self.board_view.setScene(self.board_scene)
         self.tabs.addTab(self.board_view, "Board Visualization")
 
-        # Simulation Output Log
+        # Simulation Results and Log
+        log_tab = QWidget()
+        log_layout = QVBoxLayout(log_tab)
         self.simulation_output = QTextEdit()
         self.simulation_output.setReadOnly(True)
-        self.simulation_output.setMinimumHeight(200)
-        self.tabs.addTab(self.simulation_output, "Logs and Results")
+        self.simulation_output.setMaximumHeight(160)
+        log_layout.addWidget(self.simulation_output)
+
+        log_form = QFormLayout()
+        self.log_filter = QComboBox()
+        self.log_filter.addItem("All events", None)
+        for code in EventCode:
+            self.log_filter.addItem(code.name.replace("_", " ").capitalize(), int(code))
+        self.log_filter.currentIndexChanged.connect(self.filter_log)
+        log_form.addRow(QLabel("Events"), self.log_filter)
+        log_layout.addLayout(log_form)
+
+        # Wiersze o stałej wysokości - widok formatuje tylko widoczne zdarzenia, a układ liczy partiami w tle
+        self.log_model = EventLogModel(self)
+        self.log_view = QListView()
+        self.log_view.setModel(self.log_model)
+        self.log_view.setUniformItemSizes(True)
+        self.log_view.setLayoutMode(QListView.Batched)
+        self.log_view.setBatchSize(self.LOG_LAYOUT_BATCH)
+        self.log_view.setMinimumHeight(200)
+        log_layout.addWidget(self.log_view)
+        self.tabs.addTab(log_tab, "Logs and Results")
 
         self.tabs.setCurrentIndex(0)  # Set the board tab as the default
 
@@ -148,94 +212,223 @@ class MainWindow(QWidget):
 
     def run_simulation(self):
         """
-        Starts the simulation with the specified parameters.
+        Starts the simulation with the specified parameters in a worker thread.
+
+        The board, the training and the walk run in the thread; the window keeps handling events and receives the
+        batches of steps and the progress through signals.
         """
         size_of_board = self.size_of_board_input.value()
         mine_probability = self.mine_probability_input.value()
         classifier_name = self.classifier_input.currentText()
         type_of_path = self.path_type_input.currentText()
         amount_of_soldiers = int(self.amount_of_soldiers_input.text())
-
-        self.simulation = Simulation(size_of_board, mine_probability, classifier_name, type_of_path, amount_of_soldiers)
+        if self.worker_thread is not None:
+            self.worker_thread.wait()
 
         # Initialize board visualization
+        self.simulation = None
+        self.simulation_output.clear()
         self.init_board_visualization(size_of_board)
 
-        # Start memory tracking
-        tracemalloc.start()
+        # Run simulation in batches of steps, so the animation takes about the same number of frames on any board
+        batch_size = max(1, size_of_board * size_of_board // self.ANIMATION_FRAMES)
+        interval = 0.15 if size_of_board <= 10 else 0.05
+        self.worker = SimulationWorker(
+            size_of_board, mine_probability, classifier_name, type_of_path, amount_of_soldiers, batch_size, interval
+        )
+        self.worker_thread = QThread()
+        self.worker.moveToThread(self.worker_thread)
+        self.worker_thread.started.connect(self.worker.run)
+        self.worker.status.connect(self.progress_label.setText)
+        self.worker.ready.connect(self.simulation_ready)
+        self.worker.batch_ready.connect(self.update_simulation)
+        self.worker.progress.connect(self.update_progress)
+        self.worker.logged.connect(self.update_log)
+        self.worker.failed.connect(self.simulation_output.setText)
+        self.worker.finished.connect(self.worker_thread.quit)
+        self.worker.finished.connect(self.simulation_finished)
+
+        self.run_button.setEnabled(False)
+        self.pause_button.setEnabled(True)
+        self.pause_button.setText("Pause")
+        self.cancel_button.setEnabled(True)
+        self.progress_bar.setRange(0, 0)
+        self.worker_thread.start()
+
+    def simulation_ready(self, simulation):
+        """
+        Keeps the simulation built by the worker, whose board colors the visualization and whose events fill the log.
+
+        Args:
+            simulation (Simulation): The simulation.
+        """
+        self.simulation = simulation
+        self.log_model.set_log(simulation.events)
+
+    def update_log(self, records):
+        """
+        Appends the new events of the running simulation to the log.
 
-        # Run simulation step by step
-        self.simulation_generator = self.simulation.simulate()
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_simulation)
-        if size_of_board <= 10:
-            self.timer.start(150)  # Update every 1000 ms (1 second)
+        Args:
+            records (np.ndarray): The records of the simulation's event log, flushed by the worker.
+        """
+        # Zdarzenia z poprzedniego, już zastąpionego workera są pomijane
+        if self.sender() is self.worker:
+            self.log_model.update_records(records)
+
+    def filter_log(self):
+        """
+        Shows the events of the type selected in the log filter.
+        """
+        code = self.log_filter.currentData()
+        self.log_model.set_codes(None if code is None else [code])
+
+    def toggle_pause(self):
+        """
+        Pauses or resumes the running simulation.
+        """
+        if self.worker is None:
+            return
+        if self.worker.is_paused:
+            self.worker.resume()
+            self.pause_button.setText("Pause")
         else:
-            self.timer.start(50)
+            self.worker.pause()
+            self.pause_button.setText("Resume")
+
+    def cancel_simulation(self):
+        """
+        Cancels the running simulation; it stops after the current batch or phase.
+        """
+        if self.worker is not None:
+            self.worker.cancel()
+            self.cancel_button.setEnabled(False)
+            self.progress_label.setText("Cancelling")
+
+    def update_progress(self, done, total, throughput, eta):
+        """
+        Shows the progress of the running simulation.
+
+        Args:
+            done (int): The steps done.
+            total (int): The length of the path.
+            throughput (float): The steps per second.
+            eta (float): The estimated seconds left, NaN while unknown.
+        """
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(done)
+        eta_text = "--" if eta != eta else f"{eta:.1f} s"
+        self.progress_label.setText(f"{done:,} / {total:,} steps | {throughput:,.0f} steps/s | ETA {eta_text}")
+
+    def simulation_finished(self, outcome):
+        """
+        Restores the controls and shows the results of a completed simulation.
+
+        Args:
+            outcome (str): "completed", "cancelled" or "failed".
+        """
+        self.run_button.setEnabled(True)
+        self.pause_button.setEnabled(False)
+        self.cancel_button.setEnabled(False)
+        if self.progress_bar.maximum() == 0:
+            self.progress_bar.setRange(0, 1)
+        if outcome == "completed":
+            self.progress_label.setText(f"Completed {self.progress_bar.value():,} steps")
+            self.display_simulation_results()
+        else:
+            self.progress_label.setText(outcome.capitalize())
+
+    def closeEvent(self, event):
+        """
+        Cancels a running simulation and waits for its thread before the window closes.
+        """
+        if self.worker_thread is not None and self.worker_thread.isRunning():
+            self.worker.cancel()
+            self.worker_thread.wait()
+        super().closeEvent(event)
 
     def init_board_visualization(self, size_of_board):
         """
-        Initializes the board visualization.
+        Initializes the board visualization: one image item with a pixel per cell, scaled to fit the view.
 
         Args:
             size_of_board (int): The size of the board.
         """
         self.board_scene.clear()
-        self.board_items = {}
         self.board_size = size_of_board
-        self.cell_size = 20
-
-        for i in range(size_of_board):
-            for j in range(size_of_board):
-                rect = QGraphicsRectItem(j * self.cell_size, i * self.cell_size, self.cell_size, self.cell_size)
-                rect.setBrush(QBrush(Qt.white))
-                self.board_scene.addItem(rect)
-                self.board_items[(i, j)] = rect
-
-        self.soldier_item = QGraphicsRectItem(0, 0, self.cell_size, self.cell_size)
+        self.board_image = BoardImageItem(size_of_board)
+        self.board_scene.addItem(self.board_image)
+        self.board_scene.setSceneRect(self.board_image.boundingRect())
+
+        pen = QPen(Qt.blue)
+        pen.setCosmetic(True)
+        pen.setWidth(2)
+        self.soldier_item = QGraphicsRectItem(0, 0, 1, 1)
         self.soldier_item.setBrush(QBrush(Qt.blue))
+        self.soldier_item.setPen(pen)
+        self.soldier_item.setZValue(1)
         self.board_scene.addItem(self.soldier_item)
 
-    def update_simulation(self):
+        self.board_view.resetTransform()
+        self.board_view.fit()
+
+    def update_simulation(self, batch):
         """
-        Updates the simulation and the board visualization.
+        Updates the board visualization with a batch of steps of the running simulation.
+
+        Args:
+            batch (StepBatch): The batch.
         """
-        try:
-            i, j = next(self.simulation_generator)
-            self.update_board_visualization(i, j)
-        except StopIteration:
-            self.timer.stop()
-            self.display_simulation_results()
+        if len(batch) == 0 or self.simulation is None:
+            return
+        labels = self.simulation.board.array[batch.rows, batch.cols]
+        self.board_image.paint_cells(batch.rows, batch.cols, LABEL_COLORS[labels])
+        self.soldier_item.setRect(int(batch.cols[-1]), int(batch.rows[-1]), 1, 1)
 
-    def update_board_visualization(self, i, j):
+        rows, cols = batch.rows[batch.disarmed], batch.cols[batch.disarmed]
+        if rows.size:
+            image = self.board_image
+            QTimer.singleShot(500, lambda: self.mark_disarmed(rows, cols, image))
+
+    def mark_disarmed(self, rows, cols, image=None):
+        """
+        Colors the cells where a mine or bomb was disarmed.
+
+        Args:
+            rows (np.ndarray): The x-coordinates of the cells.
+            cols (np.ndarray): The y-coordinates of the cells.
+            image (BoardImageItem, optional): The board image the cells belong to. Nothing is painted if it is no
+                longer the current one, e.g. when a new simulation started meanwhile. Default is the current image.
+        """
+        if image is None:
+            image = self.board_image
+        elif image is not self.board_image:
+            return
+        image.paint_cells(rows, cols, DISARMED_COLOR)
+
+    def update_board_visualization(self, i, j, check_disarmed=True):
         """
         Updates the color of a cell in the board visualization.
 
         Args:
             i (int): The x-coordinate of the cell.
             j (int): The y-coordinate of the cell.
+            check_disarmed (bool, optional): Whether to look the cell up in the disarmed locations. Default is True.
         """
-        if (i, j) not in self.board_items:
+        if not (0 <= i < self.board_size and 0 <= j < self.board_size):
             return
 
-        current_label = self.simulation.board.array[i][j]
-        if current_label == 1:
-            color = Qt.yellow  # Mine
-        elif current_label == 2:
-            color = Qt.red  # Bomb
-        else:
-            color = Qt.green  # Safe
-
-        self.board_items[(i, j)].setBrush(QBrush(color))
-        if self.soldier_item:
-            self.soldier_item.setRect(j * self.cell_size, i * self.cell_size, self.cell_size, self.cell_size)
+        rows, cols = np.array([i]), np.array([j])
+        self.board_image.paint_cells(rows, cols, LABEL_COLORS[self.simulation.board.array[i, j]])
+        self.soldier_item.setRect(j, i, 1, 1)
 
-        if (i, j) in self.simulation.disarmed_locations:
-            QTimer.singleShot(500, lambda: self.board_items[(i, j)].setBrush(QBrush(Qt.darkGreen)))
+        if check_disarmed and (i, j) in self.simulation.disarmed_locations:
+            image = self.board_image
+            QTimer.singleShot(500, lambda: self.mark_disarmed(rows, cols, image))
 
     def display_simulation_results(self):
         """
-        Displays the results of the simulation in the log.
+        Displays the results of the simulation above the log of its events.
         """
         results = (
             f"Survivors: {self.simulation.survivors}/{self.simulation.amount_of_soldiers}\n"
@@ -246,5 +439,5 @@ class MainWindow(QWidget):
             f"Remaining special soldiers: {len(self.simulation._special_soldiers)}\n"
             f"Classifier Accuracy - (metric : percentage of good predictions along the route): {self.simulation.accuracy * 100:.2f}%\n"
         )
-        results += "\nRandom Events Log:\n" + "\n".join(self.simulation.random_events_log)
+        results += f"Events in the log: {len(self.simulation.events):,}\n"
         self.simulation_output.setText(results)
@@ -0,0 +1,382 @@
+from collections import deque
+
+import numpy as np
+
+from aifield.event_log import EventCode
+from aifield.random_streams import EVENT_ENEMY, EVENT_FOUND_KIT, draw_integers
+from aifield.troops import HEAVY, SAPPER
+
+
+class PathKernel:
+    """
+    The fast mode of a simulation: the walk along the path computed over arrays instead of one generator step at a
+    time.
+
+    Every step has two parts: the cell, where a bad prediction may hit a mine or a bomb, and the random event.
+    Counters that do not depend on the state of the troops (good predictions, mines and bombs disarmed after a good
+    prediction) are counted with numpy over whole chunks of the path. Every part changes the survivors by a delta
+    that is known in advance once there are no special soldiers, so the survivors follow a walk clamped at zero and
+    computed with cumulative sums. Only the parts that involve the roster (missed mines and bombs, found kits and
+    enemies while Heavies are left) go through a tight loop over Python lists.
+
+    The kernel produces the same counters as the step-by-step generator for the same seed, but records no events;
+    only the counts of the special-forces events are added to ``simulation.events``. Cells disarmed during the walk
+    are marked in ``simulation.disarmed_grid``.
+
+    Attributes:
+        simulation (Simulation): The simulation whose state is advanced.
+        planner (PathPlanner): The planner giving the cells of the path.
+        length (int): The number of steps of the path.
+    """
+
+    CHUNK_SIZE = 1 << 16
+    ROSTER_CHUNK_SIZE = 1 << 10
+    # Liczba możliwych wartości i znak zmiany liczby żołnierzy dla zdarzeń 1-3 (zestaw, wróg, rekruci)
+    EVENT_SPANS = np.array([0, 0, 5, 3], dtype=np.int32)
+    EVENT_SIGNS = np.array([0, 0, -1, 1], dtype=np.int32)
+
+    def __init__(self, simulation):
+        """
+        Initializes the kernel of a simulation whose predictions are already made.
+
+        Args:
+            simulation (Simulation): The simulation to advance. Its ``prediction_grid`` must be filled.
+        """
+        self.simulation = simulation
+        self.planner = simulation.planner
+        self.length = self.planner.length
+        low, high = (25, 50) if simulation.amount_of_soldiers >= 500 else (5, 15)
+        # Ofiary chybionej miny (1-5) lub bomby, indeksowane etykietą pola
+        self._cell_tables = (np.array([0, 5, high - low + 1], dtype=np.int32), np.array([0, 1, low], dtype=np.int32))
+        if simulation.disarmed_grid is None:
+            simulation.disarmed_grid = simulation.board.new_grid("disarmed_grid", bool)
+        # Zero survivors after the last event of a chunk: the roster still meets the next cell, then it is cleared.
+        # Between steps that is the only way to have no survivors and a roster, e.g. in a resumed simulation.
+        self._clear_pending = simulation.survivors == 0 and len(simulation._special_soldiers) > 0
+        self._roster_chunk_size = self.ROSTER_CHUNK_SIZE
+
+    def advance(self, stop):
+        """
+        Runs the walk from the current step of the simulation up to a step.
+
+        While the roster is not empty, chunks start at ``ROSTER_CHUNK_SIZE`` steps and double up to ``CHUNK_SIZE``,
+        so little of the roster loop is run again when the survivors drop to zero early.
+
+        Args:
+            stop (int): The step after the last one to run. It is capped at the length of the path.
+        """
+        simulation = self.simulation
+        stop = min(stop, self.length)
+        self._load()
+        while simulation._step < stop:
+            size = self.CHUNK_SIZE
+            if self._heavies or self._sappers:
+                # Krótkie fragmenty, dopóki oddziały specjalne żyją - zwykle wszyscy giną szybko
+                size = self._roster_chunk_size
+                self._roster_chunk_size = min(2 * size, self.CHUNK_SIZE)
+            end = min(simulation._step + size, stop)
+            self._advance_chunk(simulation._step, end)
+            simulation._step = end
+        self._store()
+
+    def _advance_chunk(self, start, stop):
+        """
+        Runs the walk over the steps from start (inclusive) to stop (exclusive).
+
+        Parts are indexed as ``2 * step`` for the cell and ``2 * step + 1`` for the random event of a step, relative
+        to the start of the chunk.
+
+        Args:
+            start (int): The first step.
+            stop (int): The step after the last one.
+        """
+        simulation = self.simulation
+        rows, cols = self.planner.coordinates(start, stop)
+        labels = simulation.board.array[rows, cols]
+        predictions = simulation.prediction_grid[rows, cols]
+        events, casualty_draws, amount_draws = simulation._draws.range(start, stop)
+
+        correct = labels == predictions
+        found = np.flatnonzero(correct & (labels != 0))
+        simulation._good_predictions += int(np.count_nonzero(correct))
+        bombs = int(np.count_nonzero(labels[found] == 2))
+        simulation.disarmed_mines += found.size - bombs
+        simulation.disarmed_bombs += bombs
+        simulation.disarmed_grid[rows[found], cols[found]] = True
+
+        # Zmiany liczby żołnierzy bez oddziałów specjalnych, z tablic indeksowanych etykietą i typem zdarzenia
+        missed = ~correct & (labels != 0)
+        cell_span, cell_low = self._cell_tables
+        casualties = (casualty_draws * cell_span[labels]).astype(np.int32) + cell_low[labels]
+        amounts = (amount_draws * self.EVENT_SPANS[events]).astype(np.int32) + 1
+        deltas = np.empty(2 * labels.size, dtype=np.int32)
+        np.multiply(casualties, missed, out=deltas[0::2])
+        np.negative(deltas[0::2], out=deltas[0::2])
+        np.multiply(amounts, self.EVENT_SIGNS[events], out=deltas[1::2])
+
+        offset = 0
+        if self._clear_pending or self._heavies or self._sappers:
+            context = (labels.tolist(), events.tolist(), draw_integers(amount_draws, 1, 2).tolist())
+            if self._clear_pending:
+                self._commit(self._react([0] if missed[0] else [], context), rows, cols)
+                self._clear_roster()
+                offset = 1
+            if self._heavies or self._sappers:
+                offset = self._walk_with_roster(deltas, missed, events, context, rows, cols)
+        self._walk_clamped(deltas[offset:])
+
+    def _walk_with_roster(self, deltas, missed, events, context, rows, cols):
+        """
+        Runs the walk of a chunk while the roster is not empty, up to the part where it is cleared.
+
+        The roster does not depend on the survivors until they drop to zero and the roster is cleared, so the parts
+        involving the roster are run first and the survivors are checked afterwards. If they drop to zero inside the
+        chunk, the roster is restored and run again up to that point.
+
+        Args:
+            deltas (np.ndarray): The changes of the survivors of every part with an empty roster.
+            missed (np.ndarray): Whether the prediction of every cell missed a mine or bomb.
+            events (np.ndarray): The type of the random event of every step.
+            context (tuple): Labels, event types and kit amounts of the steps of the chunk, as lists.
+            rows (np.ndarray): The x-coordinates of the steps of the chunk.
+            cols (np.ndarray): The y-coordinates of the steps of the chunk.
+
+        Returns:
+            int: The first part of the chunk left to run with an empty roster.
+        """
+        simulation = self.simulation
+        involved = np.zeros(deltas.size, dtype=bool)
+        involved[0::2] = missed
+        if self._sappers:
+            involved[1::2] |= events == EVENT_FOUND_KIT
+        if self._heavies:
+            involved[1::2] |= events == EVENT_ENEMY
+        parts = np.flatnonzero(involved).tolist()
+
+        snapshot = self._snapshot()
+        outcome = self._react(parts, context)
+        walk = deltas.copy()
+        changes = outcome[0]
+        if changes:
+            indices, values = zip(*changes)
+            walk[list(indices)] = values
+        levels = simulation.survivors + np.cumsum(walk, dtype=np.int64)
+        zeros = np.flatnonzero(levels <= 0)
+        if zeros.size == 0:
+            self._commit(outcome, rows, cols)
+            simulation.survivors = int(levels[-1])
+            return deltas.size
+
+        # Wszyscy zginęli - powtarzamy przebieg do tego miejsca i czyścimy oddziały specjalne
+        zero = int(zeros[0])
+        self._restore(snapshot)
+        self._commit(self._react([part for part in parts if part <= zero], context), rows, cols)
+        simulation.survivors = 0
+        if zero % 2 == 0:
+            self._clear_roster()
+            return zero + 1
+        if zero + 1 == deltas.size:
+            self._clear_pending = True
+            return deltas.size
+        self._commit(self._react([zero + 1] if missed[(zero + 1) // 2] else [], context), rows, cols)
+        self._clear_roster()
+        return zero + 2
+
+    def _walk_clamped(self, deltas):
+        """
+        Applies changes of the survivors that never let them go below zero, with an empty roster.
+
+        Args:
+            deltas (np.ndarray): The changes of the survivors of consecutive parts.
+        """
+        if deltas.size == 0:
+            return
+        levels = self.simulation.survivors + np.cumsum(deltas, dtype=np.int64)
+        self.simulation.survivors = int(levels[-1] - min(0, levels.min()))
+
+    def _react(self, parts, context):
+        """
+        Runs the parts of a chunk that involve the roster, in order, updating the roster.
+
+        Args:
+            parts (list): The parts of the chunk, sorted.
+            context (tuple): Labels, event types and kit amounts of the steps of the chunk, as lists.
+
+        Returns:
+            tuple: Pairs of a part and the change of the survivors replacing its change with an empty roster, the
+            steps where a Sapper disarmed a mine or bomb, the numbers of those mines and bombs, the number of found
+            kits and the numbers of special-forces interventions, Heavy saves, Heavy deaths and Sapper deaths.
+        """
+        labels, events, kit_amounts = context
+        heavies, sappers = self._heavies, self._sappers
+        health, armor, kits, order = self._health, self._armor, self._kits, self._order
+        next_order = self._next_order
+        changes = []
+        disarmed = []
+        mines = bombs = found_kits = 0
+        interventions = heavy_saves = heavy_deaths = sapper_deaths = 0
+        kit_event = EVENT_FOUND_KIT
+
+        for part in parts:
+            step = part >> 1
+            if part & 1:
+                if events[step] == kit_event:
+                    if sappers:
+                        index = sappers.popleft()
+                        kits[index] += kit_amounts[step]
+                        order[index] = next_order
+                        next_order += 1
+                        sappers.append(index)
+                        found_kits += 1
+                elif heavies:
+                    index = heavies.popleft()
+                    health[index] = 0
+                    armor[index] = 0
+                    changes.append((part, -1))
+                continue
+
+            if not heavies and not sappers:
+                continue
+            interventions += 1
+            label = labels[step]
+            if not sappers or (heavies and order[heavies[-1]] > order[sappers[-1]]):
+                index = heavies.pop()
+                if label == 1:
+                    if armor[index] >= 50:
+                        armor[index] -= 50
+                    elif health[index] >= 50:
+                        health[index] -= 50
+                elif armor[index] > 50:
+                    armor[index] -= 100
+                elif armor[index] == 50:
+                    armor[index] = 0
+                    health[index] = 50
+                else:
+                    health[index] = 0
+                if health[index] != 0:
+                    order[index] = next_order
+                    next_order += 1
+                    heavies.append(index)
+                    changes.append((part, 0))
+                    heavy_saves += 1
+                else:
+                    changes.append((part, -1))
+                    heavy_deaths += 1
+            else:
+                index = sappers.pop()
+                # Saper zużywa jeden zestaw na minę i dwa na bombę
+                if kits[index] >= label:
+                    kits[index] -= label
+                    order[index] = next_order
+                    next_order += 1
+                    sappers.append(index)
+                    changes.append((part, 0))
+                    disarmed.append(step)
+                    if label == 1:
+                        mines += 1
+                    else:
+                        bombs += 1
+                else:
+                    health[index] = 0
+                    changes.append((part, -1))
+                    sapper_deaths += 1
+
+        self._next_order = next_order
+        return (
+            changes,
+            disarmed,
+            mines,
+            bombs,
+            found_kits,
+            interventions,
+            heavy_saves,
+            heavy_deaths,
+            sapper_deaths,
+        )
+
+    def _commit(self, outcome, rows, cols):
+        """
+        Adds the outcome of the parts involving the roster to the counters of the simulation and to the counts of
+        the special-forces events of its log.
+
+        Args:
+            outcome (tuple): The result of :meth:`_react`.
+            rows (np.ndarray): The x-coordinates of the steps of the chunk.
+            cols (np.ndarray): The y-coordinates of the steps of the chunk.
+        """
+        simulation = self.simulation
+        _, disarmed, mines, bombs, found_kits, interventions, heavy_saves, heavy_deaths, sapper_deaths = outcome
+        simulation.disarmed_mines += mines
+        simulation.disarmed_bombs += bombs
+        simulation.found_kits += found_kits
+        counts = simulation.events.counts
+        counts[EventCode.SPECIAL_FORCES] += interventions
+        counts[EventCode.HEAVY_SAVES] += heavy_saves
+        counts[EventCode.HEAVY_DIED] += heavy_deaths
+        counts[EventCode.SAPPER_DISARMED_MINE] += mines
+        counts[EventCode.SAPPER_DISARMED_BOMB] += bombs
+        counts[EventCode.SAPPER_DIED] += sapper_deaths
+        if disarmed:
+            simulation.disarmed_grid[rows[disarmed], cols[disarmed]] = True
+
+    def _load(self):
+        """
+        Copies the state of the roster into Python lists used by the loop.
+        """
+        roster = self.simulation._special_soldiers
+        self._heavies = roster._queues[HEAVY]
+        self._sappers = roster._queues[SAPPER]
+        self._health = roster.health.tolist()
+        self._armor = roster.armor.tolist()
+        self._kits = roster.kits.tolist()
+        self._order = roster.order.tolist()
+        self._next_order = roster._next_order
+
+    def _store(self):
+        """
+        Writes the state kept in Python lists back into the arrays of the roster.
+        """
+        roster = self.simulation._special_soldiers
+        roster.health[:] = self._health
+        roster.armor[:] = self._armor
+        roster.kits[:] = self._kits
+        roster.order[:] = self._order
+        roster._next_order = self._next_order
+
+    def _snapshot(self):
+        """
+        Returns a copy of the state of the roster, so a chunk can be run again.
+
+        Returns:
+            tuple: Copies of the queues, the columns and the next sequence number.
+        """
+        return (
+            deque(self._heavies),
+            deque(self._sappers),
+            self._health[:],
+            self._armor[:],
+            self._kits[:],
+            self._order[:],
+            self._next_order,
+        )
+
+    def _restore(self, snapshot):
+        """
+        Restores the state of the roster from a snapshot.
+
+        Args:
+            snapshot (tuple): The result of :meth:`_snapshot`.
+        """
+        heavies, sappers, self._health, self._armor, self._kits, self._order, self._next_order = snapshot
+        self._heavies.clear()
+        self._heavies.extend(heavies)
+        self._sappers.clear()
+        self._sappers.extend(sappers)
+
+    def _clear_roster(self):
+        """
+        Removes every soldier from the roster, as the random event after the survivors drop to zero does.
+        """
+        self._heavies.clear()
+        self._sappers.clear()
+        self._clear_pending = False
@@ -0,0 +1,119 @@
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    A thread-safe least-recently-used cache bounded by entry count and, optionally, by total size in bytes.
+
+    Attributes:
+        max_entries (int or None): The maximum number of entries, or None for no limit.
+        max_bytes (int or None): The maximum total size of the entries in bytes, or None for no limit.
+        total_bytes (int): The current total size of the entries in bytes.
+    """
+
+    def __init__(self, max_entries=None, max_bytes=None, size_of=None):
+        """
+        Initializes an empty cache.
+
+        Args:
+            max_entries (int, optional): The maximum number of entries. Default is no limit.
+            max_bytes (int, optional): The maximum total size of the entries in bytes. Default is no limit.
+            size_of (callable, optional): Returns the size of a value in bytes. Required when max_bytes is set.
+        """
+        if max_bytes is not None and size_of is None:
+            raise ValueError("size_of is required when max_bytes is set")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._size_of = size_of
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Returns the value stored under a key and marks it as most recently used.
+
+        Args:
+            key (hashable): The key to look up.
+            default (object, optional): The value returned when the key is missing.
+
+        Returns:
+            object: The stored value or the default.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value):
+        """
+        Stores a value unless the key is already present, then evicts the least recently used entries over budget.
+
+        Keeping the first stored value means concurrent builders of the same entry all end up sharing one object.
+
+        Args:
+            key (hashable): The key to store the value under.
+            value (object): The value to store.
+
+        Returns:
+            object: The value held by the cache for the key.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry[0]
+
+            size = self._size_of(value) if self._size_of is not None else 0
+            if self.max_bytes is not None and size > self.max_bytes:
+                return value
+
+            self._entries[key] = (value, size)
+            self.total_bytes += size
+            self._evict()
+            return value
+
+    def configure(self, max_entries=None, max_bytes=None):
+        """
+        Changes the limits of the cache and evicts entries that no longer fit.
+
+        Args:
+            max_entries (int, optional): The maximum number of entries. Default is no limit.
+            max_bytes (int, optional): The maximum total size of the entries in bytes. Default is no limit.
+        """
+        if max_bytes is not None and self._size_of is None:
+            raise ValueError("size_of is required when max_bytes is set")
+        with self._lock:
+            self.max_entries = max_entries
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        """
+        Removes all entries.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def _evict(self):
+        """
+        Drops the least recently used entries until the cache fits its limits. Must be called with the lock held.
+        """
+        while self._entries and (
+            (self.max_entries is not None and len(self._entries) > self.max_entries)
+            or (self.max_bytes is not None and self.total_bytes > self.max_bytes)
+        ):
+            _, (_, size) = self._entries.popitem(last=False)
+            self.total_bytes -= size
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
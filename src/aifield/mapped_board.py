@@ -0,0 +1,289 @@
+import json
+import os
+from functools import partial
+
+import numpy as np
+
+from aifield.board import Board
+from aifield.dataset_registry import DataRegistry
+from aifield.pipeline import TilePipeline
+from aifield.random_streams import child_sequence
+
+
+class MappedBoard(Board):
+    """
+    A board stored in memory-mapped files on disk, for boards larger than RAM.
+
+    The board array and the feature indices are ``.npy`` files in the board's directory, opened as memory maps. They
+    are generated in tiles of whole rows, about ``TILE_CELLS`` cells each. Tile ``t`` has its own generator, seeded
+    with child ``t`` of the board's seed sequence. Any tile can therefore be generated on its own, and only one tile
+    is held in memory at a time. The number of mines and bombs is counted while the tiles are generated.
+
+    Within a tile, samples of a class are used without replacement while unique ones remain, and the rest are drawn
+    with replacement. The board is reproducible from its seed, but it differs from the in-memory :class:`Board` of
+    the same seed. Grids of the simulation created with :meth:`new_grid`, such as the predictions, are stored next
+    to the board.
+
+    Tiles are generated, and the predictions of :meth:`predict_grid` gathered, across the workers of the board's
+    :class:`TilePipeline`. Every worker writes its tile straight into the files, so the board is the same for any
+    number of workers. Boards are pickled without their arrays and reopen the files when unpickled, so process
+    workers receive only the parameters of the board.
+
+    Attributes:
+        directory (str): The directory of the board's files.
+        seed_sequence (np.random.SeedSequence): The seed sequence the tiles are generated from.
+        tile_rows (int): The number of rows of a tile.
+        pipeline (TilePipeline): The pool the tiles are processed on.
+    """
+
+    TILE_CELLS = 1 << 22
+    METADATA_FILE = "board.json"
+
+    def __init__(
+        self,
+        size_of_board,
+        mine_probability,
+        directory,
+        split=None,
+        feature_dtype=np.float32,
+        rng=None,
+        pipeline=None,
+    ):
+        """
+        Generates the board into files in a directory, tile by tile.
+
+        Args:
+            size_of_board (int): The size of the board (size x size).
+            mine_probability (float): The probability of a cell containing a mine or bomb.
+            directory (str): The directory of the board's files. It is created if needed; files of an earlier board
+                there are overwritten.
+            split (DataSplit, optional): The split providing the test features. Default is the registry's default split.
+            feature_dtype (np.dtype, optional): The dtype of the assigned feature vectors. Default is float32.
+            rng (np.random.SeedSequence or Generator or int, optional): The seed of the board. A generator
+                contributes its seed sequence. Default is fresh entropy.
+            pipeline (TilePipeline, optional): The pool the tiles are processed on. Default is a thread per CPU.
+        """
+        if isinstance(rng, np.random.Generator):
+            rng = rng.bit_generator.seed_seq
+        self.seed_sequence = rng if isinstance(rng, np.random.SeedSequence) else np.random.SeedSequence(rng)
+        self._open(size_of_board, mine_probability, directory, split, feature_dtype, pipeline)
+        os.makedirs(directory, exist_ok=True)
+
+        self.array = self.new_grid("board", np.int8)
+        self.feature_indices = self.new_grid("feature_indices", np.int32)
+        self.amount_of_mines = 0
+        self.amount_of_bombs = 0
+        for mines, bombs in self.pipeline.map(self._generate_tile_into, range(len(self.tiles()))):
+            self.amount_of_mines += mines
+            self.amount_of_bombs += bombs
+        self.array.flush()
+        self.feature_indices.flush()
+        self._write_metadata()
+
+    def _open(self, size_of_board, mine_probability, directory, split, feature_dtype, pipeline):
+        """
+        Sets the attributes shared by a generated and a reopened board.
+
+        Args:
+            size_of_board (int): The size of the board.
+            mine_probability (float): The probability of a cell containing a mine or bomb.
+            directory (str): The directory of the board's files.
+            split (DataSplit or None): The split providing the test features, None for the registry's default one.
+            feature_dtype (np.dtype): The dtype of the assigned feature vectors.
+            pipeline (TilePipeline or None): The pool the tiles are processed on, None for a thread per CPU.
+        """
+        self.size_of_board = size_of_board
+        self.mine_probability = mine_probability
+        self.directory = directory
+        self.split = split if split is not None else DataRegistry.get_split()
+        self.feature_dtype = np.dtype(feature_dtype)
+        self.rng = np.random.default_rng(self.seed_sequence)
+        self.tile_rows = max(1, min(size_of_board, self.TILE_CELLS // max(size_of_board, 1)))
+        self.test_features = self.split.X_test.astype(self.feature_dtype, copy=False)
+        self.pipeline = pipeline if pipeline is not None else TilePipeline()
+        self._inference = {}
+
+    def __getstate__(self):
+        """
+        Returns the state of the board for pickling, without the memory-mapped arrays and the cached inference.
+
+        Returns:
+            dict: The state.
+        """
+        state = self.__dict__.copy()
+        del state["array"], state["feature_indices"]
+        state["_inference"] = {}
+        return state
+
+    def __setstate__(self, state):
+        """
+        Restores a pickled board and reopens its files.
+
+        Args:
+            state (dict): The state returned by :meth:`__getstate__`.
+        """
+        self.__dict__.update(state)
+        self.array = self.open_grid("board")
+        self.feature_indices = self.open_grid("feature_indices")
+
+    @classmethod
+    def open(cls, directory, split=None, pipeline=None):
+        """
+        Opens a board generated earlier in a directory, without generating it again.
+
+        Args:
+            directory (str): The directory of the board's files.
+            split (DataSplit, optional): The split providing the test features. Default is the registry's default split.
+            pipeline (TilePipeline, optional): The pool the tiles are processed on. Default is a thread per CPU.
+
+        Returns:
+            MappedBoard: The board.
+        """
+        with open(os.path.join(directory, cls.METADATA_FILE), encoding="utf-8") as file:
+            meta = json.load(file)
+        board = cls.__new__(cls)
+        board.seed_sequence = np.random.SeedSequence(meta["seed"]["entropy"], spawn_key=meta["seed"]["spawn_key"])
+        board._open(meta["size_of_board"], meta["mine_probability"], directory, split, meta["feature_dtype"], pipeline)
+        # Podział na kafelki wyznacza ziarna kafelków, więc bierzemy go z metadanych, a nie z bieżącego TILE_CELLS
+        board.tile_rows = meta["tile_rows"]
+        board.array = board.open_grid("board")
+        board.feature_indices = board.open_grid("feature_indices")
+        board.amount_of_mines = meta["amount_of_mines"]
+        board.amount_of_bombs = meta["amount_of_bombs"]
+        return board
+
+    def _write_metadata(self):
+        """
+        Writes the parameters and the counters of the board next to its files.
+        """
+        meta = {
+            "size_of_board": self.size_of_board,
+            "mine_probability": self.mine_probability,
+            "feature_dtype": self.feature_dtype.str,
+            "seed": {"entropy": self.seed_sequence.entropy, "spawn_key": list(self.seed_sequence.spawn_key)},
+            "tile_rows": self.tile_rows,
+            "amount_of_mines": self.amount_of_mines,
+            "amount_of_bombs": self.amount_of_bombs,
+        }
+        with open(os.path.join(self.directory, self.METADATA_FILE), "w", encoding="utf-8") as file:
+            json.dump(meta, file, indent=2)
+
+    def tiles(self):
+        """
+        Returns the row spans of the tiles of the board, in order.
+
+        Returns:
+            list: Pairs of the first row of a tile and the row after its last one.
+        """
+        return [
+            (start, min(start + self.tile_rows, self.size_of_board))
+            for start in range(0, self.size_of_board, self.tile_rows)
+        ]
+
+    def generate_tile(self, index):
+        """
+        Generates the labels and the feature indices of a tile from the tile's own generator.
+
+        Args:
+            index (int): The index of the tile.
+
+        Returns:
+            tuple: The labels (int8) and the feature indices (int32) of the cells of the tile, shape (rows, size).
+        """
+        start, stop = self.tiles()[index]
+        rng = np.random.default_rng(child_sequence(self.seed_sequence, index))
+        labels = self.draw_labels(rng, (stop - start, self.size_of_board), self.mine_probability)
+        return labels, self.draw_feature_indices(labels, self.split.y_test, rng)
+
+    def _generate_tile_into(self, index):
+        """
+        Generates a tile and writes it into the board's files.
+
+        Args:
+            index (int): The index of the tile.
+
+        Returns:
+            tuple: The number of mines and the number of bombs of the tile.
+        """
+        start, stop = self.tiles()[index]
+        labels, indices = self.generate_tile(index)
+        self.array[start:stop] = labels
+        self.feature_indices[start:stop] = indices
+        return int(np.count_nonzero(labels == 1)), int(np.count_nonzero(labels == 2))
+
+    def predict_grid(self, classifier, name="prediction_grid"):
+        """
+        Creates a grid with the label predicted by a classifier for every cell, tile by tile across the pipeline.
+
+        The classifier runs once over the test pool in the calling process; the workers only gather the labels of
+        the cells of their tiles, so no tile holds more than its own rows in memory.
+
+        Args:
+            classifier (ClassifierGeneral): A trained classifier.
+            name (str, optional): The name of the grid. Default is "prediction_grid".
+
+        Returns:
+            np.memmap: The predicted labels (int8), shape (size, size).
+        """
+        grid = self.new_grid(name, np.int8)
+        task = partial(self._predict_tile_into, name, self.inference(classifier)[0])
+        for _ in self.pipeline.map(task, range(len(self.tiles()))):
+            pass
+        return grid
+
+    def _predict_tile_into(self, name, labels, index):
+        """
+        Writes the predicted labels of the cells of a tile into a grid.
+
+        Args:
+            name (str): The name of the grid.
+            labels (np.ndarray): The labels predicted for the vectors of the test pool.
+            index (int): The index of the tile.
+        """
+        start, stop = self.tiles()[index]
+        grid = self.open_grid(name)
+        np.take(labels, self.feature_indices[start:stop], out=grid[start:stop])
+
+    def _grid_path(self, name):
+        """
+        Returns the path of the file of a grid.
+
+        Args:
+            name (str): The name of the grid.
+
+        Returns:
+            str: The path.
+        """
+        return os.path.join(self.directory, f"{name}.npy")
+
+    def new_grid(self, name, dtype, fill=0):
+        """
+        Creates a grid stored in a memory-mapped ``.npy`` file of the board's directory, filled tile by tile.
+
+        Args:
+            name (str): The name of the grid, which names its file.
+            dtype (np.dtype): The dtype of the grid.
+            fill (scalar, optional): The initial value of every cell. Default is 0.
+
+        Returns:
+            np.memmap: The grid, shape (size, size).
+        """
+        shape = (self.size_of_board, self.size_of_board)
+        grid = np.lib.format.open_memmap(self._grid_path(name), mode="w+", dtype=dtype, shape=shape)
+        # Nowy plik jest wypełniony zerami
+        if fill != 0:
+            for start, stop in self.tiles():
+                grid[start:stop] = fill
+        return grid
+
+    def open_grid(self, name):
+        """
+        Opens a grid created earlier with :meth:`new_grid`.
+
+        Args:
+            name (str): The name of the grid.
+
+        Returns:
+            np.memmap: The grid, open for reading and writing.
+        """
+        return np.lib.format.open_memmap(self._grid_path(name), mode="r+")
@@ -0,0 +1,275 @@
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from aifield.event_log import EventCode
+
+# Zdarzenia oddziałów specjalnych zliczane po przejściu ścieżki
+SPECIAL_FORCES_COUNTERS = {
+    "special_forces_interventions": EventCode.SPECIAL_FORCES,
+    "heavy_saves": EventCode.HEAVY_SAVES,
+    "heavy_deaths": EventCode.HEAVY_DIED,
+    "sapper_disarmed_mines": EventCode.SAPPER_DISARMED_MINE,
+    "sapper_disarmed_bombs": EventCode.SAPPER_DISARMED_BOMB,
+    "sapper_deaths": EventCode.SAPPER_DIED,
+}
+
+
+def current_rss():
+    """
+    Returns the resident set size of the process.
+
+    Returns:
+        int or None: The RSS in bytes, or None where ``/proc`` is not available.
+    """
+    return _proc_status("VmRSS")
+
+
+def peak_rss():
+    """
+    Returns the peak resident set size of the process.
+
+    The peak is read from ``/proc/self/status``, so it covers the time since :func:`reset_peak_rss`. Elsewhere it
+    falls back to ``resource.getrusage``, which covers the whole life of the process.
+
+    Returns:
+        int or None: The peak RSS in bytes, or None if the platform reports none.
+    """
+    peak = _proc_status("VmHWM")
+    if peak is not None:
+        return peak
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS podaje bajty, Linux kilobajty
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def reset_peak_rss():
+    """
+    Resets the peak resident set size of the process to its current RSS, where the kernel allows it.
+
+    Returns:
+        bool: Whether the peak was reset.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as file:
+            file.write("5")
+    except OSError:
+        return False
+    return True
+
+
+def _proc_status(field):
+    """
+    Reads a memory field of ``/proc/self/status``.
+
+    Args:
+        field (str): The name of the field, e.g. "VmRSS".
+
+    Returns:
+        int or None: The value in bytes, or None if it cannot be read.
+    """
+    try:
+        with open("/proc/self/status") as file:
+            for line in file:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+class Metrics:
+    """
+    A registry of the time spent in the phases of simulations, their counters and memory snapshots.
+
+    A simulation given a registry times its coarse phases (training, planning, inference, the walk) and routes its
+    per-step methods through timers; a simulation without one runs the plain methods, so instrumentation costs
+    nothing when it is disabled. Timers are inclusive: the time of a step method covers the events it logs. One
+    registry can collect the metrics of any number of simulations.
+
+    Attributes:
+        timers (dict): The number of calls and the seconds spent, ``[calls, seconds]``, of every timed phase.
+        counters (dict): The value of every counter.
+        snapshots (list): The memory snapshots taken at the boundaries of the phases, in order.
+        callbacks (list): Functions called with the name and seconds of every coarse phase when it ends.
+    """
+
+    def __init__(self, callbacks=()):
+        """
+        Initializes an empty registry.
+
+        Args:
+            callbacks (iterable, optional): Functions called with the name and seconds of every coarse phase.
+        """
+        self.timers = {}
+        self.counters = {}
+        self.snapshots = []
+        self.callbacks = list(callbacks)
+
+    def _timer(self, name):
+        """
+        Returns the ``[calls, seconds]`` record of a timer, creating it on first use.
+
+        Args:
+            name (str): The name of the timer.
+
+        Returns:
+            list: The record, updated in place.
+        """
+        return self.timers.setdefault(name, [0, 0.0])
+
+    def add_time(self, name, seconds, calls=1):
+        """
+        Adds time spent in a phase.
+
+        Args:
+            name (str): The name of the phase.
+            seconds (float): The seconds spent.
+            calls (int, optional): The number of calls the time covers. Default is 1.
+        """
+        timer = self._timer(name)
+        timer[0] += calls
+        timer[1] += seconds
+
+    def increment(self, name, amount=1):
+        """
+        Increments a counter.
+
+        Args:
+            name (str): The name of the counter.
+            amount (int, optional): The increment. Default is 1.
+        """
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def snapshot(self, phase, boundary):
+        """
+        Records the memory of the process: its RSS and, while ``tracemalloc`` is tracing, the traced memory.
+
+        Args:
+            phase (str): The phase at whose boundary the snapshot is taken.
+            boundary (str): "start" or "end".
+        """
+        traced, traced_peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (None, None)
+        self.snapshots.append(
+            {"phase": phase, "boundary": boundary, "rss": current_rss(), "traced": traced, "traced_peak": traced_peak}
+        )
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Times a coarse phase and takes memory snapshots at its boundaries.
+
+        Args:
+            name (str): The name of the phase.
+        """
+        self.snapshot(name, "start")
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            self.add_time(name, seconds)
+            self.snapshot(name, "end")
+            for callback in self.callbacks:
+                callback(name, seconds)
+
+    def timed(self, name, function):
+        """
+        Wraps a function so that every call is timed.
+
+        Args:
+            name (str): The name of the timer.
+            function (callable): The function.
+
+        Returns:
+            callable: The timed function.
+        """
+        timer = self._timer(name)
+        perf_counter = time.perf_counter
+
+        def timed_function(*args, **kwargs):
+            started = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                timer[0] += 1
+                timer[1] += perf_counter() - started
+
+        return timed_function
+
+    def count_events(self, events):
+        """
+        Adds the special-forces events of a simulation's log to the counters.
+
+        Args:
+            events (EventLog): The event log of the simulation.
+        """
+        for name, code in SPECIAL_FORCES_COUNTERS.items():
+            self.increment(name, events.counts[code])
+
+    def to_dict(self):
+        """
+        Returns the metrics in a JSON-serializable form.
+
+        Returns:
+            dict: The timers (calls and seconds), the counters and the memory snapshots.
+        """
+        return {
+            "timers": {name: {"calls": calls, "seconds": seconds} for name, (calls, seconds) in self.timers.items()},
+            "counters": dict(self.counters),
+            "memory": list(self.snapshots),
+        }
+
+    def to_json(self):
+        """
+        Formats the metrics as JSON.
+
+        Returns:
+            str: The JSON text.
+        """
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self, prefix="aifield"):
+        """
+        Formats the metrics in the Prometheus text exposition format.
+
+        Timers become the ``<prefix>_phase_seconds_total`` and ``<prefix>_phase_calls_total`` counters labelled by
+        phase, counters become ``<prefix>_<name>_total`` and the last snapshot of every phase boundary becomes the
+        ``<prefix>_memory_rss_bytes`` and ``<prefix>_memory_traced_bytes`` gauges.
+
+        Args:
+            prefix (str, optional): The prefix of the metric names. Default is "aifield".
+
+        Returns:
+            str: The exposition text.
+        """
+        timers = self.timers.items()
+        lines = [
+            f"# HELP {prefix}_phase_seconds_total Time spent in a phase of the simulation.",
+            f"# TYPE {prefix}_phase_seconds_total counter",
+        ]
+        lines += [f'{prefix}_phase_seconds_total{{phase="{name}"}} {seconds!r}' for name, (_, seconds) in timers]
+        lines += [
+            f"# HELP {prefix}_phase_calls_total Calls of a phase of the simulation.",
+            f"# TYPE {prefix}_phase_calls_total counter",
+        ]
+        lines += [f'{prefix}_phase_calls_total{{phase="{name}"}} {calls}' for name, (calls, _) in timers]
+        for name, value in self.counters.items():
+            lines += [f"# TYPE {prefix}_{name}_total counter", f"{prefix}_{name}_total {value}"]
+
+        latest = {(snapshot["phase"], snapshot["boundary"]): snapshot for snapshot in self.snapshots}
+        for field, metric in (("rss", "memory_rss_bytes"), ("traced", "memory_traced_bytes")):
+            samples = [
+                f'{prefix}_{metric}{{phase="{phase}",boundary="{boundary}"}} {snapshot[field]}'
+                for (phase, boundary), snapshot in latest.items()
+                if snapshot[field] is not None
+            ]
+            if samples:
+                lines += [f"# TYPE {prefix}_{metric} gauge"] + samples
+        return "\n".join(lines) + "\n"
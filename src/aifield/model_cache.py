@@ -0,0 +1,140 @@
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+
+from aifield.lru_cache import LRUCache
+
+
+class ModelCache:
+    """
+    A process-wide cache of fitted estimators, kept in memory with LRU eviction and optionally persisted on disk.
+
+    Entries are keyed by the classifier name, its hyperparameters, its random state and the fingerprint of the
+    training data, so an estimator is only fitted once per configuration.
+
+    Attributes:
+        DEFAULT_MAX_ENTRIES (int): The default number of estimators kept in memory.
+        directory (str or None): The directory of the on-disk cache, or None if it is disabled.
+    """
+
+    DEFAULT_MAX_ENTRIES = 32
+
+    directory = None
+    _memory = LRUCache(max_entries=DEFAULT_MAX_ENTRIES)
+
+    @staticmethod
+    def key(classifier_name, params, random_state, fingerprint):
+        """
+        Builds the cache key of a fitted estimator.
+
+        Args:
+            classifier_name (str): The name of the classifier.
+            params (dict): The hyperparameters of the estimator.
+            random_state (int): The random state of the classifier.
+            fingerprint (str): The fingerprint of the training data.
+
+        Returns:
+            str: A hexadecimal digest identifying the configuration.
+        """
+        import sklearn
+
+        description = {
+            "classifier": classifier_name,
+            "params": params,
+            "random_state": random_state,
+            "data": fingerprint,
+            "sklearn": sklearn.__version__,
+        }
+        encoded = json.dumps(description, sort_keys=True, default=repr).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    @classmethod
+    def get(cls, key):
+        """
+        Returns the fitted estimator stored under a key, looking in memory first and on disk second.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            object or None: The fitted estimator, or None if it is not cached.
+        """
+        estimator = cls._memory.get(key)
+        if estimator is not None or cls.directory is None:
+            return estimator
+
+        path = cls._path(key)
+        if not os.path.exists(path):
+            return None
+        import joblib
+
+        try:
+            estimator = joblib.load(path)
+        except Exception:
+            # Uszkodzony plik traktujemy jak brak wpisu - model zostanie wytrenowany ponownie
+            return None
+        return cls._memory.put(key, estimator)
+
+    @classmethod
+    def put(cls, key, estimator):
+        """
+        Stores a fitted estimator in memory and, if enabled, on disk.
+
+        Args:
+            key (str): The cache key.
+            estimator (object): The fitted estimator.
+
+        Returns:
+            object: The estimator held by the cache for the key.
+        """
+        estimator = cls._memory.put(key, estimator)
+        if cls.directory is not None:
+            path = cls._path(key)
+            if not os.path.exists(path):
+                import joblib
+
+                os.makedirs(cls.directory, exist_ok=True)
+                # Unikalna nazwa pliku tymczasowego - zapisywać mogą równocześnie wątki i procesy
+                descriptor, tmp_path = tempfile.mkstemp(dir=cls.directory, prefix=f"{key}.", suffix=".tmp")
+                os.close(descriptor)
+                try:
+                    joblib.dump(estimator, tmp_path)
+                    os.replace(tmp_path, path)
+                finally:
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(tmp_path)
+        return estimator
+
+    @classmethod
+    def configure(cls, max_entries=DEFAULT_MAX_ENTRIES, directory=None):
+        """
+        Changes the in-memory limit and the on-disk location of the cache.
+
+        Args:
+            max_entries (int, optional): The number of estimators kept in memory. None removes the limit.
+            directory (str, optional): The directory of the on-disk cache. None disables it.
+        """
+        cls._memory.configure(max_entries=max_entries)
+        cls.directory = directory
+
+    @classmethod
+    def clear(cls):
+        """
+        Removes every estimator from the in-memory cache. Files on disk are kept.
+        """
+        cls._memory.clear()
+
+    @classmethod
+    def _path(cls, key):
+        """
+        Returns the on-disk path of a cache entry.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            str: The path of the joblib file.
+        """
+        return os.path.join(cls.directory, f"{key}.joblib")
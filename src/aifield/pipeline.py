@@ -0,0 +1,67 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+EXECUTORS = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}
+
+
+class TilePipeline:
+    """
+    Runs a task over the tiles of a board across a pool of threads or processes, with backpressure.
+
+    At most ``max_in_flight`` tiles are submitted and not yet consumed at any time. Results are consumed in tile
+    order, so a slow tile holds back the submission of new ones instead of letting finished results pile up in
+    memory. Tasks write their output into shared grids themselves (memory-mapped files for processes) and return
+    only small summaries.
+
+    Threads suit the numpy work of tiles, which releases the GIL; processes need a task and arguments that can be
+    pickled.
+
+    Attributes:
+        workers (int): The number of workers; 0 runs the tasks in the calling thread.
+        executor (str): The kind of pool: "thread" or "process".
+        max_in_flight (int): The maximum number of tiles submitted and not yet consumed.
+    """
+
+    def __init__(self, workers=None, executor="thread", max_in_flight=None):
+        """
+        Initializes the pipeline.
+
+        Args:
+            workers (int, optional): The number of workers. Default is the number of CPUs.
+            executor (str, optional): The kind of pool: "thread" or "process". Default is "thread".
+            max_in_flight (int, optional): The maximum number of tiles in flight. Default is twice the workers.
+
+        Raises:
+            ValueError: If the kind of pool is not supported.
+        """
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unsupported executor: {executor}")
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.executor = executor
+        self.max_in_flight = max_in_flight or 2 * max(self.workers, 1)
+
+    def map(self, task, tiles):
+        """
+        Runs a task for every tile.
+
+        Args:
+            task (callable): The task, called with the index of a tile.
+            tiles (iterable): The indices of the tiles.
+
+        Yields:
+            object: The result of the task for every tile, in the order of the tiles.
+        """
+        if self.workers <= 0:
+            for tile in tiles:
+                yield task(tile)
+            return
+
+        with EXECUTORS[self.executor](self.workers) as pool:
+            pending = deque()
+            for tile in tiles:
+                if len(pending) >= self.max_in_flight:
+                    yield pending.popleft().result()
+                pending.append(pool.submit(task, tile))
+            while pending:
+                yield pending.popleft().result()
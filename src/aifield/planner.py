@@ -0,0 +1,335 @@
+import numpy as np
+
+from aifield.lru_cache import LRUCache
+
+
+class PathPlanner:
+    """
+    The route of the soldiers over the board: a sequence of cells, visited in order.
+
+    Planners compute the coordinates of any span of the route on demand, so a route over a large board is never held
+    in memory unless the planner has to store it.
+
+    Attributes:
+        size_of_board (int): The size of the board.
+    """
+
+    name = None
+
+    def __init__(self, size_of_board):
+        """
+        Initializes the planner for a board.
+
+        Args:
+            size_of_board (int): The size of the board.
+        """
+        self.size_of_board = size_of_board
+
+    def plan(self, simulation):
+        """
+        Plans the route once the classifier of the simulation is trained. Fixed routes need no planning.
+
+        Args:
+            simulation (Simulation): The simulation the route is planned for.
+        """
+
+    def state(self):
+        """
+        Returns the planned route as arrays. Fixed routes have none.
+
+        Returns:
+            dict: The arrays, by name.
+        """
+        return {}
+
+    def load_state(self, state):
+        """
+        Restores a route returned by :meth:`state`, so it need not be planned again.
+
+        Args:
+            state (dict): The arrays of the route, by name.
+        """
+
+    @property
+    def length(self):
+        """
+        int: The number of cells of the route.
+        """
+        raise NotImplementedError
+
+    def coordinates(self, start=0, stop=None):
+        """
+        Returns the cells of a span of the route.
+
+        Args:
+            start (int, optional): The first step of the span. Default is 0.
+            stop (int, optional): The step after the last one. Default is the end of the route.
+
+        Returns:
+            tuple: Arrays of the x- and y-coordinates of the cells, in visiting order.
+        """
+        raise NotImplementedError
+
+    def _steps(self, start, stop):
+        """
+        Returns the steps of a span of the route, capped at its length.
+
+        Args:
+            start (int): The first step of the span.
+            stop (int or None): The step after the last one, or None for the end of the route.
+
+        Returns:
+            np.ndarray: The steps.
+        """
+        stop = self.length if stop is None else min(stop, self.length)
+        return np.arange(start, max(start, stop), dtype=np.int64)
+
+
+class HorizontalPlanner(PathPlanner):
+    """
+    A route sweeping the board row by row, left to right on even rows and right to left on odd rows.
+    """
+
+    name = "Horizontal"
+
+    @property
+    def length(self):
+        """
+        int: The number of cells of the route.
+        """
+        return self.size_of_board * self.size_of_board
+
+    def coordinates(self, start=0, stop=None):
+        rows, cols = np.divmod(self._steps(start, stop), self.size_of_board)
+        odd_rows = rows % 2 == 1
+        cols[odd_rows] = self.size_of_board - 1 - cols[odd_rows]
+        return rows, cols
+
+
+class DiagonalPlanner(PathPlanner):
+    """
+    A route along the main diagonal of the board.
+    """
+
+    name = "Diagonal"
+
+    @property
+    def length(self):
+        """
+        int: The number of cells of the route.
+        """
+        return self.size_of_board
+
+    def coordinates(self, start=0, stop=None):
+        steps = self._steps(start, stop)
+        return steps, steps.copy()
+
+
+class RiskAwarePlanner(PathPlanner):
+    """
+    A route from the top-left cell to the bottom row minimizing the expected casualties.
+
+    The cost of entering a cell is the expected number of soldiers lost there: the probability that the cell holds a
+    mine or a bomb the classifier does not predict, times the average casualties of that hazard, plus the average net
+    loss of the random event of a step. The cheapest route is found with Dijkstra's algorithm
+    (``scipy.sparse.csgraph``, heap-based) over the 4-neighbourhood graph of the board, stored as a CSR matrix.
+
+    Attributes:
+        rows (np.ndarray or None): The x-coordinates of the planned route.
+        cols (np.ndarray or None): The y-coordinates of the planned route.
+        cost (np.ndarray or None): The expected casualties of entering every cell.
+    """
+
+    name = "RiskAware"
+
+    # Średnie straty: mina 1-5, bomba 5-15 lub 25-50, zdarzenie losowe: wróg -3 i rekruci +2 z prawd. 1/3
+    MINE_CASUALTIES = 3.0
+    BOMB_CASUALTIES = 10.0
+    LARGE_BOMB_CASUALTIES = 37.5
+    STEP_CASUALTIES = 1 / 3
+    # Struktura grafu zależy tylko od rozmiaru planszy - budujemy ją raz i używamy ponownie
+    _graphs = LRUCache(max_entries=2)
+
+    def __init__(self, size_of_board):
+        """
+        Initializes the planner for a board; the route is empty until it is planned.
+
+        Args:
+            size_of_board (int): The size of the board.
+        """
+        super().__init__(size_of_board)
+        self.rows = None
+        self.cols = None
+        self.cost = None
+
+    def plan(self, simulation):
+        """
+        Plans the route over the predicted labels and class probabilities of every cell of the simulation's board.
+
+        The expected casualties are computed once per vector of the board's test pool and gathered for the cells.
+
+        Args:
+            simulation (Simulation): The simulation the route is planned for. Its classifier must be trained.
+        """
+        labels, probabilities = simulation.board_inference()
+        large = simulation.amount_of_soldiers >= 500
+        pool_cost = self.expected_casualties(probabilities, labels, self.LARGE_BOMB_CASUALTIES if large else None)
+        self.cost = pool_cost[simulation.board.feature_indices]
+        self.rows, self.cols = self.cheapest_route(self.cost)
+
+    def state(self):
+        if self.rows is None:
+            return {}
+        return {"rows": self.rows, "cols": self.cols}
+
+    def load_state(self, state):
+        if state:
+            self.rows, self.cols = state["rows"], state["cols"]
+
+    @classmethod
+    def expected_casualties(cls, probabilities, predicted, bomb_casualties=None):
+        """
+        Computes the expected casualties of entering every cell.
+
+        A hazard only costs soldiers when the classifier predicts another label, since a predicted mine or bomb is
+        disarmed. The predicted labels must be the ones the walk uses, which for estimators without
+        ``predict_proba`` need not be the most probable ones.
+
+        Args:
+            probabilities (np.ndarray): The probabilities of the labels 0-2 of every cell, shape (..., 3).
+            predicted (np.ndarray): The label predicted for every cell, shape (...).
+            bomb_casualties (float, optional): The average casualties of a bomb. Default is ``BOMB_CASUALTIES``.
+
+        Returns:
+            np.ndarray: The expected casualties of every cell, shape (...).
+        """
+        if bomb_casualties is None:
+            bomb_casualties = cls.BOMB_CASUALTIES
+        cost = np.full(predicted.shape, cls.STEP_CASUALTIES)
+        cost += np.where(predicted != 1, probabilities[..., 1], 0) * cls.MINE_CASUALTIES
+        cost += np.where(predicted != 2, probabilities[..., 2], 0) * bomb_casualties
+        return cost
+
+    @classmethod
+    def cheapest_route(cls, cost):
+        """
+        Finds the cheapest route from the top-left cell to any cell of the bottom row.
+
+        The search is limited to the cost of the cheapest route along the top row and then straight down a column,
+        since no cell farther than that can lie on a cheaper route.
+
+        Args:
+            cost (np.ndarray): The positive cost of entering every cell, shape (n, n).
+
+        Returns:
+            tuple: Arrays of the x- and y-coordinates of the route, in visiting order.
+        """
+        from scipy.sparse import csr_matrix
+        from scipy.sparse.csgraph import dijkstra
+
+        size = cost.shape[0]
+        indices, indptr = cls._graph_structure(size)
+        graph = csr_matrix((cost.ravel()[indices], indices, indptr), shape=(size * size, size * size))
+
+        # Trasa wzdłuż pierwszego wiersza i w dół kolumną daje górne ograniczenie kosztu najtańszej trasy
+        along_top = np.concatenate(([0.0], np.cumsum(cost[0, 1:], dtype=np.float64)))
+        bound = float(np.min(along_top + cost[1:].sum(axis=0, dtype=np.float64)))
+        limit = bound * (1 + 1e-9) + 1e-9
+
+        distances, predecessors = dijkstra(graph, indices=0, return_predecessors=True, limit=limit)
+        node = (size - 1) * size + int(np.argmin(distances[(size - 1) * size :]))
+        route = [node]
+        while node != 0:
+            node = int(predecessors[node])
+            route.append(node)
+        rows, cols = np.divmod(np.array(route[::-1], dtype=np.int64), size)
+        return rows, cols
+
+    @classmethod
+    def _graph_structure(cls, size):
+        """
+        Returns the CSR index arrays of the 4-neighbourhood graph of a board, built once per size.
+
+        Every row of the board except the first and the last has the same neighbours shifted by the row, so the
+        arrays are built from the neighbours of three rows.
+
+        Args:
+            size (int): The size of the board.
+
+        Returns:
+            tuple: The column indices and the row pointers, int32 unless the board is too large for it.
+        """
+        structure = cls._graphs.get(size)
+        if structure is not None:
+            return structure
+
+        dtype = np.int32 if 4 * size * size <= np.iinfo(np.int32).max else np.int64
+        if size == 1:
+            indices, degrees = cls._row_neighbours(size, False, False, dtype)
+        else:
+            first = cls._row_neighbours(size, False, True, dtype)
+            middle = cls._row_neighbours(size, True, True, dtype)
+            last = cls._row_neighbours(size, True, False, dtype)
+            starts = np.arange(1, size - 1, dtype=dtype) * size
+            indices = np.concatenate((first[0], (middle[0] + starts[:, None]).ravel(), last[0] + (size - 1) * size))
+            degrees = np.concatenate((first[1], np.tile(middle[1], size - 2), last[1]))
+        indptr = np.zeros(size * size + 1, dtype=dtype)
+        np.cumsum(degrees, out=indptr[1:])
+        indices.setflags(write=False)
+        indptr.setflags(write=False)
+        return cls._graphs.put(size, (indices, indptr))
+
+    @staticmethod
+    def _row_neighbours(size, up, down, dtype):
+        """
+        Returns the neighbours of the cells of a row, relative to the first cell of the row.
+
+        Args:
+            size (int): The size of the board.
+            up (bool): Whether the row has a row above it.
+            down (bool): Whether the row has a row below it.
+            dtype (np.dtype): The integer dtype of the indices.
+
+        Returns:
+            tuple: The neighbours of every cell in the order up, left, right, down, and the number of neighbours of
+            every cell.
+        """
+        columns = np.arange(size, dtype=dtype)
+        neighbours = np.stack((columns - size, columns - 1, columns + 1, columns + size), axis=1)
+        valid = np.stack((np.full(size, up), columns > 0, columns < size - 1, np.full(size, down)), axis=1)
+        return neighbours[valid], valid.sum(axis=1, dtype=dtype)
+
+    @property
+    def length(self):
+        """
+        int: The number of cells of the planned route, 0 before planning.
+        """
+        return 0 if self.rows is None else self.rows.size
+
+    def coordinates(self, start=0, stop=None):
+        chunk = slice(start, stop)
+        if self.rows is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return self.rows[chunk], self.cols[chunk]
+
+
+PLANNERS = {planner.name: planner for planner in (HorizontalPlanner, DiagonalPlanner, RiskAwarePlanner)}
+
+
+def create_planner(type_of_path, size_of_board):
+    """
+    Creates the planner of a type of path.
+
+    Args:
+        type_of_path (str): The name of the planner ('Horizontal', 'Diagonal' or 'RiskAware').
+        size_of_board (int): The size of the board.
+
+    Returns:
+        PathPlanner: The planner.
+
+    Raises:
+        ValueError: If the type of path is not supported.
+    """
+    if type_of_path not in PLANNERS:
+        raise ValueError(f"Unsupported type of path: {type_of_path}")
+    return PLANNERS[type_of_path](size_of_board)
@@ -0,0 +1,116 @@
+import numpy as np
+
+EVENT_FOUND_KIT = 1
+EVENT_ENEMY = 2
+EVENT_RECRUITS = 3
+
+
+def child_sequence(seed_sequence, *key):
+    """
+    Derives a child of a seed sequence addressed by a key, so it can be recreated without spawning in order.
+
+    Args:
+        seed_sequence (np.random.SeedSequence): The parent seed sequence.
+        *key (int): The path of the child below the parent.
+
+    Returns:
+        np.random.SeedSequence: The child seed sequence.
+    """
+    return np.random.SeedSequence(seed_sequence.entropy, spawn_key=seed_sequence.spawn_key + tuple(key))
+
+
+def draw_integers(uniform, low, high):
+    """
+    Maps uniform draws from [0, 1) onto integers from low to high inclusive.
+
+    Args:
+        uniform (float or np.ndarray): The uniform draws.
+        low (int): The smallest integer.
+        high (int): The largest integer.
+
+    Returns:
+        int or np.ndarray: The integers.
+    """
+    if isinstance(uniform, np.ndarray):
+        return low + (uniform * (high - low + 1)).astype(np.int64)
+    return low + int(uniform * (high - low + 1))
+
+
+class EventStream:
+    """
+    The random draws of every simulation step, generated in vectorized blocks.
+
+    Every step gets the type of its random event (1: found kit, 2: enemy, 3: recruits) and two uniform draws: one
+    for the casualties of a bad prediction and one for the amount of the random event. Block ``b`` is generated by
+    its own generator seeded with child ``b`` of the stream's seed sequence, so any step can be reproduced without
+    replaying the steps before it.
+
+    Attributes:
+        seed_sequence (np.random.SeedSequence): The seed sequence of the stream.
+    """
+
+    BLOCK_SIZE = 4096
+
+    def __init__(self, seed_sequence):
+        """
+        Initializes the stream.
+
+        Args:
+            seed_sequence (np.random.SeedSequence): The seed sequence of the stream.
+        """
+        self.seed_sequence = seed_sequence
+        self._block_index = None
+        self._block = None
+
+    def block(self, index):
+        """
+        Generates a block of draws.
+
+        Args:
+            index (int): The index of the block.
+
+        Returns:
+            tuple: Arrays of event types (int8), casualty draws and event amount draws for the steps of the block.
+        """
+        rng = np.random.default_rng(child_sequence(self.seed_sequence, index))
+        events = rng.integers(1, 4, size=self.BLOCK_SIZE, dtype=np.int8)
+        uniforms = rng.random((2, self.BLOCK_SIZE))
+        return events, uniforms[0], uniforms[1]
+
+    def range(self, start, stop):
+        """
+        Returns the draws of the steps from start (inclusive) to stop (exclusive).
+
+        Args:
+            start (int): The first step.
+            stop (int): The step after the last one.
+
+        Returns:
+            tuple: Arrays of event types, casualty draws and event amount draws.
+        """
+        first, last = start // self.BLOCK_SIZE, (stop - 1) // self.BLOCK_SIZE
+        blocks = [self.block(index) for index in range(first, last + 1)] if stop > start else []
+        offset = first * self.BLOCK_SIZE
+        return tuple(
+            np.concatenate([block[field] for block in blocks])[start - offset : stop - offset]
+            if blocks
+            else np.empty(0)
+            for field in range(3)
+        )
+
+    def at(self, step):
+        """
+        Returns the draws of a single step, generating its block when needed.
+
+        Args:
+            step (int): The step.
+
+        Returns:
+            tuple: The event type, casualty draw and event amount draw of the step.
+        """
+        index, offset = divmod(step, self.BLOCK_SIZE)
+        if index != self._block_index:
+            self._block = tuple(values.tolist() for values in self.block(index))
+            self._block_index = index
+        events, casualties, amounts = self._block
+        return events[offset], casualties[offset], amounts[offset]
@@ -0,0 +1,80 @@
+import numpy as np
+
+
+class StratifiedReservoirSampler:
+    """
+    A streaming, stratified sampler drawing a fixed number of items from every class without replacement.
+
+    Every incoming item gets a uniform random priority and each class keeps the items with the smallest priorities
+    seen so far, so memory is bounded by the sample size rather than by the stream. Priorities are drawn from a
+    single seeded generator in stream order, which makes the sample independent of how the stream is chunked.
+
+    Attributes:
+        sizes (np.ndarray): The target sample size of every class, indexed by class label.
+    """
+
+    def __init__(self, sizes, random_state=None):
+        """
+        Initializes the sampler with empty reservoirs.
+
+        Args:
+            sizes (sequence of int): The target sample size of every class, indexed by class label.
+            random_state (int, optional): The seed of the priorities, for reproducibility.
+        """
+        self.sizes = np.asarray(sizes, dtype=np.int64)
+        self._rng = np.random.default_rng(random_state)
+        self._keys = [np.empty(0) for _ in self.sizes]
+        self._items = [None for _ in self.sizes]
+        # Typ i kształt elementów zapamiętujemy, aby pusta próbka miała ten sam układ co niepusta
+        self._item_dtype = np.dtype(np.intp)
+        self._item_shape = ()
+
+    def update(self, labels, items):
+        """
+        Offers a chunk of the stream to the reservoirs.
+
+        Args:
+            labels (np.ndarray): The class labels of the chunk, shape (n,).
+            items (np.ndarray): The items of the chunk (rows or row indices), first dimension n.
+        """
+        items = np.asarray(items)
+        self._item_dtype, self._item_shape = items.dtype, items.shape[1:]
+        keys = self._rng.random(len(labels))
+        for label, size in enumerate(self.sizes):
+            if size == 0:
+                continue
+            mask = labels == label
+            if not mask.any():
+                continue
+
+            if self._items[label] is None:
+                merged_keys, merged_items = keys[mask], items[mask]
+            else:
+                merged_keys = np.concatenate((self._keys[label], keys[mask]))
+                merged_items = np.concatenate((self._items[label], items[mask]))
+
+            if merged_keys.size > size:
+                kept = np.argpartition(merged_keys, size - 1)[:size]
+                merged_keys, merged_items = merged_keys[kept], merged_items[kept]
+            self._keys[label], self._items[label] = merged_keys, merged_items
+
+    def result(self):
+        """
+        Returns the sample collected so far, grouped by class and shuffled within every class.
+
+        An empty sample keeps the dtype and trailing shape of the offered items (``np.intp`` scalars if nothing was
+        offered).
+
+        Returns:
+            tuple: A tuple containing the sampled items and their labels (items, labels).
+        """
+        items, labels = [], []
+        for label, (keys, chunk) in enumerate(zip(self._keys, self._items)):
+            if chunk is None:
+                continue
+            order = np.argsort(keys, kind="stable")
+            items.append(chunk[order])
+            labels.append(np.full(order.size, label, dtype=np.uint8))
+        if not items:
+            return np.empty((0,) + self._item_shape, dtype=self._item_dtype), np.empty(0, dtype=np.uint8)
+        return np.concatenate(items), np.concatenate(labels)
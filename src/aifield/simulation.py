@@ -1,32 +1,118 @@
-import random
+import os
+from contextlib import nullcontext
+from dataclasses import dataclass
+from itertools import islice
+
+import numpy as np
 
-from aifield.soldier import Heavy, Sapper
 from aifield.board import Board
+from aifield.checkpoint import read_checkpoint, write_checkpoint
 from aifield.classifier_general import ClassifierGeneral
-from aifield.troops import Troops
+from aifield.dataset_registry import DataRegistry
+from aifield.event_log import EventCode, EventLog
+from aifield.kernel import PathKernel
+from aifield.mapped_board import MappedBoard
+from aifield.pipeline import TilePipeline
+from aifield.planner import create_planner
+from aifield.random_streams import EVENT_ENEMY, EVENT_FOUND_KIT, EventStream, draw_integers
+from aifield.troops import HEAVY, SAPPER, Troops
+
+
+@dataclass(frozen=True)
+class StepBatch:
+    """
+    A chunk of consecutive simulation steps: the visited cells and how the state changed over them.
+
+    Attributes:
+        start (int): The index of the first step of the chunk.
+        rows (np.ndarray): The x-coordinates of the visited cells, in visiting order.
+        cols (np.ndarray): The y-coordinates of the visited cells, in visiting order.
+        disarmed (np.ndarray): Whether a mine or bomb was disarmed at every visited cell.
+        survivors (int): The change of the number of survivors.
+        good_predictions (int): The number of good predictions.
+        disarmed_mines (int): The number of disarmed mines.
+        disarmed_bombs (int): The number of disarmed bombs.
+        found_kits (int): The number of found disarming kits.
+    """
+
+    start: int
+    rows: np.ndarray
+    cols: np.ndarray
+    disarmed: np.ndarray
+    survivors: int
+    good_predictions: int
+    disarmed_mines: int
+    disarmed_bombs: int
+    found_kits: int
+
+    def __len__(self):
+        return self.rows.size
+
+    @property
+    def stop(self):
+        """
+        int: The index of the step after the chunk.
+        """
+        return self.start + self.rows.size
 
 
 class Simulation:
     """
     A class to simulate the movement and actions of soldiers on a board with mines and bombs.
 
+    Every source of randomness is derived from one seed: the simulation's SeedSequence spawns independent streams
+    for the board, the troops and the per-step random events, so a run is fully reproducible from its seed.
+
+    Between two steps the whole state of a run can be written to a checkpoint (:meth:`save_checkpoint`, or
+    periodically during :meth:`simulate`) and a run resumed from it (:meth:`from_checkpoint`) ends with the same
+    results and event log as an uninterrupted one.
+
     Attributes:
+        seed_sequence (np.random.SeedSequence): The root of the simulation's random streams.
+        split (DataSplit): The train/test split shared by the board and the classifier.
         board (Board): The game board with mines and bombs.
-        type_of_path (str): The type of path soldiers take ('Horizontal' or 'Diagonal').
+        type_of_path (str): The type of path soldiers take ('Horizontal', 'Diagonal' or 'RiskAware').
+        planner (PathPlanner): The planner of the route for the type of path.
         _classifier (ClassifierGeneral): The classifier used to predict the presence of mines and bombs.
         amount_of_soldiers (int): The initial number of soldiers.
         survivors (int): The current number of surviving soldiers.
-        _special_soldiers (list): A list of special soldiers (Heavy and Sapper).
+        _special_soldiers (Roster): The array-backed roster of special soldiers (Heavy and Sapper).
         _good_predictions (int): The number of correct predictions made by the classifier.
         disarmed_mines (int): The number of mines disarmed.
         disarmed_bombs (int): The number of bombs disarmed.
-        random_events_log (list): A log of random events that occurred during the simulation.
+        events (EventLog): A structured log of the events that occurred during the simulation.
+        random_events_log (list): The events formatted as text, produced on access.
         accuracy (float): The accuracy of the classifier's predictions.
         found_kits (int): The number of disarming kits found during the simulation.
         disarmed_locations (set): The set of locations where mines and bombs were disarmed.
+        disarmed_grid (np.ndarray or None): The cells where mines and bombs were disarmed, marked by the fast mode
+            instead of ``disarmed_locations``.
+        prediction_grid (np.ndarray): The classifier's label for every cell on the path (-1 off the path), filled
+            in one batched call when the simulation starts.
+        metrics (Metrics or None): The registry recording the phases of the simulation, if it is instrumented.
     """
 
-    def __init__(self, size_of_board, mine_probability, classifier_name, type_of_path=None, amount_of_soldiers=100):
+    PREDICTION_CHUNK = 1 << 18
+    CHECKPOINT_EVERY = 1 << 20
+
+    def __init__(
+        self,
+        size_of_board,
+        mine_probability,
+        classifier_name,
+        type_of_path=None,
+        amount_of_soldiers=100,
+        split=None,
+        classifier=None,
+        verbose=True,
+        log_retention="all",
+        log_capacity=None,
+        seed=None,
+        metrics=None,
+        board=None,
+        board_storage=None,
+        tile_workers=None,
+    ):
         """
         Initializes the Simulation with the specified parameters.
 
@@ -34,36 +120,243 @@ class Simulation:
             size_of_board (int): The size of the board.
             mine_probability (float): The probability of a cell containing a mine or bomb.
             classifier_name (str): The name of the classifier to use.
-            type_of_path (str, optional): The type of path soldiers take ('Horizontal' or 'Diagonal'). Default is 'Horizontal'.
+            type_of_path (str, optional): The type of path soldiers take ('Horizontal', 'Diagonal' or 'RiskAware').
+                Default is 'Horizontal'.
             amount_of_soldiers (int, optional): The initial number of soldiers. Default is 100.
+            split (DataSplit, optional): The train/test split to use. Default is the registry's default split.
+            classifier (ClassifierGeneral, optional): A classifier to reuse instead of creating one from
+                classifier_name. It is not retrained if it is already trained on the split.
+            verbose (bool, optional): Whether to print the summary and the log at the end. Default is True.
+            log_retention (str, optional): The retention policy of the event log: "all", "last" or "counters".
+            log_capacity (int, optional): The number of events kept by the "last" retention policy.
+            seed (int or np.random.SeedSequence, optional): The seed of the simulation. Default is fresh entropy.
+            metrics (Metrics, optional): A registry recording the time spent in the phases of the simulation, the
+                special-forces counters and memory snapshots. Default records nothing, at no cost.
+            board (Board, optional): A board to use instead of generating one, e.g. restored from a checkpoint.
+            board_storage (str, optional): A directory to generate the board into as memory-mapped files
+                (:class:`MappedBoard`), for boards larger than RAM. The prediction grid and the disarmed cells of
+                the fast mode are stored there too. Default keeps the board in memory.
+            tile_workers (int, optional): The number of threads generating the tiles of a board in
+                ``board_storage`` and gathering their predictions; 0 processes the tiles in the calling thread.
+                Default is the number of CPUs.
         """
-        self.board = Board(size_of_board, mine_probability)
+        if isinstance(seed, np.random.SeedSequence):
+            self.seed_sequence = seed
+        else:
+            self.seed_sequence = np.random.SeedSequence(seed)
+        board_seed, troops_seed, events_seed = self.seed_sequence.spawn(3)
+
+        self.split = split if split is not None else DataRegistry.get_split()
+        if board is None and board_storage is not None:
+            pipeline = TilePipeline(tile_workers)
+            board = MappedBoard(
+                size_of_board, mine_probability, board_storage, self.split, rng=board_seed, pipeline=pipeline
+            )
+        elif board is None:
+            board = Board(size_of_board, mine_probability, self.split, rng=board_seed)
+        self.board = board
         if type_of_path is None:
             type_of_path = "Horizontal"
         self.type_of_path = type_of_path
-        self._classifier = ClassifierGeneral(classifier_name, random_state=42)
+        self.planner = create_planner(type_of_path, size_of_board)
+        self._classifier = classifier if classifier is not None else ClassifierGeneral(classifier_name, random_state=42)
+        self.verbose = verbose
         self.amount_of_soldiers = amount_of_soldiers
         self.survivors = self.amount_of_soldiers
-        self._special_soldiers = Troops.create_soldiers(amount_of_soldiers)
+        self._special_soldiers = Troops.create_soldiers(amount_of_soldiers, rng=troops_seed)
+        self._draws = EventStream(events_seed)
         self._good_predictions = 0
         self.disarmed_mines = 0
         self.disarmed_bombs = 0
-        self.random_events_log = []
+        self.events = EventLog(amount_of_soldiers, log_retention, log_capacity)
+        self._step = 0
         self.accuracy = -1
         self.found_kits = 0
         self.disarmed_locations = set()
+        self.disarmed_grid = None
+        self.prediction_grid = None
+        self.metrics = metrics
+        if metrics is not None:
+            self._instrument(metrics)
 
-    def simulate(self):
+    def _instrument(self, metrics):
         """
-        Runs the simulation and logs the results.
+        Routes the per-step methods and the event log through the timers of a metrics registry.
+
+        The timed functions shadow the methods on this instance only, so simulations without metrics keep calling
+        the plain methods.
+
+        Args:
+            metrics (Metrics): The registry.
+        """
+        self._update_game_stats = metrics.timed("update_game_stats", self._update_game_stats)
+        self._random_event = metrics.timed("random_event", self._random_event)
+        self._manage_soldiers = metrics.timed("special_forces", self._manage_soldiers)
+        self.events.append = metrics.timed("logging", self.events.append)
+
+    def _phase(self, name):
+        """
+        Returns a context timing a coarse phase of the simulation in the metrics registry, if there is one.
+
+        Args:
+            name (str): The name of the phase.
+
+        Returns:
+            contextmanager: The context.
         """
-        print(f"Sprawdźmy ilu mamy wszystkich żołnierzy: {self.amount_of_soldiers}")
-        self._classifier.train()
-        if self.type_of_path == "Diagonal":
-            yield from self._diagonal_path()
-        elif self.type_of_path == "Horizontal":
-            yield from self._horizontal_path()
+        return self.metrics.phase(name) if self.metrics is not None else nullcontext()
 
+    def simulate(self, batch_size=None, fast=False, checkpoint_path=None, checkpoint_every=None):
+        """
+        Runs the simulation, or the rest of a resumed one, and logs the results.
+
+        Every step is complete when it is yielded, so the simulation can be checkpointed between any two yields.
+
+        Args:
+            batch_size (int, optional): The number of steps grouped into every yielded :class:`StepBatch`. Default
+                yields the coordinates of every step separately.
+            fast (bool, optional): Whether to run the walk with the array kernel (:class:`PathKernel`), which records
+                no events. It always yields batches; without batch_size the whole path is one batch.
+            checkpoint_path (str, optional): The file a checkpoint is written to periodically during the walk.
+                Default writes none.
+            checkpoint_every (int, optional): The number of steps between two checkpoints. They are written at the
+                first yield at least that many steps after the previous one. Default is ``CHECKPOINT_EVERY``.
+
+        Yields:
+            tuple or StepBatch: The coordinates (x, y) of every visited cell, or a batch of steps.
+        """
+        self._prepare()
+        with self._phase("walk"):
+            if fast:
+                steps = self._fast_batches(batch_size)
+            else:
+                if self.type_of_path == "Diagonal":
+                    steps = self._diagonal_path()
+                elif self.type_of_path == "Horizontal":
+                    steps = self._horizontal_path()
+                else:
+                    steps = self._planned_path()
+                if batch_size is not None:
+                    steps = self._batches(steps, batch_size)
+            if checkpoint_path is None:
+                yield from steps
+            else:
+                yield from self._checkpointed(steps, checkpoint_path, checkpoint_every or self.CHECKPOINT_EVERY)
+        self._report()
+
+    def _checkpointed(self, steps, path, every):
+        """
+        Passes on the steps of the walk, writing a checkpoint whenever enough steps were done since the last one.
+
+        Args:
+            steps (generator): The steps or batches of the walk.
+            path (str): The path of the checkpoint file.
+            every (int): The number of steps between two checkpoints.
+
+        Yields:
+            tuple or StepBatch: The steps or batches of the walk.
+        """
+        last = self._step
+        for step in steps:
+            yield step
+            if self._step - last >= every:
+                self.save_checkpoint(path)
+                last = self._step
+
+    def _counters(self):
+        """
+        Returns the counters that step batches report the changes of.
+
+        Returns:
+            tuple: Survivors, good predictions, disarmed mines, disarmed bombs and found kits.
+        """
+        return self.survivors, self._good_predictions, self.disarmed_mines, self.disarmed_bombs, self.found_kits
+
+    def _make_batch(self, start, rows, cols, disarmed, before):
+        """
+        Builds a step batch from the counters before the steps and the current ones.
+
+        Args:
+            start (int): The index of the first step.
+            rows (np.ndarray): The x-coordinates of the visited cells.
+            cols (np.ndarray): The y-coordinates of the visited cells.
+            disarmed (np.ndarray): Whether a mine or bomb was disarmed at every visited cell.
+            before (tuple): The result of :meth:`_counters` before the steps.
+
+        Returns:
+            StepBatch: The batch.
+        """
+        deltas = [after - previous for after, previous in zip(self._counters(), before)]
+        return StepBatch(start, rows, cols, disarmed, *deltas)
+
+    def _batches(self, steps, batch_size):
+        """
+        Groups the steps of a path generator into batches.
+
+        Args:
+            steps (generator): The generator of the path, yielding the coordinates of every step.
+            batch_size (int): The number of steps of a batch.
+
+        Yields:
+            StepBatch: The batches, the last one possibly shorter.
+        """
+        start = self._step
+        while True:
+            before = self._counters()
+            cells = list(islice(steps, batch_size))
+            if not cells:
+                return
+            rows, cols = np.array(cells, dtype=np.int64).reshape(-1, 2).T
+            disarmed = np.fromiter((cell in self.disarmed_locations for cell in cells), dtype=bool, count=len(cells))
+            yield self._make_batch(start, rows, cols, disarmed, before)
+            start += len(cells)
+
+    def _fast_batches(self, batch_size):
+        """
+        Runs the array kernel over the path, a batch at a time.
+
+        Args:
+            batch_size (int, optional): The number of steps of a batch. None runs the whole path as one batch.
+
+        Yields:
+            StepBatch: The batches, the last one possibly shorter.
+        """
+        kernel = PathKernel(self)
+        batch_size = batch_size or max(kernel.length, 1)
+        for start in range(self._step, kernel.length, batch_size):
+            before = self._counters()
+            kernel.advance(start + batch_size)
+            rows, cols = self.planner.coordinates(start, self._step)
+            yield self._make_batch(start, rows, cols, self.disarmed_grid[rows, cols], before)
+        self.accuracy = self._good_predictions / kernel.length
+
+    def _prepare(self):
+        """
+        Trains the classifier if needed, plans the route and predicts the labels of the path.
+
+        A simulation restored from a checkpoint is already prepared.
+        """
+        if self.prediction_grid is not None:
+            return
+        if self.verbose:
+            print(f"Sprawdźmy ilu mamy wszystkich żołnierzy: {self.amount_of_soldiers}")
+        if not self._classifier.is_trained_on(self.split):
+            with self._phase("train"):
+                self._classifier.train(self.split)
+        with self._phase("plan"):
+            self.planner.plan(self)
+        with self._phase("inference"):
+            self.prediction_grid = self._predict_path()
+
+    def _report(self):
+        """
+        Adds the special-forces events to the metrics, if there are any, and prints the summary and the event log, if
+        the simulation is verbose.
+        """
+        if self.metrics is not None:
+            self.metrics.count_events(self.events)
+        if not self.verbose:
+            return
         print(f"Dokładność klasyfikatora: {self._classifier} wynosi: {self.accuracy * 100:.2f}%")
         print(f"All soldiers (special included): {self.survivors} out of {self.amount_of_soldiers}")
         print(f"Amount of Mines on board: {self.board.amount_of_mines}.")
@@ -73,9 +366,237 @@ class Simulation:
         print(f"The remaining Special force soldiers: {len(self._special_soldiers)}")
         print(f"Found disarming kits : {self.found_kits}")
         print("\nRandom Events Log:")
-        for event in self.random_events_log:
+        for event in self.events.lines():
             print(event)
 
+    @property
+    def random_events_log(self):
+        """
+        list: The retained events formatted as text. Formatting happens on every access.
+        """
+        return list(self.events.lines())
+
+    def run(self, fast=False, checkpoint_path=None, checkpoint_every=None):
+        """
+        Runs the whole simulation, or the rest of a resumed one, without a consumer and returns its results.
+
+        Args:
+            fast (bool, optional): Whether to run the walk with the array kernel (:class:`PathKernel`). It gives the
+                same counters as the generator for the same seed but records no events, only the counts of the
+                special-forces ones, and marks disarmed cells in ``disarmed_grid``. Default is False.
+            checkpoint_path (str, optional): The file a checkpoint is written to periodically during the walk.
+            checkpoint_every (int, optional): The number of steps between two checkpoints. Default is
+                ``CHECKPOINT_EVERY``.
+
+        Returns:
+            dict: The results of the simulation, see :meth:`results`.
+        """
+        if not fast or checkpoint_path is not None:
+            # Tryb szybki z punktami kontrolnymi idzie partiami o długości odstępu między nimi
+            batch_size = (checkpoint_every or self.CHECKPOINT_EVERY) if fast else None
+            for _ in self.simulate(batch_size, fast, checkpoint_path, checkpoint_every):
+                pass
+            return self.results()
+
+        self._prepare()
+        with self._phase("walk"):
+            kernel = PathKernel(self)
+            kernel.advance(kernel.length)
+        self.accuracy = self._good_predictions / kernel.length
+        self._report()
+        return self.results()
+
+    def results(self):
+        """
+        Returns the counters describing the outcome of the simulation.
+
+        Returns:
+            dict: Survivors, disarmed mines and bombs, mines and bombs on board, found kits, remaining special
+            soldiers and classifier accuracy.
+        """
+        return {
+            "survivors": self.survivors,
+            "amount_of_soldiers": self.amount_of_soldiers,
+            "disarmed_mines": self.disarmed_mines,
+            "disarmed_bombs": self.disarmed_bombs,
+            "amount_of_mines": self.board.amount_of_mines,
+            "amount_of_bombs": self.board.amount_of_bombs,
+            "found_kits": self.found_kits,
+            "special_soldiers": len(self._special_soldiers),
+            "accuracy": self.accuracy,
+        }
+
+    def save_checkpoint(self, path, compress=True):
+        """
+        Writes the state of the simulation between two steps to a checkpoint file.
+
+        The checkpoint holds the board arrays, the prediction grid, the planned route, the roster arrays, the
+        states of the random generators, the step the walk stopped at, the counters, the disarmed cells and the
+        event log. The classifier is not saved; the walk only needs its predictions. A board stored in files
+        (:class:`MappedBoard`) is referred to by its directory instead, and its grids are flushed to their files.
+
+        Args:
+            path (str): The path of the checkpoint file.
+            compress (bool, optional): Whether to compress the arrays. Default is True.
+        """
+        with self._phase("checkpoint"):
+            write_checkpoint(path, *self._checkpoint_state(), compress=compress)
+
+    def _checkpoint_state(self):
+        """
+        Collects the state of the simulation.
+
+        Returns:
+            tuple: The JSON-serializable metadata (dict) and the arrays (dict) of the state.
+        """
+        meta = {
+            "size_of_board": self.board.size_of_board,
+            "mine_probability": self.board.mine_probability,
+            "classifier_name": self._classifier.classifier_name,
+            "type_of_path": self.type_of_path,
+            "amount_of_soldiers": self.amount_of_soldiers,
+            "split": list(self.split.key),
+            "seed": {"entropy": self.seed_sequence.entropy, "spawn_key": list(self.seed_sequence.spawn_key)},
+            "feature_dtype": self.board.feature_dtype.str,
+            "board_rng": self.board.rng.bit_generator.state,
+            "roster_rng": self._special_soldiers.rng.bit_generator.state,
+            "log": {"retention": self.events.retention, "capacity": self.events.capacity},
+            "step": self._step,
+            "survivors": self.survivors,
+            "good_predictions": self._good_predictions,
+            "disarmed_mines": self.disarmed_mines,
+            "disarmed_bombs": self.disarmed_bombs,
+            "found_kits": self.found_kits,
+            "accuracy": self.accuracy,
+        }
+        arrays = {"disarmed_locations": np.array(sorted(self.disarmed_locations), dtype=np.int64).reshape(-1, 2)}
+        grids = {"prediction_grid": self.prediction_grid}
+        if self.disarmed_grid is not None:
+            grids["disarmed_grid"] = self.disarmed_grid
+        if isinstance(self.board, MappedBoard):
+            # Plansza w plikach - punkt kontrolny wskazuje jej katalog zamiast kopiować tablice
+            meta["board_storage"] = os.path.abspath(self.board.directory)
+            meta["grids"] = list(grids)
+            for grid in grids.values():
+                grid.flush()
+        else:
+            arrays.update(board=self.board.array, feature_indices=self.board.feature_indices, **grids)
+        for prefix, state in (
+            ("route", self.planner.state()),
+            ("roster", self._special_soldiers.state()),
+            ("events", self.events.state()),
+        ):
+            arrays.update({f"{prefix}_{name}": array for name, array in state.items()})
+        return meta, arrays
+
+    @classmethod
+    def from_checkpoint(cls, path, split=None, classifier=None, verbose=True, metrics=None):
+        """
+        Restores a simulation from a checkpoint; :meth:`simulate` or :meth:`run` then continue its walk.
+
+        Args:
+            path (str): The path of the checkpoint file.
+            split (DataSplit, optional): The train/test split of the simulation. Default is the split of the
+                registry with the key stored in the checkpoint.
+            classifier (ClassifierGeneral, optional): A classifier to attach instead of a new, untrained one. The
+                walk does not need it.
+            verbose (bool, optional): Whether to print the summary and the log at the end. Default is True.
+            metrics (Metrics, optional): A registry recording the phases of the rest of the simulation.
+
+        Returns:
+            Simulation: The simulation, at the step the checkpoint was written at.
+
+        Raises:
+            ValueError: If the checkpoint is of an unsupported version.
+        """
+        meta, arrays = read_checkpoint(path)
+        if split is None:
+            split = DataRegistry.get_split(*meta["split"])
+        if "board_storage" in meta:
+            board = MappedBoard.open(meta["board_storage"], split)
+        else:
+            board = Board.from_arrays(
+                arrays["board"], arrays["feature_indices"], meta["mine_probability"], split, meta["feature_dtype"]
+            )
+        board.rng.bit_generator.state = meta["board_rng"]
+        simulation = cls(
+            meta["size_of_board"],
+            meta["mine_probability"],
+            meta["classifier_name"],
+            meta["type_of_path"],
+            meta["amount_of_soldiers"],
+            split=split,
+            classifier=classifier,
+            verbose=verbose,
+            log_retention=meta["log"]["retention"],
+            log_capacity=meta["log"]["capacity"],
+            seed=np.random.SeedSequence(meta["seed"]["entropy"], spawn_key=meta["seed"]["spawn_key"]),
+            metrics=metrics,
+            board=board,
+        )
+        simulation._load_checkpoint_state(meta, arrays)
+        return simulation
+
+    def _load_checkpoint_state(self, meta, arrays):
+        """
+        Restores the mutable state of the simulation from a checkpoint.
+
+        Args:
+            meta (dict): The metadata of the state.
+            arrays (dict): The arrays of the state.
+        """
+
+        def state(prefix):
+            return {name[len(prefix) + 1 :]: array for name, array in arrays.items() if name.startswith(prefix + "_")}
+
+        if "board_storage" in meta:
+            arrays = {**arrays, **{name: self.board.open_grid(name) for name in meta["grids"]}}
+        self.prediction_grid = arrays["prediction_grid"]
+        self.planner.load_state(state("route"))
+        self._special_soldiers.load_state(state("roster"))
+        self._special_soldiers.rng.bit_generator.state = meta["roster_rng"]
+        self.events.load_state(state("events"))
+        self.disarmed_locations = set(map(tuple, arrays["disarmed_locations"].tolist()))
+        self.disarmed_grid = arrays.get("disarmed_grid")
+        self._step = meta["step"]
+        self.survivors = meta["survivors"]
+        self._good_predictions = meta["good_predictions"]
+        self.disarmed_mines = meta["disarmed_mines"]
+        self.disarmed_bombs = meta["disarmed_bombs"]
+        self.found_kits = meta["found_kits"]
+        self.accuracy = meta["accuracy"]
+
+    def _predict_path(self):
+        """
+        Predicts the labels of every cell on the path.
+
+        Labels come from the board's cached inference over its test pool, gathered ``PREDICTION_CHUNK`` cells at
+        a time. A board in files whose every cell is on the path gathers them tile by tile across its pipeline
+        instead.
+
+        Returns:
+            np.ndarray: A grid with the predicted label of every visited cell and -1 elsewhere.
+        """
+        if isinstance(self.board, MappedBoard) and self.planner.length == self.board.size_of_board**2:
+            return self.board.predict_grid(self._classifier)
+        grid = self.board.new_grid("prediction_grid", np.int8, -1)
+        for start in range(0, self.planner.length, self.PREDICTION_CHUNK):
+            rows, cols = self.planner.coordinates(start, start + self.PREDICTION_CHUNK)
+            grid[rows, cols] = self.board.labels_at(self._classifier, rows, cols)
+        return grid
+
+    def board_inference(self):
+        """
+        Returns the labels and calibrated probabilities predicted for every vector of the board's test pool.
+
+        The labels are the ones the walk uses; cells index both arrays through ``board.feature_indices``.
+
+        Returns:
+            tuple: The predicted labels (int8, shape (pool,)) and the probabilities of the labels 0-2 (float32,
+            shape (pool, 3)).
+        """
+        return self.board.inference(self._classifier)
+
     def _manage_soldiers(self, predicted_label, x, y):
         """
         Manages the actions of soldiers based on the presence of mines or bombs.
@@ -85,46 +606,59 @@ class Simulation:
             x (int): The x-coordinate of the cell.
             y (int): The y-coordinate of the cell.
         """
-        special_soldier = self._special_soldiers.pop()  # It could be sapper or heavy, but there is an interface
+        roster = self._special_soldiers
+        index = roster.pop_last()  # It could be sapper or heavy, the roster applies the right reaction
         if predicted_label == 1:
-            special_soldier.react_to_mine()
+            roster.react_to_mine(index)
         elif predicted_label == 2:
-            special_soldier.react_to_bomb()
-        if isinstance(special_soldier, Heavy):
-            if special_soldier.health != 0:
-                self.random_events_log.append(
-                    f"Heavy saves us, HeavyStats: Health: {special_soldier.health}," f" Armor: {special_soldier.armor}"
-                )
-                self._special_soldiers.append(special_soldier)
+            roster.react_to_bomb(index)
+        health = int(roster.health[index])
+        if roster.kind[index] == HEAVY:
+            if health != 0:
+                self.events.append(self._step, x, y, EventCode.HEAVY_SAVES, health, int(roster.armor[index]))
+                roster.push_back(index)
             else:
-                self.random_events_log.append("Heavy sacrificed himself and DIED.")
+                self.events.append(self._step, x, y, EventCode.HEAVY_DIED)
                 self.survivors = max(0, self.survivors - 1)
-                self.random_events_log.append(f"Survivors: {self.survivors}/{self.amount_of_soldiers}")
+                self.events.append(self._step, x, y, EventCode.SURVIVORS, value=self.survivors)
         else:
-            if special_soldier.health != 0:
-                self._special_soldiers.append(special_soldier)
+            if health != 0:
+                roster.push_back(index)
                 if predicted_label == 1:
                     self.disarmed_mines += 1
-                    self.random_events_log.append(f"Sapper disarmed MINE!")
+                    self.events.append(self._step, x, y, EventCode.SAPPER_DISARMED_MINE)
                     self.disarmed_locations.add((x, y))
                 else:
                     self.disarmed_bombs += 1
-                    self.random_events_log.append(f"Sapper disarmed BOMB!")
+                    self.events.append(self._step, x, y, EventCode.SAPPER_DISARMED_BOMB)
                     self.disarmed_locations.add((x, y))
             else:
-                self.random_events_log.append("Sapper died during disarming...")
+                self.events.append(self._step, x, y, EventCode.SAPPER_DIED)
                 self.survivors = max(0, self.survivors - 1)
-                self.random_events_log.append(f"Survivors: {self.survivors}/{self.amount_of_soldiers}")
+                self.events.append(self._step, x, y, EventCode.SURVIVORS, value=self.survivors)
+
+    def _visit(self, x, y):
+        """
+        Processes a cell of the path: the classifier's prediction first, then a random event.
+
+        Args:
+            x (int): The x-coordinate of the cell.
+            y (int): The y-coordinate of the cell.
+        """
+        event, casualty_draw, amount_draw = self._draws.at(self._step)
+        self._update_game_stats(x, y, casualty_draw)
+        self._random_event(x, y, event, amount_draw)
 
-    def _update_game_stats(self, x, y):
+    def _update_game_stats(self, x, y, casualty_draw):
         """
         Updates the game statistics based on the classifier's prediction and the actual label of the cell.
 
         Args:
             x (int): The x-coordinate of the cell.
             y (int): The y-coordinate of the cell.
+            casualty_draw (float): The uniform draw deciding the casualties of a missed mine or bomb.
         """
-        predicted_label = self._classifier.predict(self.board.assigned_test_features[x, y])
+        predicted_label = self.prediction_grid[x, y]
         actual_label = self.board.array[x][y]
         is_mine = actual_label == 1
         is_bomb = actual_label == 2
@@ -132,138 +666,148 @@ class Simulation:
 
         if actual_label == predicted_label and empty:
             self._good_predictions += 1
-            self.random_events_log.append("Good prediction, there is no mine nor bomb.")
+            self.events.append(self._step, x, y, EventCode.GOOD_PREDICTION)
 
         elif actual_label == predicted_label and is_mine:
             self._good_predictions += 1
             self.disarmed_mines += 1
-            self.random_events_log.append("Disarmed mine, because of good prediction!")
+            self.events.append(self._step, x, y, EventCode.DISARMED_MINE)
             self.disarmed_locations.add((x, y))
 
         elif actual_label == predicted_label and is_bomb:
             self._good_predictions += 1
             self.disarmed_bombs += 1
-            self.random_events_log.append("Disarmed bomb, because of good prediction. WE'RE LUCKY SIR!")
+            self.events.append(self._step, x, y, EventCode.DISARMED_BOMB)
             self.disarmed_locations.add((x, y))
 
         elif actual_label != predicted_label and is_mine:
             if self._special_soldiers:
-                self.random_events_log.append("Bad prediction, but here are our SPECIAL FORCES SIR!")
+                self.events.append(self._step, x, y, EventCode.SPECIAL_FORCES)
                 self._manage_soldiers(actual_label, x, y)
             else:
-                casualties = random.randint(1, 5)
+                casualties = draw_integers(casualty_draw, 1, 5)
                 self.survivors = max(0, self.survivors - casualties)
                 if self.survivors != 0:
-                    self.random_events_log.append(
-                        f"Bad prediction (MINE) and there are no special forces available. Lost casualties: {casualties}"
-                    )
-                    self.random_events_log.append(f"Survivors: {self.survivors}/{self.amount_of_soldiers}")
+                    self.events.append(self._step, x, y, EventCode.MINE_CASUALTIES, casualties)
+                    self.events.append(self._step, x, y, EventCode.SURVIVORS, value=self.survivors)
                 else:
-                    self.random_events_log.append("Bad prediction and ALL SOLDIERS ARE DEAD")
+                    self.events.append(self._step, x, y, EventCode.ALL_DEAD)
 
         elif actual_label != predicted_label and is_bomb:
             if self._special_soldiers:
-                self.random_events_log.append("Bad prediction, but here are our SPECIAL FORCES SIR!")
+                self.events.append(self._step, x, y, EventCode.SPECIAL_FORCES)
                 self._manage_soldiers(actual_label, x, y)
             else:
                 if self.amount_of_soldiers >= 500:
-                    casualties = random.randint(25, 50)
+                    casualties = draw_integers(casualty_draw, 25, 50)
                 else:
-                    casualties = random.randint(5, 15)
+                    casualties = draw_integers(casualty_draw, 5, 15)
                 self.survivors = max(0, self.survivors - casualties)
                 if self.survivors != 0:
-                    self.random_events_log.append(
-                        f"Bad prediction (BOMB) and there are no special forces available. Lost casualties: {casualties}"
-                    )
-                    self.random_events_log.append(f"Survivors: {self.survivors}/{self.amount_of_soldiers}")
+                    self.events.append(self._step, x, y, EventCode.BOMB_CASUALTIES, casualties)
+                    self.events.append(self._step, x, y, EventCode.SURVIVORS, value=self.survivors)
                 else:
-                    self.random_events_log.append("Bad prediction and ALL SOLDIERS ARE DEAD")
+                    self.events.append(self._step, x, y, EventCode.ALL_DEAD)
 
         elif actual_label != predicted_label and empty:
-            self.random_events_log.append("BAD PREDICTION, but there is no mine nor bomb, WE ARE REALLY LUCKY!")
+            self.events.append(self._step, x, y, EventCode.LUCKY_MISS)
 
     def _diagonal_path(self):
         """
         Simulates the movement of soldiers along a diagonal path on the board.
         """
-        i, j = 0, 0
+        i, j = self._step, self._step
         while i < self.board.size_of_board and j < self.board.size_of_board:
             # print(f"Diagonal path: updating stats for ({i}, {j})")  # Debug statement
-            self._update_game_stats(i, j)
-            self._random_event()
+            self._visit(i, j)
+            self.events.append(self._step, i + 1, j + 1, EventCode.MOVE)
+            self._step += 1
             yield i, j
             i += 1
             j += 1
-            self.random_events_log.append(f"Moving to [{i}][{j}]")
         self.accuracy = self._good_predictions / self.board.size_of_board
 
     def _horizontal_path(self):
         """
         Simulates the movement of soldiers along a horizontal path on the board.
         """
-        i = 0
+        # Wznowiona symulacja zaczyna w środku wiersza
+        i, offset = divmod(self._step, self.board.size_of_board)
         while i < self.board.size_of_board:
             if i % 2 == 0:
-                for j in range(self.board.size_of_board):
+                for j in range(offset, self.board.size_of_board):
                     # print(f"Horizontal path: updating stats for ({i}, {j})")  # Debug statement
-                    self._update_game_stats(i, j)
-                    self._random_event()
+                    self._visit(i, j)
+                    self.events.append(self._step, i, j, EventCode.MOVE)
+                    self._step += 1
                     yield i, j
-                    self.random_events_log.append(f"Moving to [{i}][{j}]")
             else:
-                for j in reversed(range(self.board.size_of_board)):
+                for j in reversed(range(self.board.size_of_board - offset)):
                     # print(f"Horizontal path: updating stats for ({i}, {j})")  # Debug statement
-                    self._update_game_stats(i, j)
-                    self._random_event()
+                    self._visit(i, j)
+                    self.events.append(self._step, i, j, EventCode.MOVE)
+                    self._step += 1
                     yield i, j
-                    self.random_events_log.append(f"Moving to [{i}][{j}]")
+            offset = 0
             i += 1
         self.accuracy = self._good_predictions / (self.board.size_of_board * self.board.size_of_board)
 
-    def _random_event(self):
+    def _planned_path(self):
+        """
+        Simulates the movement of soldiers along the route of the path planner.
+        """
+        for start in range(self._step, self.planner.length, self.PREDICTION_CHUNK):
+            rows, cols = self.planner.coordinates(start, start + self.PREDICTION_CHUNK)
+            for i, j in zip(rows.tolist(), cols.tolist()):
+                self._visit(i, j)
+                self.events.append(self._step, i, j, EventCode.MOVE)
+                self._step += 1
+                yield i, j
+        self.accuracy = self._good_predictions / self.planner.length
+
+    def _random_event(self, x, y, rnd_num, amount_draw):
         """
-        Generates and handles random events during the simulation.
+        Handles the random event drawn for the current step.
+
+        Args:
+            x (int): The x-coordinate of the current cell.
+            y (int): The y-coordinate of the current cell.
+            rnd_num (int): The type of the event: 1 found kit, 2 enemy, 3 recruits.
+            amount_draw (float): The uniform draw deciding the kits, casualties or recruits of the event.
         """
-        rnd_num = random.randint(1, 3)
 
         if self.survivors == 0:
             self._special_soldiers.clear()
 
-        special_soldier = None
-        if rnd_num == 1:
-            if any(isinstance(soldier, Sapper) for soldier in self._special_soldiers):
-                for index, soldier in enumerate(self._special_soldiers):
-                    if isinstance(soldier, Sapper):
-                        special_soldier = self._special_soldiers.pop(index)
-                        break
-                special_soldier.add_kit()
-                self._special_soldiers.append(special_soldier)
+        roster = self._special_soldiers
+        if rnd_num == EVENT_FOUND_KIT:
+            index = roster.pop_first(SAPPER)
+            if index is not None:
+                roster.add_kit(index, draw_integers(amount_draw, 1, 2))
+                roster.push_back(index)
                 self.found_kits += 1
-                self.random_events_log.append("RANDOM EVENT - Found disarming kit, adding it to SAPPER inventory.")
+                self.events.append(self._step, x, y, EventCode.KIT_FOUND)
             else:
-                self.random_events_log.append("RANDOM EVENT - Found disarming kit, BUT THERE AREN'T ANY SAPPERS")
-
-        elif rnd_num == 2:
-            if any(isinstance(soldier, Heavy) for soldier in self._special_soldiers):
-                for index, soldier in enumerate(self._special_soldiers):
-                    if isinstance(soldier, Heavy):
-                        special_soldier = self._special_soldiers.pop(index)
-                        break
-                special_soldier.react_to_enemy()
-                self.random_events_log.append("Enemy unit encountered, HEAVY DIED SAVING US!")
+                self.events.append(self._step, x, y, EventCode.KIT_NO_SAPPERS)
+
+        elif rnd_num == EVENT_ENEMY:
+            index = roster.pop_first(HEAVY)
+            if index is not None:
+                roster.react_to_enemy(index)
+                self.events.append(self._step, x, y, EventCode.ENEMY_HEAVY_DIED)
                 self.survivors = max(0, self.survivors - 1)
-                self.random_events_log.append(f"Survivors: {self.survivors}/{self.amount_of_soldiers}")
+                self.events.append(self._step, x, y, EventCode.SURVIVORS, value=self.survivors)
             else:
                 if self.survivors != 0:
-                    casualties = random.randint(1, 5)
+                    casualties = draw_integers(amount_draw, 1, 5)
                     self.survivors = max(0, self.survivors - casualties)
-                    self.random_events_log.append(f"Enemy unit encountered -> Lost: {casualties} casualties")
-                    self.random_events_log.append(f"Survivors: {self.survivors}/{self.amount_of_soldiers}")
+                    self.events.append(self._step, x, y, EventCode.ENEMY_CASUALTIES, casualties)
+                    self.events.append(self._step, x, y, EventCode.SURVIVORS, value=self.survivors)
                 else:
-                    self.random_events_log.append("Enemy unit encountered, but all soldiers are dead.")
+                    self.events.append(self._step, x, y, EventCode.ENEMY_ALL_DEAD)
 
         else:
-            recruits = random.randint(1, 3)
+            recruits = draw_integers(amount_draw, 1, 3)
             self.survivors += recruits
-            self.random_events_log.append(f"Recruited new soldiers: Gained: {recruits} soldiers.")
-            self.random_events_log.append(f"Survivors: {self.survivors}/{self.amount_of_soldiers}")
+            self.events.append(self._step, x, y, EventCode.RECRUITED, recruits)
+            self.events.append(self._step, x, y, EventCode.SURVIVORS, value=self.survivors)
@@ -0,0 +1,167 @@
+import threading
+import time
+import traceback
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from aifield.simulation import Simulation
+
+
+class SimulationWorker(QObject):
+    """
+    Runs a simulation in a worker thread and reports it through signals.
+
+    The worker is moved to a ``QThread`` whose ``started`` signal is connected to :meth:`run`. Building the board
+    (which loads the data), training and the walk all happen in that thread; batches of steps reach the GUI thread
+    as queued signals; the simulation does not print, the window shows its results. :meth:`pause`, :meth:`resume` and
+    :meth:`cancel` are called directly from the GUI thread, since the worker's own event loop is busy while it runs;
+    they take effect between batches.
+
+    Signals:
+        status (str): A description of the phase the worker entered.
+        ready (Simulation): The simulation, once it is built.
+        batch_ready (StepBatch): A batch of steps of the walk.
+        logged (np.ndarray): The records of the event log after a batch, flushed in the worker thread.
+        progress (int, int, float, float): The steps done, the length of the path, the throughput in steps per
+            second and the estimated seconds left.
+        failed (str): The traceback of an error that stopped the simulation.
+        finished (str): The outcome: "completed", "cancelled" or "failed".
+
+    Attributes:
+        size_of_board (int): The size of the board.
+        mine_probability (float): The probability of a cell containing a mine or bomb.
+        classifier_name (str): The name of the classifier to use.
+        type_of_path (str): The type of path soldiers take.
+        amount_of_soldiers (int): The initial number of soldiers.
+        batch_size (int): The number of steps of a batch.
+        interval (float): The shortest time between two batches in seconds, which paces the animation.
+        simulation (Simulation or None): The simulation, once it is built.
+    """
+
+    status = pyqtSignal(str)
+    ready = pyqtSignal(object)
+    batch_ready = pyqtSignal(object)
+    logged = pyqtSignal(object)
+    progress = pyqtSignal(int, int, float, float)
+    failed = pyqtSignal(str)
+    finished = pyqtSignal(str)
+
+    def __init__(
+        self,
+        size_of_board,
+        mine_probability,
+        classifier_name,
+        type_of_path,
+        amount_of_soldiers,
+        batch_size,
+        interval=0.0,
+    ):
+        """
+        Initializes the worker.
+
+        Args:
+            size_of_board (int): The size of the board.
+            mine_probability (float): The probability of a cell containing a mine or bomb.
+            classifier_name (str): The name of the classifier to use.
+            type_of_path (str): The type of path soldiers take.
+            amount_of_soldiers (int): The initial number of soldiers.
+            batch_size (int): The number of steps of a batch.
+            interval (float, optional): The shortest time between two batches in seconds. Default is 0.
+        """
+        super().__init__()
+        self.size_of_board = size_of_board
+        self.mine_probability = mine_probability
+        self.classifier_name = classifier_name
+        self.type_of_path = type_of_path
+        self.amount_of_soldiers = amount_of_soldiers
+        self.batch_size = batch_size
+        self.interval = interval
+        self.simulation = None
+        self._cancelled = threading.Event()
+        self._resumed = threading.Event()
+        self._resumed.set()
+
+    def pause(self):
+        """
+        Pauses the walk after the current batch.
+        """
+        self._resumed.clear()
+
+    def resume(self):
+        """
+        Resumes a paused walk.
+        """
+        self._resumed.set()
+
+    def cancel(self):
+        """
+        Stops the simulation after the current batch or phase, also when it is paused.
+        """
+        self._cancelled.set()
+        self._resumed.set()
+
+    @property
+    def is_paused(self):
+        """
+        bool: Whether the walk is paused.
+        """
+        return not self._resumed.is_set()
+
+    def run(self):
+        """
+        Builds and runs the simulation, emitting its batches and progress, then the outcome.
+        """
+        try:
+            outcome = self._run()
+        except Exception:
+            self.failed.emit(traceback.format_exc())
+            outcome = "failed"
+        self.finished.emit(outcome)
+
+    def _run(self):
+        """
+        Builds and runs the simulation.
+
+        Returns:
+            str: "completed" or "cancelled".
+        """
+        self.status.emit("Building the board")
+        self.simulation = Simulation(
+            self.size_of_board,
+            self.mine_probability,
+            self.classifier_name,
+            self.type_of_path,
+            self.amount_of_soldiers,
+            verbose=False,
+        )
+        if self._cancelled.is_set():
+            return "cancelled"
+        self.ready.emit(self.simulation)
+
+        self.status.emit("Training the classifier and planning the route")
+        # Przepustowość liczona bez pierwszej partii (trening, planowanie) i bez czasu pauz i odstępów
+        walked, walking, last = 0, 0.0, None
+        for batch in self.simulation.simulate(batch_size=self.batch_size):
+            if last is None:
+                self.status.emit("Walking the path")
+            else:
+                walking += time.perf_counter() - last
+                walked += len(batch)
+            total = self.simulation.planner.length
+            throughput = walked / walking if walking > 0 else 0.0
+            remaining = total - batch.stop
+            eta = float("nan")
+            if throughput > 0:
+                eta = remaining / throughput + -(-remaining // self.batch_size) * self.interval
+            self.batch_ready.emit(batch)
+            self.logged.emit(self.simulation.events.records())
+            self.progress.emit(batch.stop, total, throughput, eta)
+
+            if self._cancelled.wait(self.interval):
+                return "cancelled"
+            self._resumed.wait()
+            if self._cancelled.is_set():
+                return "cancelled"
+            last = time.perf_counter()
+        self.logged.emit(self.simulation.events.records())
+        return "completed"
@@ -132,8 +132,11 @@ class Sapper(Soldier):
         else:
             self.health = 0
 
-    def add_kit(self):
+    def add_kit(self, rng=None):
         """
         Adds a random number of disarming kits (1 or 2) to the sapper's inventory.
+
+        Args:
+            rng (np.random.Generator, optional): The source of randomness. Default is the global random module.
         """
-        self.disarming_kits += random.randint(1, 2)
+        self.disarming_kits += int(rng.integers(1, 3)) if rng is not None else random.randint(1, 2)
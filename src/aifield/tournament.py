@@ -0,0 +1,363 @@
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+
+import numpy as np
+
+from aifield.batch import RESULT_FIELDS, BatchResult, BatchRunner, Scenario
+from aifield.classifier_general import ClassifierGeneral
+from aifield.data_reader import DataReader
+from aifield.dataset_registry import DEFAULT_DATA_PATH, DataRegistry
+from aifield.simulation import Simulation
+
+CLASSIFIERS = (
+    "RandomForest",
+    "GradientBoosting",
+    "LogisticRegression",
+    "KNN",
+    "SVM",
+    "DecisionTree",
+    "DummyClassifier",
+    "GaussianNB",
+    "LinearSVC",
+)
+
+RANKED_METRICS = ("survival_rate", "accuracy", "disarm_rate")
+
+# Kwantyl rozkładu normalnego dla 95% przedziału ufności
+Z_95 = 1.959963984540054
+
+
+class TournamentResult:
+    """
+    The outcomes of a tournament, per classifier and scenario, and their ranking.
+
+    Attributes:
+        results (dict): The :class:`BatchResult` of every (classifier name, scenario) pair.
+        worker_times (dict): The seconds spent by the workers on every classifier, fitting included, summed over
+            the pool - with several workers it exceeds the elapsed time.
+        wall_time (float): The elapsed seconds of the whole tournament.
+    """
+
+    def __init__(self, results, worker_times, wall_time):
+        """
+        Initializes the result.
+
+        Args:
+            results (dict): The batch result of every (classifier name, scenario) pair.
+            worker_times (dict): The worker seconds spent on every classifier.
+            wall_time (float): The elapsed seconds of the whole tournament.
+        """
+        self.results = results
+        self.worker_times = worker_times
+        self.wall_time = wall_time
+
+    def ranking(self):
+        """
+        Ranks the classifiers by their mean survival rate over every scenario and replica, then by accuracy.
+
+        Returns:
+            list: One dict per classifier, best first, with the rank, the name, the number of runs, the mean and
+            95% confidence interval half-width of every metric of ``RANKED_METRICS`` and the worker time.
+        """
+        rows = []
+        for name in self.worker_times:
+            distributions = [
+                result.distributions() for (classifier, _), result in self.results.items() if classifier == name
+            ]
+            row = {"classifier": name, "runs": 0}
+            for metric in RANKED_METRICS:
+                values = np.concatenate([distribution[metric] for distribution in distributions])
+                row["runs"] = values.size
+                row[metric] = float(values.mean()) if values.size else float("nan")
+                spread = values.std(ddof=1) / np.sqrt(values.size) if values.size > 1 else 0.0
+                row[f"{metric}_ci"] = float(Z_95 * spread)
+            row["worker_time"] = self.worker_times[name]
+            rows.append(row)
+
+        rows.sort(key=lambda row: (-row["survival_rate"], -row["accuracy"]))
+        for rank, row in enumerate(rows, start=1):
+            row["rank"] = rank
+        return rows
+
+    def table(self):
+        """
+        Formats the ranking as a text table.
+
+        Returns:
+            str: One line per classifier, best first, with means and 95% confidence intervals, then the elapsed time.
+        """
+        header = f"{'#':>2}  {'Classifier':<20}{'Runs':>6}"
+        header += "".join(f"{metric:>22}" for metric in RANKED_METRICS) + f"{'Worker time [s]':>17}"
+        lines = [header, "-" * len(header)]
+        for row in self.ranking():
+            line = f"{row['rank']:>2}  {row['classifier']:<20}{row['runs']:>6}"
+            for metric in RANKED_METRICS:
+                line += f"{row[metric]:>13.4f} ± {row[metric + '_ci']:<6.4f}"
+            line += f"{row['worker_time']:>17.2f}"
+            lines.append(line)
+        lines.append(f"Wall time: {self.wall_time:.2f} s")
+        return "\n".join(lines)
+
+    def to_dict(self):
+        """
+        Returns the ranking and the per-scenario summaries in a JSON-serializable form.
+
+        Returns:
+            dict: The ranking, the elapsed seconds and one summary per (classifier, scenario) pair.
+        """
+        return {
+            "ranking": self.ranking(),
+            "wall_time": self.wall_time,
+            "scenarios": [result.summary() for result in self.results.values()],
+        }
+
+
+# Stan procesu roboczego - dane wczytane raz, każdy klasyfikator trenowany raz na proces
+_worker_state = {}
+
+
+def _init_worker(data_path):
+    """
+    Loads the shared split of a worker once.
+
+    Args:
+        data_path (str): The path to the CSV file with the augmented Iris dataset.
+    """
+    _worker_state.update(split=DataRegistry.get_split(data_path), classifiers={})
+
+
+def _classifier(name):
+    """
+    Returns the worker's classifier of a name, fitting it on first use.
+
+    Args:
+        name (str): The name of the classifier.
+
+    Returns:
+        ClassifierGeneral: The trained classifier.
+    """
+    classifiers = _worker_state["classifiers"]
+    if name not in classifiers:
+        classifier = ClassifierGeneral(name, random_state=42)
+        classifier.train(_worker_state["split"])
+        classifiers[name] = classifier
+    return classifiers[name]
+
+
+def _run_match(task):
+    """
+    Runs replicas of a scenario with one classifier.
+
+    Args:
+        task (tuple): The scenario and the seeds of the replicas.
+
+    Returns:
+        tuple: The scenario, one tuple of ``RESULT_FIELDS`` values per replica and the seconds spent.
+    """
+    scenario, seeds = task
+    started = time.perf_counter()
+    classifier = _classifier(scenario.classifier_name)
+    rows = []
+    for seed in seeds:
+        simulation = Simulation(
+            scenario.size_of_board,
+            scenario.mine_probability,
+            scenario.classifier_name,
+            scenario.type_of_path,
+            scenario.amount_of_soldiers,
+            split=_worker_state["split"],
+            classifier=classifier,
+            verbose=False,
+            log_retention="counters",
+            seed=seed,
+        )
+        results = simulation.run(fast=True)
+        rows.append((seed,) + tuple(results[name] for name in RESULT_FIELDS[1:]))
+    return scenario, rows, time.perf_counter() - started
+
+
+class Tournament:
+    """
+    Runs every classifier over a grid of scenarios across a process pool and ranks them.
+
+    Every combination of board size, mine probability and type of path is a scenario. All classifiers play the same
+    replica seeds of a scenario, so they are compared on the same boards and random events. Workers load the split
+    once (from the memory-mapped dataset cache) and fit every classifier at most once.
+
+    Attributes:
+        classifiers (list): The names of the classifiers.
+        scenarios (list): The scenario grid, without the classifier name.
+        replicas (int): The number of replicas of every scenario.
+        data_path (str): The path to the CSV file with the augmented Iris dataset.
+        workers (int): The number of worker processes; 0 runs everything in the calling process.
+        chunk_size (int): The number of replicas sent to a worker at once.
+    """
+
+    def __init__(
+        self,
+        classifiers=CLASSIFIERS,
+        board_sizes=(10,),
+        mine_probabilities=(0.2,),
+        types_of_path=("Horizontal",),
+        replicas=30,
+        amount_of_soldiers=100,
+        data_path=DEFAULT_DATA_PATH,
+        workers=None,
+        chunk_size=16,
+    ):
+        """
+        Initializes the tournament.
+
+        Args:
+            classifiers (iterable, optional): The names of the classifiers. Default is all nine.
+            board_sizes (iterable, optional): The sizes of the boards. Default is (10,).
+            mine_probabilities (iterable, optional): The probabilities of a mine or bomb. Default is (0.2,).
+            types_of_path (iterable, optional): The types of path. Default is ("Horizontal",).
+            replicas (int, optional): The number of replicas of every scenario. Default is 30.
+            amount_of_soldiers (int, optional): The initial number of soldiers. Default is 100.
+            data_path (str, optional): The path to the CSV file with the augmented Iris dataset.
+            workers (int, optional): The number of worker processes. Default is the number of CPUs.
+            chunk_size (int, optional): The number of replicas sent to a worker at once. Default is 16.
+        """
+        self.classifiers = list(classifiers)
+        self.scenarios = [
+            Scenario(size, probability, None, path, amount_of_soldiers, data_path)
+            for size, probability, path in itertools.product(board_sizes, mine_probabilities, types_of_path)
+        ]
+        self.replicas = replicas
+        self.data_path = data_path
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.chunk_size = chunk_size
+
+    def _tasks(self, seed):
+        """
+        Builds the tasks of the tournament, grouped by classifier.
+
+        Args:
+            seed (int, optional): The root seed of the tournament.
+
+        Returns:
+            list: Pairs of a scenario and the seeds of a chunk of its replicas.
+        """
+        roots = np.random.SeedSequence(seed).spawn(len(self.scenarios))
+        scenario_seeds = [BatchRunner.replica_seeds(self.replicas, int(root.generate_state(1)[0])) for root in roots]
+        tasks = []
+        for name in self.classifiers:
+            for scenario, seeds in zip(self.scenarios, scenario_seeds):
+                match = replace(scenario, classifier_name=name)
+                for start in range(0, len(seeds), self.chunk_size):
+                    tasks.append((match, seeds[start : start + self.chunk_size]))
+        return tasks
+
+    def run(self, seed=None):
+        """
+        Runs the tournament.
+
+        Args:
+            seed (int, optional): The root seed. Default draws fresh entropy.
+
+        Returns:
+            TournamentResult: The outcomes and the ranking.
+        """
+        started = time.perf_counter()
+        tasks = self._tasks(seed)
+        if self.workers <= 0:
+            _init_worker(self.data_path)
+            return self._collect(map(_run_match, tasks), started)
+
+        # Pamięć podręczną CSV budujemy w procesie głównym, zanim procesy robocze zaczną ją czytać
+        DataReader.open_cache(self.data_path)
+        with ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.data_path,)) as executor:
+            return self._collect(executor.map(_run_match, tasks), started)
+
+    def _collect(self, outcomes, started):
+        """
+        Groups the outcomes of the tasks per classifier and scenario.
+
+        Args:
+            outcomes (iterable): The results of :func:`_run_match`.
+            started (float): The ``time.perf_counter()`` reading taken when the tournament started.
+
+        Returns:
+            TournamentResult: The outcomes and the ranking.
+        """
+        rows = {}
+        worker_times = dict.fromkeys(self.classifiers, 0.0)
+        for scenario, chunk, seconds in outcomes:
+            rows.setdefault(scenario, []).extend(chunk)
+            worker_times[scenario.classifier_name] += seconds
+        # Czas rzeczywisty mierzymy po odebraniu wszystkich wyników, bo executor.map jest leniwe
+        wall_time = time.perf_counter() - started
+        results = {
+            (scenario.classifier_name, scenario): BatchResult(scenario, chunk) for scenario, chunk in rows.items()
+        }
+        return TournamentResult(results, worker_times, wall_time)
+
+
+def build_parser(parser=None):
+    """
+    Builds the command-line arguments of the tournament.
+
+    Args:
+        parser (argparse.ArgumentParser, optional): The parser to add the arguments to. Default creates one.
+
+    Returns:
+        argparse.ArgumentParser: The parser.
+    """
+    if parser is None:
+        parser = argparse.ArgumentParser(description="Rank classifiers over a grid of simulation scenarios.")
+    parser.add_argument("--classifiers", nargs="+", default=list(CLASSIFIERS), choices=CLASSIFIERS)
+    parser.add_argument("--board-sizes", nargs="+", type=int, default=[10])
+    parser.add_argument("--mine-probabilities", nargs="+", type=float, default=[0.2])
+    parser.add_argument("--paths", nargs="+", default=["Horizontal"])
+    parser.add_argument("--replicas", type=int, default=30)
+    parser.add_argument("--soldiers", type=int, default=100)
+    parser.add_argument("--data", default=DEFAULT_DATA_PATH)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    return parser
+
+
+def from_args(args):
+    """
+    Builds a tournament described by parsed command-line arguments.
+
+    Args:
+        args (argparse.Namespace): The arguments of :func:`build_parser`.
+
+    Returns:
+        Tournament: The tournament, not run yet.
+    """
+    return Tournament(
+        args.classifiers,
+        args.board_sizes,
+        args.mine_probabilities,
+        args.paths,
+        args.replicas,
+        args.soldiers,
+        args.data,
+        args.workers,
+    )
+
+
+def main(argv=None):
+    """
+    The entry point of ``python -m aifield.tournament``.
+
+    Args:
+        argv (list, optional): The command-line arguments. Default is ``sys.argv[1:]``.
+    """
+    parser = build_parser()
+    parser.add_argument("--json", action="store_true", help="print the ranking and summaries as JSON")
+    args = parser.parse_args(argv)
+    result = from_args(args).run(args.seed)
+    print(json.dumps(result.to_dict(), indent=2) if args.json else result.table())
+
+
+if __name__ == "__main__":
+    main()
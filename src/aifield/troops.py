@@ -1,41 +1,358 @@
-import random
+from collections import deque
+
+import numpy as np
 
 from aifield.soldier import Heavy, Sapper
 
+HEAVY = 0
+SAPPER = 1
+
+
+class HeavyView(Heavy):
+    """
+    A Heavy soldier whose state lives in a row of a :class:`Roster`; reading and writing it goes to the arrays.
+
+    Attributes:
+        roster (Roster): The roster holding the soldier.
+        index (int): The row of the soldier in the roster.
+    """
+
+    def __init__(self, roster, index):
+        """
+        Initializes the view of a roster row.
+
+        Args:
+            roster (Roster): The roster holding the soldier.
+            index (int): The row of the soldier in the roster.
+        """
+        self.roster = roster
+        self.index = index
+
+    health = property(
+        lambda self: int(self.roster.health[self.index]),
+        lambda self, value: self.roster.health.__setitem__(self.index, value),
+    )
+    armor = property(
+        lambda self: int(self.roster.armor[self.index]),
+        lambda self, value: self.roster.armor.__setitem__(self.index, value),
+    )
+
+
+class SapperView(Sapper):
+    """
+    A Sapper soldier whose state lives in a row of a :class:`Roster`; reading and writing it goes to the arrays.
+
+    Attributes:
+        roster (Roster): The roster holding the soldier.
+        index (int): The row of the soldier in the roster.
+    """
+
+    def __init__(self, roster, index):
+        """
+        Initializes the view of a roster row.
+
+        Args:
+            roster (Roster): The roster holding the soldier.
+            index (int): The row of the soldier in the roster.
+        """
+        self.roster = roster
+        self.index = index
+
+    health = property(
+        lambda self: int(self.roster.health[self.index]),
+        lambda self, value: self.roster.health.__setitem__(self.index, value),
+    )
+    disarming_kits = property(
+        lambda self: int(self.roster.kits[self.index]),
+        lambda self, value: self.roster.kits.__setitem__(self.index, value),
+    )
+
+    def add_kit(self, rng=None):
+        """
+        Adds a random number of disarming kits (1 or 2), drawn from the given generator or the roster's one.
+
+        Args:
+            rng (np.random.Generator, optional): The source of randomness. Default is the roster's generator.
+        """
+        amount = rng.integers(1, 3) if rng is not None else None
+        self.roster.add_kit(self.index, amount)
+
+
+class Roster:
+    """
+    A struct-of-arrays roster of special forces soldiers (Heavy and Sapper).
+
+    Soldiers are rows of numpy columns. The roster keeps the order of the former list of soldiers: every soldier
+    gets an increasing sequence number when it is (re)appended at the end, and every type keeps a queue of its
+    rows in that order. Taking the first soldier of a type, the last soldier overall and appending at the end are
+    therefore all O(1).
+
+    Attributes:
+        kind (np.ndarray): The type of every soldier (``HEAVY`` or ``SAPPER``).
+        health (np.ndarray): The health of every soldier.
+        armor (np.ndarray): The armor of every soldier (0 for Sappers).
+        kits (np.ndarray): The disarming kits of every soldier (0 for Heavies).
+        order (np.ndarray): The sequence number of every soldier in the roster order.
+        rng (np.random.Generator): The source of randomness of kit amounts that are not given explicitly.
+    """
+
+    def __init__(self, kind, health, armor, kits, rng=None):
+        """
+        Initializes the roster with every soldier present, in row order.
+
+        Args:
+            kind (np.ndarray): The type of every soldier.
+            health (np.ndarray): The health of every soldier.
+            armor (np.ndarray): The armor of every soldier.
+            kits (np.ndarray): The disarming kits of every soldier.
+            rng (np.random.Generator, optional): The source of randomness of kit amounts. Default is fresh entropy.
+        """
+        self.rng = np.random.default_rng(rng)
+        self.kind = np.asarray(kind, dtype=np.uint8)
+        self.health = np.asarray(health, dtype=np.int32)
+        self.armor = np.asarray(armor, dtype=np.int32)
+        self.kits = np.asarray(kits, dtype=np.int32)
+        self.order = np.arange(self.kind.size, dtype=np.int64)
+        self._next_order = self.kind.size
+        self._queues = {
+            HEAVY: deque(np.flatnonzero(self.kind == HEAVY).tolist()),
+            SAPPER: deque(np.flatnonzero(self.kind == SAPPER).tolist()),
+        }
+
+    def __len__(self):
+        return len(self._queues[HEAVY]) + len(self._queues[SAPPER])
+
+    def state(self):
+        """
+        Returns the state of the roster as arrays: its columns, the queues of every type and the next sequence number.
+
+        The state of the roster's generator is not included; it is kept by ``rng.bit_generator.state``.
+
+        Returns:
+            dict: The arrays, by name.
+        """
+        return {
+            "kind": self.kind,
+            "health": self.health,
+            "armor": self.armor,
+            "kits": self.kits,
+            "order": self.order,
+            "heavies": np.array(self._queues[HEAVY], dtype=np.int64),
+            "sappers": np.array(self._queues[SAPPER], dtype=np.int64),
+            "next_order": np.int64(self._next_order),
+        }
+
+    def load_state(self, state):
+        """
+        Replaces the soldiers of the roster with a state returned by :meth:`state`.
+
+        Args:
+            state (dict): The arrays of the state, by name.
+        """
+        self.kind = np.array(state["kind"], dtype=np.uint8)
+        self.health = np.array(state["health"], dtype=np.int32)
+        self.armor = np.array(state["armor"], dtype=np.int32)
+        self.kits = np.array(state["kits"], dtype=np.int32)
+        self.order = np.array(state["order"], dtype=np.int64)
+        self._next_order = int(state["next_order"])
+        self._queues = {HEAVY: deque(state["heavies"].tolist()), SAPPER: deque(state["sappers"].tolist())}
+
+    def __iter__(self):
+        """
+        Iterates over the soldiers in the roster order as Heavy and Sapper views.
+
+        Yields:
+            Soldier: A view of a soldier present in the roster.
+        """
+        for index in sorted(self.indices(), key=self.order.__getitem__):
+            yield self.soldier(index)
+
+    def count(self, kind):
+        """
+        Returns the number of soldiers of a type present in the roster.
+
+        Args:
+            kind (int): ``HEAVY`` or ``SAPPER``.
+
+        Returns:
+            int: The number of soldiers of that type.
+        """
+        return len(self._queues[kind])
+
+    def indices(self):
+        """
+        Returns the rows of the soldiers present in the roster.
+
+        Returns:
+            list: The rows, grouped by type.
+        """
+        return list(self._queues[HEAVY]) + list(self._queues[SAPPER])
+
+    def soldier(self, index):
+        """
+        Returns a view of a roster row with the Soldier API.
+
+        Args:
+            index (int): The row of the soldier.
+
+        Returns:
+            Soldier: A HeavyView or SapperView reading and writing the roster arrays.
+        """
+        return HeavyView(self, index) if self.kind[index] == HEAVY else SapperView(self, index)
+
+    def pop_last(self):
+        """
+        Removes the last soldier of the roster.
+
+        Returns:
+            int or None: The row of the removed soldier, or None if the roster is empty.
+        """
+        heavies, sappers = self._queues[HEAVY], self._queues[SAPPER]
+        if not heavies and not sappers:
+            return None
+        if not sappers or (heavies and self.order[heavies[-1]] > self.order[sappers[-1]]):
+            return heavies.pop()
+        return sappers.pop()
+
+    def pop_first(self, kind):
+        """
+        Removes the first soldier of a type from the roster.
+
+        Args:
+            kind (int): ``HEAVY`` or ``SAPPER``.
+
+        Returns:
+            int or None: The row of the removed soldier, or None if there is no soldier of that type.
+        """
+        queue = self._queues[kind]
+        return queue.popleft() if queue else None
+
+    def push_back(self, index):
+        """
+        Appends a soldier at the end of the roster.
+
+        Args:
+            index (int): The row of the soldier.
+        """
+        self.order[index] = self._next_order
+        self._next_order += 1
+        self._queues[int(self.kind[index])].append(index)
+
+    def clear(self):
+        """
+        Removes every soldier from the roster.
+        """
+        self._queues[HEAVY].clear()
+        self._queues[SAPPER].clear()
+
+    def react_to_mine(self, indices):
+        """
+        Applies the reaction to a mine of the given soldiers.
+
+        Heavies lose 50 armor, or 50 health once armor is below 50. Sappers use a kit, or die without one.
+
+        Args:
+            indices (int or np.ndarray): The rows of the soldiers.
+        """
+        indices = np.atleast_1d(indices)
+        heavy = self.kind[indices] == HEAVY
+        armor, health, kits = self.armor[indices], self.health[indices], self.kits[indices]
+
+        armored = heavy & (armor >= 50)
+        wounded = heavy & ~armored & (health >= 50)
+        has_kit = ~heavy & (kits > 0)
+
+        self.armor[indices] = np.where(armored, armor - 50, armor)
+        self.health[indices] = np.where(wounded, health - 50, np.where(~heavy & ~has_kit, 0, health))
+        self.kits[indices] = np.where(has_kit, kits - 1, kits)
+
+    def react_to_bomb(self, indices):
+        """
+        Applies the reaction to a bomb of the given soldiers.
+
+        Heavies lose 100 armor, or are left with 50 health when they had exactly 50 armor, or die. Sappers use two
+        kits, or die without them.
+
+        Args:
+            indices (int or np.ndarray): The rows of the soldiers.
+        """
+        indices = np.atleast_1d(indices)
+        heavy = self.kind[indices] == HEAVY
+        armor, health, kits = self.armor[indices], self.health[indices], self.kits[indices]
+
+        armored = heavy & (armor > 50)
+        half_armored = heavy & (armor == 50)
+        has_kits = ~heavy & (kits >= 2)
+        dies = (heavy & ~armored & ~half_armored) | (~heavy & ~has_kits)
+
+        self.armor[indices] = np.where(armored, armor - 100, np.where(half_armored, 0, armor))
+        self.health[indices] = np.where(half_armored, 50, np.where(dies, 0, health))
+        self.kits[indices] = np.where(has_kits, kits - 2, kits)
+
+    def react_to_enemy(self, indices):
+        """
+        Applies the reaction to an enemy of the given soldiers, setting their health and armor to 0.
+
+        Args:
+            indices (int or np.ndarray): The rows of the soldiers.
+        """
+        indices = np.atleast_1d(indices)
+        self.health[indices] = 0
+        self.armor[indices] = 0
+
+    def add_kit(self, indices, amounts=None):
+        """
+        Adds disarming kits to every given soldier.
+
+        Args:
+            indices (int or np.ndarray): The rows of the soldiers.
+            amounts (int or np.ndarray, optional): The number of kits added to each soldier. Default draws 1 or 2
+                per soldier from the roster's generator.
+        """
+        indices = np.atleast_1d(indices)
+        if amounts is None:
+            amounts = self.rng.integers(1, 3, size=indices.size)
+        self.kits[indices] += amounts
+
 
 class Troops:
     """
     A class to create and manage a collection of soldiers, including Heavy and Sapper types.
 
     Static Methods:
-        create_soldiers(quantity): Creates a specified quantity of soldiers with a fixed percentage of Heavy and Sapper types.
+        create_soldiers(quantity, rng=None): Creates a specified quantity of soldiers with a fixed percentage of
+            Heavy and Sapper types.
     """
 
     @staticmethod
-    def create_soldiers(quantity):
+    def create_soldiers(quantity, rng=None):
         """
         Creates a specified quantity of soldiers, including a fixed percentage of Heavy and Sapper types.
 
         Args:
             quantity (int): The total number of soldiers to create.
+            rng (np.random.Generator or SeedSequence or int, optional): The source of randomness of the roster.
 
         Returns:
-            list: A list of soldier instances, shuffled to mix Heavy and Sapper soldiers.
+            Roster: A roster of the special soldiers, shuffled to mix Heavy and Sapper soldiers.
 
         Note:
             The distribution of soldiers is as follows:
             - 3% Heavy soldiers
             - 2% Sapper soldiers
         """
-        soldiers = []
-
         num_heavy = int(quantity * 0.03)  # 3% Heavy
         num_sapper = int(quantity * 0.02)  # 2% Sapper
 
+        kind = np.repeat(np.array([HEAVY, SAPPER], dtype=np.uint8), [num_heavy, num_sapper])
+        rng = np.random.default_rng(rng)
+        rng.shuffle(kind)
 
-        soldiers.extend([Heavy(health=100) for _ in range(num_heavy)])
-        soldiers.extend([Sapper(health=100, disarming_kits=1) for _ in range(num_sapper)])
-
-        random.shuffle(soldiers)
-
-        return soldiers
+        heavy = kind == HEAVY
+        return Roster(
+            kind,
+            health=np.full(kind.size, 100),
+            armor=np.where(heavy, 100, 0),
+            kits=np.where(heavy, 0, 1),
+            rng=rng,
+        )
@@ -0,0 +1,36 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from aifield.data_reader import FEATURE_COLUMNS, LABEL_COLUMN, LABEL_MAPPING  # noqa: E402
+from aifield.dataset_registry import DataRegistry  # noqa: E402
+from aifield.model_cache import ModelCache  # noqa: E402
+
+
+@pytest.fixture
+def iris_csv(tmp_path):
+    """
+    Writes a small synthetic dataset in the layout of Augmented_Iris.csv into a fresh directory, so its binary cache
+    starts cold.
+    """
+    rng = np.random.default_rng(0)
+    rows = 6000
+    labels = rng.integers(0, len(LABEL_MAPPING), rows)
+    features = rng.normal(size=(rows, len(FEATURE_COLUMNS))) + 2.0 * labels[:, None]
+    species = np.array(list(LABEL_MAPPING))[labels]
+
+    path = tmp_path / "Augmented_Iris.csv"
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(",".join(["Id"] + FEATURE_COLUMNS + [LABEL_COLUMN]) + "\n")
+        for index, (row, name) in enumerate(zip(features, species)):
+            file.write(",".join([str(index)] + [f"{value:.3f}" for value in row] + [name]) + "\n")
+
+    DataRegistry.clear()
+    ModelCache.clear()
+    yield str(path)
+    DataRegistry.clear()
+    ModelCache.clear()
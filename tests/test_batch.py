@@ -0,0 +1,49 @@
+import os
+
+import numpy as np
+
+from aifield.batch import RESULT_FIELDS, BatchRunner, Scenario
+from aifield.classifier_general import ClassifierGeneral
+from aifield.data_reader import DataReader
+from aifield.dataset_registry import DataRegistry
+from aifield.simulation import Simulation
+
+
+def test_parallel_run_builds_cold_cache(iris_csv):
+    features_path, labels_path, meta_path = DataReader._cache_paths(iris_csv)
+    assert not os.path.exists(meta_path)
+
+    scenario = Scenario(10, 0.3, "KNN", amount_of_soldiers=5, data_path=iris_csv)
+    parallel = BatchRunner(scenario, workers=4, chunk_size=1).run(8, seed=7)
+    serial = BatchRunner(scenario, workers=0).run(8, seed=7)
+
+    assert os.path.exists(features_path) and os.path.exists(labels_path) and os.path.exists(meta_path)
+    assert sorted(os.listdir(os.path.dirname(meta_path))) == sorted(
+        os.path.basename(path) for path in (features_path, labels_path, meta_path)
+    )
+    for name, values in serial.replicas.items():
+        np.testing.assert_array_equal(parallel.replicas[name], values)
+
+
+def test_replicas_match_generator_walk(iris_csv):
+    scenario = Scenario(10, 0.3, "DecisionTree", type_of_path="Diagonal", amount_of_soldiers=600, data_path=iris_csv)
+    runner = BatchRunner(scenario, workers=0)
+    batch = runner.run(3, seed=5)
+
+    split = DataRegistry.get_split(iris_csv)
+    classifier = ClassifierGeneral(scenario.classifier_name, random_state=42)
+    classifier.train(split)
+    for index, seed in enumerate(runner.replica_seeds(3, 5)):
+        results = Simulation(
+            scenario.size_of_board,
+            scenario.mine_probability,
+            scenario.classifier_name,
+            scenario.type_of_path,
+            scenario.amount_of_soldiers,
+            split=split,
+            classifier=classifier,
+            verbose=False,
+            seed=seed,
+        ).run()
+        for name in RESULT_FIELDS[1:]:
+            assert batch.replicas[name][index] == results[name]
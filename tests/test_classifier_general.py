@@ -0,0 +1,101 @@
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from aifield.classifier_general import ClassifierGeneral
+from aifield.dataset_registry import DataRegistry
+from aifield.model_cache import ModelCache
+
+
+def test_uncached_training_leaves_shared_estimator_untouched(iris_csv):
+    split = DataRegistry.get_split(iris_csv)
+    other_split = DataRegistry.get_split(iris_csv, random_state=7)
+    first = ClassifierGeneral("DecisionTree", random_state=42)
+    second = ClassifierGeneral("DecisionTree", random_state=42)
+    first.train(split)
+    second.train(split)
+    assert second.classifier is first.classifier
+
+    X_test, _ = split.test_data
+    before = first.classifier.predict(X_test)
+    tree = first.classifier.tree_
+    second.train(other_split, use_cache=False)
+
+    assert second.classifier is not first.classifier
+    assert first.classifier.tree_ is tree
+    np.testing.assert_array_equal(first.classifier.predict(X_test), before)
+    assert first.trained_on == split.key and second.trained_on == other_split.key
+
+
+def test_cached_training_reuses_the_temperature(iris_csv, monkeypatch):
+    split = DataRegistry.get_split(iris_csv)
+    calls = []
+    fit_temperature = ClassifierGeneral._fit_temperature
+
+    def counted(self, X_train, y_train):
+        calls.append(self.classifier_name)
+        return fit_temperature(self, X_train, y_train)
+
+    monkeypatch.setattr(ClassifierGeneral, "_fit_temperature", counted)
+    first = ClassifierGeneral("LinearSVC", random_state=42)
+    first.train(split)
+    second = ClassifierGeneral("LinearSVC", random_state=42)
+    second.train(split)
+
+    assert calls == ["LinearSVC"]
+    assert second.temperature == first.temperature is not None
+
+
+def test_concurrent_disk_writes_leave_one_complete_file(iris_csv, tmp_path):
+    split = DataRegistry.get_split(iris_csv)
+    directory = tmp_path / "models"
+    ModelCache.configure(directory=str(directory))
+    try:
+        classifier = ClassifierGeneral("DecisionTree", random_state=42)
+        classifier.train(split)
+        key = ModelCache.key("DecisionTree", classifier.classifier.get_params(), 42, split.fingerprint)
+        os.remove(ModelCache._path(key))
+
+        barrier = threading.Barrier(8)
+
+        def store():
+            barrier.wait()
+            ModelCache.put(key, classifier.classifier)
+
+        threads = [threading.Thread(target=store) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert os.listdir(directory) == [os.path.basename(ModelCache._path(key))]
+        ModelCache.clear()
+        X_test, _ = split.test_data
+        np.testing.assert_array_equal(ModelCache.get(key).predict(X_test), classifier.classifier.predict(X_test))
+    finally:
+        ModelCache.configure()
+
+
+def test_failed_disk_write_removes_temporary_file(iris_csv, tmp_path, monkeypatch):
+    import joblib
+
+    split = DataRegistry.get_split(iris_csv)
+    classifier = ClassifierGeneral("DecisionTree", random_state=42)
+    classifier.train(split)
+    directory = tmp_path / "models"
+    ModelCache.configure(directory=str(directory))
+
+    def broken_dump(value, filename):
+        with open(filename, "wb") as handle:
+            handle.write(b"partial")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(joblib, "dump", broken_dump)
+    try:
+        with pytest.raises(OSError):
+            ModelCache.put("broken", classifier.classifier)
+        assert os.listdir(directory) == []
+    finally:
+        ModelCache.configure()
@@ -0,0 +1,11 @@
+import pytest
+
+from aifield.data_reader import FEATURE_COLUMNS, DataReader
+
+
+@pytest.mark.parametrize("use_cache", [True, False])
+def test_empty_sample_keeps_feature_layout(iris_csv, use_cache):
+    X, y = DataReader.load_augmented_data(iris_csv, 0.0, use_cache=use_cache)
+
+    assert X.shape == (0, len(FEATURE_COLUMNS)) and X.dtype == "float32"
+    assert y.shape == (0,) and y.dtype == "uint8"
@@ -0,0 +1,54 @@
+import os
+
+import numpy as np
+import pytest
+
+from aifield.dataset_registry import DatasetKey, DataRegistry
+
+
+@pytest.fixture
+def budget():
+    yield DataRegistry.configure
+    DataRegistry.configure()
+
+
+def test_entries_over_the_budget_are_evicted_least_recently_used_first(iris_csv, budget):
+    first = DataRegistry.get_split(iris_csv, random_state=1)
+    unit = first.nbytes
+    assert DataRegistry.get_dataset(iris_csv, random_state=1).nbytes == unit
+
+    # Budżet mieści dwie pary (próbka, podział) tej samej wielkości
+    budget(max_bytes=4 * unit)
+    second = DataRegistry.get_split(iris_csv, random_state=2)
+    assert DataRegistry.get_split(iris_csv, random_state=1) is first
+    third = DataRegistry.get_split(iris_csv, random_state=3)
+
+    cache = DataRegistry._cache
+    assert cache.total_bytes <= 4 * unit
+    datasets = [DatasetKey(os.path.abspath(iris_csv), 0.015, state) for state in (1, 2, 3)]
+    assert [key in cache for key in datasets] == [False, False, True]
+    assert [split.key in cache for split in (first, second, third)] == [True, True, True]
+    assert DataRegistry.get_split(iris_csv, random_state=1) is first
+
+    budget(max_bytes=unit)
+    assert len(cache) == 1 and first.key in cache
+    assert DataRegistry.get_split(iris_csv, random_state=3) is not third
+
+
+def test_uncached_entries_are_not_stored(iris_csv):
+    split = DataRegistry.get_split(iris_csv, random_state=None)
+
+    assert len(DataRegistry._cache) == 0
+    assert split.key not in DataRegistry._cache
+
+
+def test_returned_arrays_are_read_only(iris_csv):
+    dataset = DataRegistry.get_dataset(iris_csv)
+    split = DataRegistry.get_split(iris_csv)
+
+    for array in (dataset.X, dataset.y, split.X_train, split.X_test, split.y_train, split.y_test):
+        assert not array.flags.writeable
+        with pytest.raises(ValueError):
+            array[0] = 0
+        with pytest.raises(ValueError):
+            np.add(array, 1, out=array)
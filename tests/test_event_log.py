@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from aifield.event_log import EventCode, EventLog
+
+CODES = (EventCode.MOVE, EventCode.GOOD_PREDICTION, EventCode.ENEMY_CASUALTIES)
+CAPACITY = 5
+
+
+@pytest.fixture(autouse=True)
+def small_blocks(monkeypatch):
+    # Małe bloki i bufor startowy, aby kilka zdarzeń przechodziło przez opróżnianie, powiększanie i zawijanie
+    monkeypatch.setattr(EventLog, "FLUSH_SIZE", 3)
+    monkeypatch.setattr(EventLog, "INITIAL_CAPACITY", 2)
+
+
+def fill(log, start, stop):
+    for step in range(start, stop):
+        log.append(step, step % 7, step % 11, CODES[step % len(CODES)], delta=step, value=-step)
+
+
+def expected_counts(count):
+    counts = [0] * len(EventCode)
+    for step in range(count):
+        counts[CODES[step % len(CODES)]] += 1
+    return counts
+
+
+def new_log(retention):
+    return EventLog(100, retention, CAPACITY if retention == "last" else None)
+
+
+@pytest.mark.parametrize("count", [0, 2, CAPACITY, 17])
+def test_all_keeps_every_record(count):
+    log = new_log("all")
+    fill(log, 0, count)
+
+    records = log.records()
+    np.testing.assert_array_equal(records["step"], np.arange(count))
+    np.testing.assert_array_equal(records["delta"], np.arange(count))
+    assert len(log) == count
+    assert log.counts == expected_counts(count)
+
+
+@pytest.mark.parametrize("count", [0, 2, CAPACITY, CAPACITY + 1, 17, 3 * CAPACITY])
+@pytest.mark.parametrize("flush_size", [1, 3, 2 * CAPACITY + 1])
+def test_last_keeps_the_newest_records_in_order(monkeypatch, count, flush_size):
+    monkeypatch.setattr(EventLog, "FLUSH_SIZE", flush_size)
+    log = new_log("last")
+    fill(log, 0, count)
+
+    np.testing.assert_array_equal(log.records()["step"], np.arange(max(0, count - CAPACITY), count))
+    assert len(log) == min(count, CAPACITY)
+    assert log.counts == expected_counts(count)
+
+
+def test_counters_keep_no_records():
+    log = new_log("counters")
+    fill(log, 0, 17)
+
+    assert log.records().size == 0
+    assert len(log) == 0
+    assert log.counts == expected_counts(17)
+    assert list(log.lines()) == []
+
+
+@pytest.mark.parametrize("retention", EventLog.RETENTIONS)
+@pytest.mark.parametrize("cut", [0, 4, 13])
+def test_state_round_trip_continues_like_the_original(retention, cut):
+    expected = new_log(retention)
+    fill(expected, 0, 20)
+
+    interrupted = new_log(retention)
+    fill(interrupted, 0, cut)
+    state = {name: np.copy(array) for name, array in interrupted.state().items()}
+    resumed = new_log(retention)
+    resumed.load_state(state)
+    np.testing.assert_array_equal(resumed.records(), interrupted.records())
+
+    fill(resumed, cut, 20)
+    for name, array in expected.state().items():
+        np.testing.assert_array_equal(resumed.state()[name], array)
+    assert list(resumed.lines()) == list(expected.lines())
+
+
+def test_lines_format_the_selected_codes():
+    log = new_log("all")
+    fill(log, 0, 6)
+
+    assert list(log.lines([EventCode.ENEMY_CASUALTIES])) == [
+        "Enemy unit encountered -> Lost: 2 casualties",
+        "Enemy unit encountered -> Lost: 5 casualties",
+    ]
+    assert next(log.lines()) == "Moving to [0][0]"
+
+
+@pytest.mark.parametrize("retention, capacity", [("everything", None), ("last", None), ("last", 0)])
+def test_invalid_retention_is_rejected(retention, capacity):
+    with pytest.raises(ValueError):
+        EventLog(100, retention, capacity)
@@ -0,0 +1,104 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from aifield.board import Board
+from aifield.classifier_general import ClassifierGeneral
+from aifield.dataset_registry import DataRegistry
+from aifield.mapped_board import MappedBoard
+from aifield.pipeline import TilePipeline
+from aifield.planner import PLANNERS
+from aifield.simulation import Simulation
+
+SIZE_OF_BOARD = 20
+MINE_PROBABILITY = 0.3
+# Małe kafelki, aby plansza składała się z wielu kafelków, także ostatniego niepełnego
+TILE_CELLS = 3 * SIZE_OF_BOARD
+
+
+@pytest.fixture(autouse=True)
+def small_tiles(monkeypatch):
+    monkeypatch.setattr(MappedBoard, "TILE_CELLS", TILE_CELLS)
+
+
+@pytest.fixture
+def trained(iris_csv):
+    split = DataRegistry.get_split(iris_csv)
+    classifier = ClassifierGeneral("DecisionTree", random_state=42)
+    classifier.train(split)
+    return split, classifier
+
+
+def in_memory_copy(board):
+    return Board.from_arrays(
+        np.array(board.array), np.array(board.feature_indices), board.mine_probability, board.split
+    )
+
+
+def test_board_matches_in_memory_board(trained, tmp_path):
+    split, classifier = trained
+    board = MappedBoard(SIZE_OF_BOARD, MINE_PROBABILITY, tmp_path / "serial", split, rng=5, pipeline=TilePipeline(0))
+    expected = in_memory_copy(board)
+
+    assert len(board.tiles()) == 7
+    assert board.amount_of_mines == expected.amount_of_mines > 0
+    assert board.amount_of_bombs == expected.amount_of_bombs > 0
+    np.testing.assert_array_equal(board.assigned_test_features, expected.assigned_test_features)
+    np.testing.assert_array_equal(
+        board.predict_grid(classifier), expected.labels_at(classifier, slice(None), slice(None))
+    )
+
+    threaded = MappedBoard(
+        SIZE_OF_BOARD, MINE_PROBABILITY, tmp_path / "threads", split, rng=5, pipeline=TilePipeline(3)
+    )
+    np.testing.assert_array_equal(threaded.array, board.array)
+    np.testing.assert_array_equal(threaded.feature_indices, board.feature_indices)
+    for index, (start, stop) in enumerate(board.tiles()):
+        labels, indices = board.generate_tile(index)
+        np.testing.assert_array_equal(labels, board.array[start:stop])
+        np.testing.assert_array_equal(indices, board.feature_indices[start:stop])
+
+
+@pytest.mark.parametrize("type_of_path", PLANNERS)
+@pytest.mark.parametrize("fast", [False, True])
+def test_walk_matches_in_memory_board(trained, tmp_path, type_of_path, fast):
+    split, classifier = trained
+
+    def new_simulation(**kwargs):
+        return Simulation(
+            SIZE_OF_BOARD,
+            MINE_PROBABILITY,
+            classifier.classifier_name,
+            type_of_path,
+            600,
+            split=split,
+            classifier=classifier,
+            verbose=False,
+            seed=9,
+            **kwargs,
+        )
+
+    mapped = new_simulation(board_storage=str(tmp_path), tile_workers=0)
+    expected = new_simulation(board=in_memory_copy(mapped.board))
+    assert mapped.run(fast=fast) == expected.run(fast=fast)
+    if fast:
+        np.testing.assert_array_equal(mapped.disarmed_grid, expected.disarmed_grid)
+    else:
+        assert mapped.disarmed_locations == expected.disarmed_locations
+
+
+def test_board_reopens_from_directory(trained, tmp_path, monkeypatch):
+    split, classifier = trained
+    board = MappedBoard(SIZE_OF_BOARD, MINE_PROBABILITY, tmp_path, split, rng=5, pipeline=TilePipeline(0))
+    labels = np.array(board.predict_grid(classifier))
+
+    # Kafelki ponownie otwartej planszy pochodzą z metadanych, a nie z bieżącego TILE_CELLS
+    monkeypatch.setattr(MappedBoard, "TILE_CELLS", 1 << 22)
+    for reopened in (MappedBoard.open(tmp_path, split, TilePipeline(0)), pickle.loads(pickle.dumps(board))):
+        np.testing.assert_array_equal(reopened.array, board.array)
+        np.testing.assert_array_equal(reopened.feature_indices, board.feature_indices)
+        assert (reopened.amount_of_mines, reopened.amount_of_bombs) == (board.amount_of_mines, board.amount_of_bombs)
+        assert reopened.tiles() == board.tiles()
+        np.testing.assert_array_equal(reopened.generate_tile(3)[0], board.array[9:12])
+        np.testing.assert_array_equal(reopened.predict_grid(classifier, "reopened_prediction"), labels)
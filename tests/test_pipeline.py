@@ -0,0 +1,66 @@
+import threading
+import time
+
+import pytest
+
+from aifield.pipeline import TilePipeline
+
+
+class RecordingTask:
+    """
+    A task that records the thread of every tile and the largest number of tiles started and not yet consumed.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = 0
+        self.consumed = 0
+        self.peak = 0
+        self.threads = set()
+
+    def __call__(self, tile):
+        with self.lock:
+            self.started += 1
+            self.peak = max(self.peak, self.started - self.consumed)
+            self.threads.add(threading.get_ident())
+        # Wcześniejsze kafelki trwają dłużej, aby wyniki kończyły się w innej kolejności niż je zlecono
+        time.sleep(0.002 * (tile % 5))
+        return tile * tile
+
+    def consume(self, results):
+        for result in results:
+            with self.lock:
+                self.consumed += 1
+            yield result
+
+
+@pytest.mark.parametrize("workers, max_in_flight", [(1, None), (4, None), (4, 3), (3, 1)])
+def test_results_keep_tile_order_within_the_bound(workers, max_in_flight):
+    pipeline = TilePipeline(workers, max_in_flight=max_in_flight)
+    task = RecordingTask()
+
+    results = list(task.consume(pipeline.map(task, range(40))))
+
+    assert results == [tile * tile for tile in range(40)]
+    assert pipeline.max_in_flight == (max_in_flight or 2 * workers)
+    assert 1 <= task.peak <= pipeline.max_in_flight
+    assert threading.get_ident() not in task.threads
+
+
+def test_zero_workers_run_inline():
+    task = RecordingTask()
+    results = TilePipeline(0).map(task, range(5))
+
+    assert task.started == 0
+    assert list(task.consume(results)) == [0, 1, 4, 9, 16]
+    assert task.threads == {threading.get_ident()}
+    assert task.peak == 1
+
+
+def test_process_pool_runs_picklable_tasks():
+    assert list(TilePipeline(2, executor="process").map(abs, range(-3, 3))) == [3, 2, 1, 0, 1, 2]
+
+
+def test_unknown_executor_is_rejected():
+    with pytest.raises(ValueError, match="Unsupported executor: fiber"):
+        TilePipeline(2, executor="fiber")
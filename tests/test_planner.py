@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from aifield.classifier_general import ClassifierGeneral
+from aifield.dataset_registry import DataRegistry
+from aifield.planner import HorizontalPlanner, RiskAwarePlanner
+from aifield.simulation import Simulation
+
+# Tania ścieżka wije się przez planszę, poziome przejście musi odwiedzić każde pole
+COST = np.array(
+    [
+        [1, 9, 1, 1, 1],
+        [1, 9, 1, 9, 1],
+        [1, 1, 1, 9, 1],
+        [9, 9, 9, 9, 1],
+        [9, 9, 9, 9, 1],
+    ],
+    dtype=np.float64,
+)
+
+
+def route_cost(cost, rows, cols):
+    return cost[rows[1:], cols[1:]].sum()
+
+
+def cheapest_cost(cost):
+    size = cost.shape[0]
+    distances = np.full(cost.shape, np.inf)
+    distances[0, 0] = 0
+    for _ in range(size * size):
+        for x, y in np.ndindex(cost.shape):
+            for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+                if 0 <= x + dx < size and 0 <= y + dy < size:
+                    distances[x, y] = min(distances[x, y], distances[x + dx, y + dy] + cost[x, y])
+    return distances[-1].min()
+
+
+def test_cheapest_route_is_connected_and_optimal():
+    rows, cols = RiskAwarePlanner.cheapest_route(COST)
+
+    assert (rows[0], cols[0]) == (0, 0) and rows[-1] == COST.shape[0] - 1
+    assert np.all(np.abs(np.diff(rows)) + np.abs(np.diff(cols)) == 1)
+    assert route_cost(COST, rows, cols) == pytest.approx(cheapest_cost(COST))
+    assert route_cost(COST, rows, cols) <= route_cost(COST, *HorizontalPlanner(COST.shape[0]).coordinates())
+
+
+def test_expected_casualties_follow_the_predicted_labels():
+    probabilities = np.array([[0.5, 0.3, 0.2], [0.5, 0.3, 0.2]])
+    predicted = np.array([0, 1])
+    cost = RiskAwarePlanner.expected_casualties(probabilities, predicted)
+
+    step = RiskAwarePlanner.STEP_CASUALTIES
+    bomb = 0.2 * RiskAwarePlanner.BOMB_CASUALTIES
+    np.testing.assert_allclose(cost, [step + 0.3 * RiskAwarePlanner.MINE_CASUALTIES + bomb, step + bomb])
+
+
+@pytest.mark.parametrize("classifier_name", ["SVM", "DecisionTree"])
+def test_plan_uses_the_labels_of_the_walk(iris_csv, classifier_name):
+    split = DataRegistry.get_split(iris_csv)
+    classifier = ClassifierGeneral(classifier_name, random_state=42)
+    classifier.train(split)
+    simulation = Simulation(
+        12, 0.3, classifier_name, "RiskAware", split=split, classifier=classifier, verbose=False, seed=3
+    )
+    simulation.run()
+
+    board, planner = simulation.board, simulation.planner
+    rows, cols = np.indices(board.array.shape)
+    expected = planner.expected_casualties(board.probabilities_at(classifier), board.labels_at(classifier, rows, cols))
+    np.testing.assert_allclose(planner.cost, expected)
+    np.testing.assert_array_equal(
+        simulation.prediction_grid[planner.rows, planner.cols], board.labels_at(classifier, planner.rows, planner.cols)
+    )
+    assert planner.rows[-1] == board.size_of_board - 1
@@ -0,0 +1,106 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from aifield.classifier_general import ClassifierGeneral
+from aifield.dataset_registry import DataRegistry
+from aifield.metrics import SPECIAL_FORCES_COUNTERS, Metrics
+from aifield.planner import PLANNERS
+from aifield.simulation import Simulation
+
+SIZE_OF_BOARD = 15
+MINE_PROBABILITY = 0.3
+# Liczby żołnierzy po obu stronach progu 500, od którego pojawiają się bomby
+SOLDIERS = (3, 100, 700)
+RETENTIONS = {"all": {}, "last": {"log_capacity": 16}, "counters": {}}
+
+
+@pytest.fixture
+def trained(iris_csv):
+    split = DataRegistry.get_split(iris_csv)
+    classifier = ClassifierGeneral("DecisionTree", random_state=42)
+    classifier.train(split)
+    return split, classifier
+
+
+def new_simulation(trained, type_of_path, soldiers, seed, retention="all", **kwargs):
+    split, classifier = trained
+    return Simulation(
+        SIZE_OF_BOARD,
+        MINE_PROBABILITY,
+        classifier.classifier_name,
+        type_of_path,
+        soldiers,
+        split=split,
+        classifier=classifier,
+        verbose=False,
+        log_retention=retention,
+        seed=seed,
+        **RETENTIONS[retention],
+        **kwargs,
+    )
+
+
+def disarmed_cells(simulation):
+    if simulation.disarmed_grid is not None:
+        return set(zip(*map(np.ndarray.tolist, np.nonzero(np.asarray(simulation.disarmed_grid)))))
+    return simulation.disarmed_locations
+
+
+def assert_same_state(actual, expected):
+    assert actual.results() == expected.results()
+    assert disarmed_cells(actual) == disarmed_cells(expected)
+    for name, array in expected._special_soldiers.state().items():
+        np.testing.assert_array_equal(actual._special_soldiers.state()[name], array)
+
+
+@pytest.mark.parametrize("type_of_path, soldiers, seed", list(itertools.product(PLANNERS, SOLDIERS, range(4))))
+def test_fast_kernel_matches_generator(trained, type_of_path, soldiers, seed):
+    expected = new_simulation(trained, type_of_path, soldiers, seed)
+    expected.run()
+
+    fast = new_simulation(trained, type_of_path, soldiers, seed)
+    fast.run(fast=True)
+    assert_same_state(fast, expected)
+
+    chunked = new_simulation(trained, type_of_path, soldiers, seed)
+    for _ in chunked.simulate(batch_size=7, fast=True):
+        pass
+    assert_same_state(chunked, expected)
+
+
+@pytest.mark.parametrize("type_of_path, fast, retention", list(itertools.product(PLANNERS, (False, True), RETENTIONS)))
+@pytest.mark.parametrize("cut", [1, 7, SIZE_OF_BOARD - 1, 150])
+def test_resumed_run_matches_uninterrupted(trained, tmp_path, type_of_path, fast, retention, cut):
+    split, classifier = trained
+    expected = new_simulation(trained, type_of_path, 100, 11, retention)
+    expected.run(fast=fast)
+    if cut >= expected._step:
+        pytest.skip(f"the {type_of_path} path has only {expected._step} steps")
+
+    interrupted = new_simulation(trained, type_of_path, 100, 11, retention)
+    steps = interrupted.simulate(batch_size=cut if fast else None, fast=fast)
+    for _ in itertools.islice(steps, 1 if fast else cut):
+        pass
+    path = tmp_path / "simulation.npz"
+    interrupted.save_checkpoint(path)
+    steps.close()
+
+    resumed = Simulation.from_checkpoint(path, split=split, classifier=classifier, verbose=False)
+    resumed.run(fast=fast)
+    assert_same_state(resumed, expected)
+    for name, array in expected.events.state().items():
+        np.testing.assert_array_equal(resumed.events.state()[name], array)
+
+
+@pytest.mark.parametrize("type_of_path, soldiers", list(itertools.product(PLANNERS, SOLDIERS)))
+def test_fast_kernel_counts_special_forces_events(trained, type_of_path, soldiers):
+    counters = []
+    for fast in (False, True):
+        metrics = Metrics()
+        new_simulation(trained, type_of_path, soldiers, 1, metrics=metrics).run(fast=fast)
+        counters.append(metrics.counters)
+
+    assert counters[1] == counters[0]
+    assert set(counters[0]) == set(SPECIAL_FORCES_COUNTERS)
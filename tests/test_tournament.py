@@ -0,0 +1,29 @@
+import json
+
+import pytest
+
+from aifield import cli
+from aifield.tournament import Tournament
+
+
+def test_result_reports_worker_and_wall_time(iris_csv):
+    tournament = Tournament(["KNN", "DecisionTree"], replicas=4, amount_of_soldiers=5, data_path=iris_csv, workers=0)
+    result = tournament.run(seed=3)
+
+    assert set(result.worker_times) == {"KNN", "DecisionTree"}
+    assert all(seconds > 0 for seconds in result.worker_times.values())
+    # Bez puli procesów czas rzeczywisty obejmuje czas pracy każdego klasyfikatora
+    assert result.wall_time >= sum(result.worker_times.values())
+    assert {row["classifier"]: row["worker_time"] for row in result.ranking()} == result.worker_times
+    assert result.table().splitlines()[-1].startswith("Wall time:")
+
+
+def test_command_writes_json_with_format_only(iris_csv, capsys):
+    arguments = ["tournament", "--classifiers", "KNN", "--replicas", "2", "--soldiers", "5", "--data", iris_csv]
+    cli.main(arguments + ["--workers", "0", "--seed", "1", "--format", "json"])
+    outcome = json.loads(capsys.readouterr().out)
+    assert outcome["wall_time"] > 0
+    assert [row["classifier"] for row in outcome["ranking"]] == ["KNN"]
+
+    with pytest.raises(SystemExit):
+        cli.build_parser().parse_args(arguments + ["--json"])
@@ -0,0 +1,134 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from aifield.soldier import Heavy, Sapper
+from aifield.troops import HEAVY, SAPPER, HeavyView, Roster, SapperView, Troops
+
+KINDS = [HEAVY, SAPPER, HEAVY, SAPPER, SAPPER]
+
+
+def new_roster(kind=KINDS):
+    kind = np.array(kind, dtype=np.uint8)
+    heavy = kind == HEAVY
+    return Roster(kind, np.full(kind.size, 100), np.where(heavy, 100, 0), np.where(heavy, 0, 1), rng=0)
+
+
+def test_roster_keeps_the_order_of_the_soldiers():
+    roster = new_roster()
+
+    assert len(roster) == 5
+    assert (roster.count(HEAVY), roster.count(SAPPER)) == (2, 3)
+    assert [(type(soldier), soldier.index) for soldier in roster] == [
+        (HeavyView, 0),
+        (SapperView, 1),
+        (HeavyView, 2),
+        (SapperView, 3),
+        (SapperView, 4),
+    ]
+
+
+def test_pop_and_push_back_follow_the_queues():
+    roster = new_roster()
+
+    assert roster.pop_first(SAPPER) == 1
+    assert roster.pop_first(HEAVY) == 0
+    # Żołnierz dołączony na koniec jest ostatni, choć ma wcześniejszy wiersz
+    roster.push_back(0)
+    assert [soldier.index for soldier in roster] == [2, 3, 4, 0]
+    assert roster.pop_last() == 0
+    assert roster.pop_last() == 4
+    assert roster.pop_first(HEAVY) == 2
+    assert roster.pop_first(HEAVY) is None
+    assert roster.indices() == [3]
+
+    roster.push_back(2)
+    roster.clear()
+    assert len(roster) == 0
+    assert list(roster) == []
+    assert roster.pop_last() is None
+    assert roster.pop_first(SAPPER) is None
+
+
+def test_views_read_and_write_the_columns():
+    roster = new_roster()
+    heavy, sapper = roster.soldier(0), roster.soldier(1)
+
+    heavy.armor = 30
+    heavy.react_to_mine()
+    sapper.disarming_kits = 2
+    sapper.react_to_bomb()
+    sapper.add_kit(np.random.default_rng(4))
+
+    assert (roster.health[0], roster.armor[0]) == (50, 30)
+    assert (heavy.health, heavy.armor) == (50, 30)
+    assert roster.kits[1] == sapper.disarming_kits == np.random.default_rng(4).integers(1, 3)
+    heavy.react_to_enemy()
+    assert (roster.health[0], roster.armor[0]) == (0, 0)
+
+
+@pytest.mark.parametrize("reaction", ["react_to_mine", "react_to_bomb", "react_to_enemy"])
+def test_reactions_match_the_soldier_classes(reaction):
+    heavies = list(itertools.product([0, 40, 50, 100], [0, 40, 50, 100]))
+    sappers = list(itertools.product([0, 100], [0, 1, 2, 3]))
+    kind = [HEAVY] * len(heavies) + [SAPPER] * len(sappers)
+    roster = Roster(
+        kind,
+        [health for health, _ in heavies + sappers],
+        [armor for _, armor in heavies] + [0] * len(sappers),
+        [0] * len(heavies) + [kits for _, kits in sappers],
+    )
+    expected = []
+    for health, armor in heavies:
+        soldier = Heavy(health)
+        soldier.armor = armor
+        expected.append(soldier)
+    expected += [Sapper(health, kits) for health, kits in sappers]
+
+    getattr(roster, reaction)(np.arange(len(kind)))
+    for index, soldier in enumerate(expected):
+        if reaction == "react_to_enemy":
+            soldier.health, soldier.armor = 0, 0
+        else:
+            getattr(soldier, reaction)()
+        assert roster.health[index] == soldier.health
+        assert roster.armor[index] == getattr(soldier, "armor", 0)
+        assert roster.kits[index] == getattr(soldier, "disarming_kits", 0)
+
+
+def test_add_kit_draws_from_the_roster_generator():
+    roster = new_roster()
+    roster.add_kit(np.array([1, 3, 4]))
+    np.testing.assert_array_equal(roster.kits[[1, 3, 4]], 1 + np.random.default_rng(0).integers(1, 3, size=3))
+
+    roster.add_kit(3, 5)
+    assert roster.kits[3] == np.random.default_rng(0).integers(1, 3, size=3)[1] + 6
+
+
+def test_state_round_trip_keeps_the_queues():
+    roster = new_roster()
+    roster.pop_first(HEAVY)
+    roster.push_back(0)
+    roster.pop_first(SAPPER)
+
+    restored = new_roster([HEAVY])
+    restored.load_state({name: np.copy(array) for name, array in roster.state().items()})
+    assert [soldier.index for soldier in restored] == [soldier.index for soldier in roster]
+    assert restored.pop_last() == roster.pop_last() == 0
+    restored.push_back(1)
+    roster.push_back(1)
+    assert restored.indices() == roster.indices()
+    assert restored.order[1] == roster.order[1]
+
+
+def test_create_soldiers_shuffles_a_fixed_share_of_types():
+    roster = Troops.create_soldiers(1000, rng=7)
+
+    assert (roster.count(HEAVY), roster.count(SAPPER)) == (30, 20)
+    heavy = roster.kind == HEAVY
+    assert np.all(roster.health == 100)
+    np.testing.assert_array_equal(roster.armor, np.where(heavy, 100, 0))
+    np.testing.assert_array_equal(roster.kits, np.where(heavy, 0, 1))
+    np.testing.assert_array_equal(Troops.create_soldiers(1000, rng=7).kind, roster.kind)
+    assert len(Troops.create_soldiers(10)) == 0